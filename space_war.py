@@ -4,20 +4,41 @@ Space War - Galaga Style Shooting Game
 클래식 갤러그 스타일의 우주선 슈팅 게임
 """
 
-import pygame
+import os
 import random
 import math
 import sys
+import time
 import array
-
-# 게임 초기화
-pygame.init()
-pygame.mixer.init(frequency=22050, size=-16, channels=2, buffer=512)
+import collections
+import argparse
+import asyncio
+import bisect
+import gc
+import json
+import hashlib
+import heapq
+import itertools
+import mmap
+import multiprocessing
+import operator
+import statistics
+import struct
+import tempfile
+import threading
+
+# 벤치마크 JSON 등 표준 출력을 쓰는 모드를 위해 pygame 시작 메시지 숨김 (import 전에 설정해야 함)
+os.environ.setdefault('PYGAME_HIDE_SUPPORT_PROMPT', '1')
+
+import pygame  # noqa: E402
 
 # 상수 정의
 SCREEN_WIDTH = 800
 SCREEN_HEIGHT = 600
-FPS = 60
+FPS = 60  # 시뮬레이션 틱 속도 (이동 속도 상수는 모두 틱당 픽셀)
+RENDER_FPS = 60  # 창 모드 렌더링 프레임 상한 (0이면 제한 없음)
+MAX_CATCHUP_TICKS = 5  # 렌더 프레임 하나에서 따라잡을 최대 틱 수 (넘치는 시간은 버림)
+INTERPOLATION_SNAP = 64  # 한 틱에 이보다 멀리 움직인 스프라이트는 보간하지 않음 (풀 재사용 등)
 
 # 색상 정의
 BLACK = (0, 0, 0)
@@ -28,11 +49,77 @@ BLUE = (0, 100, 255)
 YELLOW = (255, 255, 0)
 CYAN = (0, 255, 255)
 
+# 입력 비트마스크 (렌더링/헤드리스 모드 공통 입력 표현)
+INPUT_LEFT = 1
+INPUT_RIGHT = 2
+INPUT_FIRE = 4
+ACTION_COUNT = 8  # 환경 행동 수 (입력 비트마스크 조합)
+
+# 환경 관측 (요약 값, 화면 픽셀, 축소 흑백, 기호)
+OBS_MODES = ['state', 'pixels', 'gray', 'symbolic']
+OBS_SIZE = (84, 84)  # 축소 흑백 관측 크기 (가로, 세로)
+SYMBOLIC_ENEMIES = 40  # 기호 관측의 엔티티별 최대 칸 수 (적 격자는 최대 5행 x 8열)
+SYMBOLIC_BULLETS = 64
+SYMBOLIC_POWERUPS = 8
+
 # 게임 설정
 PLAYER_SPEED = 5
 BULLET_SPEED = 7
 ENEMY_BULLET_SPEED = 4
 ENEMY_SPEED = 2
+ENEMY_FIRE_DELAY = (2000, 5000)  # 적 발사 간격 범위 (밀리초)
+GRID_CELL_SIZE = 64  # 충돌 검사용 공간 해시 격자 크기 (픽셀)
+GRID_LINEAR_LIMIT = 64  # 스프라이트가 이 수 이하면 격자 없이 rect 목록과 직접 비교
+TARGET_CELL_SIZE = 128  # 유도탄 목표 색인 격자 크기 (픽셀)
+TARGET_BLOCK_SIZE = 16  # 일괄 질의에서 지점을 묶는 칸 크기 (칸 전체의 최근접 적이 하나로 정해지면 지점별 탐색 생략)
+DIRTY_RECT_LIMIT = 400  # dirty rectangle이 이보다 많으면 전체 화면 갱신
+TEXT_CACHE_LIMIT = 256  # HUD 텍스트 캐시 최대 항목 수
+PROFILE_TRACE_LIMIT = 200000  # 프로파일러가 보관하는 최근 trace 이벤트 수
+PROFILE_OVERLAY_INTERVAL = 15  # 프로파일러 오버레이 갱신 간격 (프레임)
+
+# 스트레스 모드 (레벨마다 커지는 절차적 적 웨이브)
+FRAME_BUDGET_MS = 1000 / FPS  # 프레임 시간 예산 (16.6ms)
+STRESS_RAMP = 'exponential'
+STRESS_GROWTH = 0.35  # 적 수 증가율 (발사 빈도는 절반, 속도는 1/4 비율로 증가)
+STRESS_BASE_ENEMIES = 40  # 레벨 1 웨이브 적 수
+STRESS_MAX_ENEMIES = 5000
+STRESS_MAX_FIRE_RATE = 10.0  # 기본 대비 최대 발사 빈도 배율
+STRESS_MAX_SPEED = 6.0
+STRESS_MAX_DIVES = 20  # 초당 최대 급강하 수
+
+# 배경 별 (시차 스크롤)
+STAR_LAYERS = 3  # 별 레이어 수
+STAR_DENSITY = 90  # 화면 전체 별 개수
+STAR_SCROLL_SPEED = 1.5  # 가장 가까운 레이어의 스크롤 속도 (픽셀/프레임)
+
+# 한글 지원 폰트 후보 (macOS, Windows, Linux 순)
+FONT_CANDIDATES = ['AppleSDGothicNeo', 'AppleGothic', 'Malgun Gothic',
+                   'NanumGothic', 'Arial Unicode MS', 'DejaVu Sans']
+FONT_CACHE_VERSION = 1
+
+# 효과음 합성 파라미터 (디스크 캐시 키에도 사용)
+SOUND_EFFECTS = {
+    'shoot': {'duration': 0.1, 'freq': 800, 'sweep': -400, 'volume': 0.3, 'decay': 1.0},
+    'explosion': {'duration': 0.3, 'noise_seed': 1, 'volume': 0.4, 'decay': 1.0},
+    'hit': {'duration': 0.15, 'freq': 1200, 'sweep': -800, 'volume': 0.25, 'decay': 1.0},
+    'game_over': {'duration': 0.5, 'freq': 400, 'sweep': -300, 'volume': 0.3},
+    'level_up': {'duration': 0.3, 'freq': 400, 'sweep': 400, 'volume': 0.25, 'decay': 0.5},
+    'powerup': {'duration': 0.2, 'freq': 600, 'wobble': 200, 'wobble_rate': 8, 'volume': 0.2, 'decay': 0.5},
+}
+SOUND_CACHE_VERSION = 1
+
+# 효과음 믹서 채널 배분: 이름 -> (우선순위, 같은 효과음 최소 재생 간격 ms)
+SOUND_VOICES = {
+    'game_over': (4, 0),
+    'level_up': (3, 0),
+    'explosion': (3, 80),
+    'powerup': (2, 50),
+    'hit': (2, 40),
+    'shoot': (1, 40),
+}
+SOUND_CHANNELS = 8  # 믹서 채널 수
+SOUND_RESERVED_CHANNELS = 2  # 앞쪽 채널은 우선순위가 높은 효과음 전용
+SOUND_RESERVED_PRIORITY = 3  # 예약 채널을 쓸 수 있는 최소 우선순위
 
 # 파워업 타입 - 새로운 시스템
 POWERUP_TYPES = {
@@ -46,6 +133,13 @@ POWERUP_TYPES = {
     'SMART_MISSILE': {'color': (255, 215, 0), 'name': '스마트미사일', 'emoji': '⭐', 'duration': 999},
 }
 
+# 적 격추 시 드롭되는 파워업 타입 (SINGLE 제외)
+DROP_POWERUP_TYPES = [k for k in POWERUP_TYPES.keys() if k != 'SINGLE']
+
+# 스냅샷에서 쓰는 파워업 타입 번호
+POWERUP_NAMES = tuple(POWERUP_TYPES)
+POWERUP_INDEX = {name: index for index, name in enumerate(POWERUP_NAMES)}
+
 # 총알 타입
 BULLET_NORMAL = 0
 BULLET_DOUBLE = 1
@@ -56,6 +150,99 @@ BULLET_MISSILE_TRIPLE = 5
 BULLET_FLAMETHROWER = 6
 BULLET_SMART_MISSILE = 7
 
+# 유도 기능이 있는 총알 타입
+HOMING_TYPES = (BULLET_MISSILE, BULLET_MISSILE_DOUBLE, BULLET_MISSILE_TRIPLE, BULLET_SMART_MISSILE)
+# 유도 강도 (틱마다 속도 벡터에 더하는 목표 방향 단위 벡터의 크기)
+HOMING_STRENGTHS = {BULLET_MISSILE: 0.2, BULLET_MISSILE_DOUBLE: 0.2, BULLET_MISSILE_TRIPLE: 0.2,
+                    BULLET_SMART_MISSILE: 0.3}
+
+# 총알 타입별 발사 위치 (플레이어 중심 기준 x 오프셋, 생성 순서대로)
+SHOT_PATTERNS = {
+    BULLET_NORMAL: (0,),
+    BULLET_DOUBLE: (-10, 10),
+    BULLET_TRIPLE: (0, -15, 15),
+    BULLET_MISSILE: (0,),
+    BULLET_MISSILE_DOUBLE: (-12, 12),
+    BULLET_MISSILE_TRIPLE: (0, -15, 15),
+    BULLET_FLAMETHROWER: (0,),  # 화염방사기: 짧고 넓은 불꽃
+    BULLET_SMART_MISSILE: (0,),
+}
+
+# 총알 엔진 (스프라이트 또는 열 배열)
+BULLET_ENGINE_SPRITE = 'sprite'
+BULLET_ENGINE_SOA = 'soa'
+
+# 리플레이 파일 (헤더 뒤에 (입력 비트마스크, 반복 틱 수) 런 길이 목록)
+REPLAY_MAGIC = b'SWRP'
+REPLAY_VERSION = 2  # 2: 적 편대를 다른 스프라이트보다 먼저 진행
+REPLAY_HEADER = struct.Struct('<4sBBQI16s')  # magic, version, bullet engine, seed, ticks, state digest
+REPLAY_RUN = struct.Struct('<BH')
+REPLAY_ENGINES = [BULLET_ENGINE_SPRITE, BULLET_ENGINE_SOA]
+
+# 게임 상태 저장 (헤더 뒤에 난수 상태, all_sprites 순서의 엔티티 종류, 종류별 레코드 목록)
+STATE_MAGIC = b'SWST'
+STATE_VERSION = 1
+# magic, version, bullet engine, 플래그, seed, 틱, 점수, 생명, 레벨, 획득 파워업 수, 스케줄러 호출 수,
+# 편대 줄/칸 수, 예약 이벤트 수, 발사 판정 대상 수, 열 배열 총알 수 (플레이어, 적)
+STATE_HEADER = struct.Struct('<4sBBBQIIiHIIIIIIII')
+STATE_GAME_OVER = 1
+STATE_STRESS = 2
+STATE_RNG = struct.Struct('<B624IIBd')  # 버전, Mersenne Twister 상태, 위치, gauss_next 유무, gauss_next
+STATE_STRESS_MODE = struct.Struct('<BdII')  # 램프 곡선 번호, 증가율, 기본 적 수, 최대 적 수
+STATE_PLAYER = struct.Struct('<iiiiibB')  # x, y, 마지막 발사, 발사 간격, 파워업 남은 틱, 파워업 번호, 총알 타입
+# x, y, 타입, 속도, 방향, 원래 x, y, 이동 범위, 마지막 발사, 발사 간격, 발사 간격 범위
+STATE_ENEMY = struct.Struct('<iiBdbiiiiiii')
+# x, y, 방향, 타입, 속도, 속도 x, y, 화염 수명, 킬 수, 목표 적 번호, 화염 크기, 색상 번호, 실수 플래그
+STATE_BULLET = struct.Struct('<iibBdddiBiBBB')
+STATE_POWERUP = struct.Struct('<iiB')  # x, y, 파워업 번호
+STATE_EXPLOSION = struct.Struct('<iiBi')  # x, y, 프레임 번호, 마지막 프레임 전환 시각
+# x, y, 속도 x, y, 타입, 너비, 높이, 화염 색상 번호, 플래그, 속도, 화염 수명, 킬 수, 목표 적 번호
+STATE_FIELD_BULLET = struct.Struct('<iiddBBBBBdiBi')
+STATE_LANE = struct.Struct('<iidbi')  # x, 왕복 중심, 속도, 방향, 이동 범위
+STATE_SLOT = struct.Struct('<IIiiiiii')  # 적 번호, 줄 번호, y, 구간, 경로 끝, 구간 틱, 구간 시작 x, y
+STATE_EVENT = struct.Struct('<iBI')  # 예약 틱, 종류, 대상 엔티티 번호 (종류별 목록 기준)
+STATE_EVENT_ARM = 0  # Game.arm_enemy(적)
+STATE_EVENT_EXPLOSION = 1  # Game.advance_explosion(폭발)
+STATE_EVENT_FLAME = 2  # 플레이어 총알 kill() (화염 수명)
+STATE_INDEX = struct.Struct('<I')
+# 레코드 플래그: 속도 값이 실수인지 (리플레이 다이제스트가 int/float 표현을 구분하므로 보존)
+STATE_FLOAT_SPEED = 1
+STATE_FLOAT_SPEED_X = 2
+STATE_FLOAT_SPEED_Y = 4
+STATE_HAS_STATE = 8  # 열 배열 총알의 유도탄/화염 상태 있음
+
+# 스냅샷 서버 (TCP 프레임: <I 본문 길이> + 본문)
+SERVER_PORT = 47800
+SERVER_WRITE_LIMIT = 1 << 20  # 클라이언트 송신 버퍼가 이보다 쌓이면 그 틱 스냅샷은 건너뜀
+SERVER_REPORT_INTERVAL = 5.0  # 서버 통계 출력 간격 (초)
+SERVER_RESTART_TICKS = FPS * 3  # 게임 오버 후 새 게임까지 틱 수
+SNAPSHOT_QUANTUM = 2  # 위치 양자화 단위 (픽셀)
+SNAPSHOT_HISTORY = 64  # 델타 기준으로 쓸 수 있는 최근 스냅샷 수 (id도 이만큼 지나야 재사용)
+SNAPSHOT_NO_BASELINE = 0xFFFFFFFF
+SNAPSHOT_FRAME = struct.Struct('<I')
+SNAPSHOT_HEADER = struct.Struct('<IIIBHBHHH')  # tick, baseline, score, lives, level, game over, 전체/이동/제거 수
+SNAPSHOT_FULL = 'HBBhh'  # id, 종류, 변형, x, y (양자화한 중심 좌표)
+SNAPSHOT_MOVED = 'Hbb'  # id, dx, dy (기준 스냅샷 대비 양자화 좌표 변화)
+SNAPSHOT_REMOVED = 'H'  # id
+CLIENT_MESSAGE = struct.Struct('<IB')  # 마지막으로 적용한 tick (ack), 입력 비트마스크
+
+# 포맷 회귀 검사 (--check-formats): 포맷별 (버전, 레코드 레이아웃). 레이아웃을 바꿀 때는 예전 파일을
+# 잘못 읽지 않도록 버전을 올리고 이 표도 함께 고친다 (스냅샷 프로토콜에는 버전 필드가 없음)
+FORMAT_LAYOUTS = {
+    'replay': (2, ('<4sBBQI16s', '<BH')),
+    'state': (1, ('<4sBBBQIIiHIIIIIIII', '<B624IIBd', '<BdII', '<iiiiibB', '<iiBdbiiiiiii', '<iibBdddiBiBBB',
+                  '<iiB', '<iiBi', '<iiddBBBBBdiBi', '<iidbi', '<IIiiiiii', '<iBI', '<I')),
+    'snapshot': (None, ('<I', '<IIIBHBHHH', 'HBBhh', 'Hbb', 'H', '<IB')),
+}
+
+# 스냅샷 엔티티 종류
+ENTITY_PLAYER = 0
+ENTITY_ENEMY = 1
+ENTITY_PLAYER_BULLET = 2
+ENTITY_ENEMY_BULLET = 3
+ENTITY_POWERUP = 4
+ENTITY_EXPLOSION = 5
+
 # 색상 추가
 ORANGE = (255, 165, 0)
 PURPLE = (255, 0, 255)
@@ -64,142 +251,353 @@ PINK = (255, 100, 100)
 LIGHT_YELLOW = (255, 255, 100)
 LIGHT_CYAN = (128, 255, 255)
 
+# 적 행 색상
+ENEMY_COLORS = [RED, YELLOW, CYAN]
+
+# 적 편대 급강하 경로: 구간별 (dx, dy, 틱 수), 직전 구간 끝 기준 상대 이동 (틱 수 0은 순간 이동)
+# 마지막 구간이 끝나면 DIVE_RETURN_TICKS 동안 편대의 자기 자리로 돌아감
+DIVE_PATHS = [
+    # 왼쪽으로 돌며 내려가 화면 아래로 빠진 뒤 위에서 다시 들어옴
+    [(-20, -30, 10), (-60, 50, 20), (30, 200, 40), (80, 420, 60), (0, -1000, 0)],
+    # 오른쪽으로 같은 경로
+    [(20, -30, 10), (60, 50, 20), (-30, 200, 40), (-80, 420, 60), (0, -1000, 0)],
+    # 곧장 내려갔다 올라옴
+    [(0, -20, 8), (0, 300, 40), (0, -300, 40)],
+]
+DIVE_RETURN_TICKS = 45
+
+# 화염방사기 불꽃 크기/색상 (아틀라스에 미리 그려둠)
+FLAME_MIN_SIZE = 6
+FLAME_MAX_SIZE = 10
+FLAME_COLORS = [
+    (255, 100, 0),   # 주황
+    (255, 150, 0),   # 밝은 주황
+    (255, 50, 0),    # 빨강-주황
+    (255, 200, 0),   # 노랑-주황
+]
+
+# 폭발 애니메이션 프레임 크기
+EXPLOSION_SIZES = range(10, 50, 10)
+
+# 파티클 (폭발 불꽃, 화염 잔불)
+PARTICLE_CAP = 20000  # 살아 있는 파티클 상한 (가까워질수록 새로 방출하는 파티클 수를 줄임)
+PARTICLE_DRAW_LIMIT = 3000  # 한 프레임에 그리는 파티클 상한 (넘으면 일정 간격으로 골라 그림)
+PARTICLE_SIZES = (2, 4, 6)
+PARTICLE_COLORS = [WHITE, YELLOW] + FLAME_COLORS
+PARTICLE_FADE_LEVELS = 4  # 수명에 따라 어두워지는 밝기 단계 수
+PARTICLE_GRAVITY = 0.05  # 틱당 세로 가속도
+EXPLOSION_PARTICLES = 32
+EXPLOSION_PARTICLE_SPEED = (0.5, 4.0)
+EXPLOSION_PARTICLE_LIFE = 30
+EXPLOSION_PARTICLE_COLORS = (0, 1, 2, 3)  # PARTICLE_COLORS 번호
+FLAME_PARTICLES = 3
+FLAME_PARTICLE_SPEED = (0.0, 1.0)
+FLAME_PARTICLE_LIFE = 12
+FLAME_PARTICLE_COLORS = tuple(range(2, len(PARTICLE_COLORS)))
+
+
+def init_pygame(headless=False):
+    """pygame 초기화 (헤드리스 모드는 화면/오디오 없이 더미 드라이버 사용)"""
+    if headless:
+        os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+        os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+        # SIGINT/SIGTERM을 SDL 이벤트로 바꾸지 않음 (배치 실행 작업 프로세스 종료, Ctrl+C 중단)
+        os.environ.setdefault('SDL_NO_SIGNAL_HANDLERS', '1')
+        pygame.display.init()
+        pygame.font.init()
+        return
+
+    pygame.init()
+    try:
+        pygame.mixer.init(frequency=22050, size=-16, channels=2, buffer=512)
+    except pygame.error as e:
+        print(f"오디오 초기화 오류: {e}")
+
+
+def cache_base_dir():
+    """디스크 캐시 최상위 디렉터리"""
+    if os.environ.get('SPACE_WAR_CACHE_DIR'):
+        return os.environ['SPACE_WAR_CACHE_DIR']
+    return os.path.join(os.environ.get('XDG_CACHE_HOME') or os.path.expanduser('~/.cache'), 'space_war')
+
+
+def sound_cache_dir():
+    """효과음 PCM 캐시 디렉터리"""
+    return os.path.join(cache_base_dir(), 'sounds')
+
+
+def font_cache_path():
+    """폰트 경로 캐시 파일"""
+    return os.path.join(cache_base_dir(), 'fonts.json')
+
+
+class SpriteAtlas:
+    """엔티티 서피스 공용 캐시 (아틀라스)
+
+    총알 타입, 적 행 색상, 파워업 타입, 폭발 프레임, 화염 크기/색상별로 한 번만
+    그리고, 화면 모드가 설정되어 있으면 디스플레이 포맷으로 변환해 둔다.
+    모든 인스턴스는 같은 서피스를 참조하므로 이미지를 직접 수정하면 안 된다.
+    """
+
+    def __init__(self):
+        self.surfaces = {}
+        self.flame_keys = {}  # 화염 이미지 -> (크기, 색상) (상태 저장용)
+        self.converted = False
+
+    def prepare(self, surface):
+        """화면 모드가 있으면 디스플레이 포맷으로 변환"""
+        if pygame.display.get_surface() is None:
+            return surface
+        if surface.get_flags() & pygame.SRCALPHA:
+            return surface.convert_alpha()
+        return surface.convert()
+
+    def store(self, key, surface):
+        """렌더링한 서피스를 캐시에 저장"""
+        surface = self.prepare(surface)
+        self.surfaces[key] = surface
+        return surface
+
+    def player(self):
+        """플레이어 이미지"""
+        key = ('player',)
+        surface = self.surfaces.get(key)
+        if surface is None:
+            surface = self.store(key, Player.render_image())
+        return surface
+
+    def enemy(self, color_index):
+        """적 행 색상별 이미지"""
+        key = ('enemy', color_index)
+        surface = self.surfaces.get(key)
+        if surface is None:
+            surface = self.store(key, Enemy.render_image(color_index))
+        return surface
+
+    def bullet(self, bullet_type, direction):
+        """총알 타입별 이미지"""
+        key = ('bullet', bullet_type, direction)
+        surface = self.surfaces.get(key)
+        if surface is None:
+            surface = self.store(key, Bullet.render_image(bullet_type, direction))
+        return surface
+
+    def flame(self, size, color):
+        """화염 불꽃 크기/색상별 이미지"""
+        key = ('flame', size, color)
+        surface = self.surfaces.get(key)
+        if surface is None:
+            surface = self.store(key, Bullet.render_flame(size, color))
+            self.flame_keys[surface] = (size, color)
+        return surface
+
+    def powerup(self, powerup_type):
+        """파워업 타입별 이미지"""
+        key = ('powerup', powerup_type)
+        surface = self.surfaces.get(key)
+        if surface is None:
+            surface = self.store(key, PowerUp.render_image(powerup_type))
+        return surface
+
+    def particles(self):
+        """파티클 스프라이트 표 [밝기 단계 x 변형 수 + 색상 번호 x 크기 수 + 크기 번호] (공유 평면 튜플)"""
+        key = ('particles',)
+        table = self.surfaces.get(key)
+        if table is None:
+            table = tuple(
+                self.prepare(ParticleSystem.render_sprite(size, color, 1 - level / PARTICLE_FADE_LEVELS))
+                for level in range(PARTICLE_FADE_LEVELS) for color in PARTICLE_COLORS for size in PARTICLE_SIZES)
+            self.surfaces[key] = table
+        return table
+
+    def explosion_frames(self):
+        """폭발 애니메이션 프레임 목록 (공유 튜플)"""
+        key = ('explosion',)
+        frames = self.surfaces.get(key)
+        if frames is None:
+            frames = tuple(self.prepare(Explosion.render_frame(size)) for size in EXPLOSION_SIZES)
+            self.surfaces[key] = frames
+        return frames
+
+    def prerender(self):
+        """모든 변형을 미리 그리기 (화면 모드 설정 이후 호출하면 변환까지 수행)"""
+        converted = pygame.display.get_surface() is not None
+        if converted and not self.converted:
+            # 변환 전에 그려둔 서피스는 다시 그림
+            self.surfaces.clear()
+            self.flame_keys.clear()
+        self.converted = converted
+
+        self.player()
+        for color_index in range(len(ENEMY_COLORS)):
+            self.enemy(color_index)
+        for bullet_type in (BULLET_NORMAL, BULLET_DOUBLE, BULLET_TRIPLE, BULLET_MISSILE,
+                            BULLET_MISSILE_DOUBLE, BULLET_MISSILE_TRIPLE, BULLET_SMART_MISSILE):
+            self.bullet(bullet_type, -1)
+        self.bullet(BULLET_NORMAL, 1)
+        for size in range(FLAME_MIN_SIZE, FLAME_MAX_SIZE + 1):
+            for color in FLAME_COLORS:
+                self.flame(size, color)
+        for powerup_type in POWERUP_TYPES:
+            if powerup_type != 'SINGLE':
+                self.powerup(powerup_type)
+        self.explosion_frames()
+        self.particles()
+
+
+# 모든 엔티티가 공유하는 서피스 아틀라스
+ATLAS = SpriteAtlas()
+
 
 class SoundManager:
-    """사운드 관리 클래스"""
+    """사운드 관리 클래스
 
-    def __init__(self):
+    효과음은 SOUND_EFFECTS 파라미터로 버퍼 단위 합성하고, 생성된 PCM 버퍼는
+    믹서 설정과 파라미터를 키로 디스크에 캐시하여 다음 실행부터 mmap으로 불러온다.
+
+    play()는 바로 재생하지 않고 요청만 모아 두며, 틱 끝의 flush()가 한꺼번에 재생한다.
+    같은 틱의 같은 효과음은 한 번만 재생하고, SOUND_VOICES의 최소 간격 안에 다시 요청된
+    효과음은 버린다. 우선순위가 높은 효과음부터 빈 채널을 찾고 (앞쪽 SOUND_RESERVED_CHANNELS개
+    채널은 우선순위가 높은 효과음 전용), 빈 채널이 없으면 우선순위가 같거나 낮은 채널 중 가장
+    오래 재생된 채널을 빼앗는다. 재생/버림 수는 played, dropped (효과음별), drops (이유별)에 센다.
+    """
+
+    def __init__(self, enabled=True, cache_dir=None):
         self.sounds = {}
-        self.create_sounds()
+        self.cache_dir = cache_dir if cache_dir is not None else sound_cache_dir()
+        self.channels = []
+        self.voices = {}  # 채널 번호 -> (우선순위, 재생 시작 ms)
+        self.pending = {}  # 이번 틱에 요청된 효과음 -> 요청 수
+        self.last_played = {}
+        self.played = collections.Counter()
+        self.dropped = collections.Counter()
+        self.drops = collections.Counter()  # 'coalesced', 'rate', 'voices'
+        self.stolen = 0
+        if enabled:
+            self.create_sounds()
+            if self.sounds:
+                self.reserve_channels()
+
+    def mixer_settings(self):
+        """현재 믹서 설정 (주파수, 포맷, 채널 수)"""
+        settings = pygame.mixer.get_init()
+        if not settings:
+            raise pygame.error("mixer not initialized")
+        return settings
+
+    def interleave(self, mono, channels):
+        """모노 샘플을 채널 수만큼 인터리브한 PCM 버퍼 생성"""
+        buf = array.array('h', bytes(2 * len(mono) * channels))
+        for channel in range(channels):
+            buf[channel::channels] = mono
+        return buf
+
+    def synthesize(self, params, sample_rate):
+        """효과음 파라미터로 모노 샘플 버퍼를 한 번에 합성"""
+        n_samples = int(round(params['duration'] * sample_rate))
+        max_sample = 2 ** 14
+        amplitude = max_sample * params['volume']
+        decay = params.get('decay', 0.0)
+        envelope = [amplitude * (1 - i / n_samples * decay) for i in range(n_samples)]
+
+        if 'noise_seed' in params:
+            # 노이즈 기반 (시드 고정으로 캐시 결정성 유지)
+            rng = random.Random(params['noise_seed'])
+            noise = [rng.random() * 2 - 1 for _ in range(n_samples)]
+            return array.array('h', [int(e * v) for e, v in zip(envelope, noise)])
+
+        # 주파수 스윕 + 선택적 떨림(wobble)
+        freq = params['freq']
+        sweep = params.get('sweep', 0)
+        wobble = params.get('wobble', 0)
+        wobble_rate = params.get('wobble_rate', 0)
+        phase_step = 2 * math.pi / sample_rate
+        if wobble:
+            freqs = [freq + math.sin(i / n_samples * math.pi * wobble_rate) * wobble
+                     for i in range(n_samples)]
+        else:
+            freqs = [freq + (i / n_samples) * sweep for i in range(n_samples)]
+        sin = math.sin
+        return array.array('h', [int(envelope[i] * sin(phase_step * freqs[i] * i))
+                                 for i in range(n_samples)])
+
+    def cache_path(self, name, params, settings):
+        """캐시 파일 경로 (믹서 설정과 합성 파라미터로 키 생성)"""
+        key_source = repr((SOUND_CACHE_VERSION, name, sorted(params.items()), settings))
+        key = hashlib.sha1(key_source.encode('utf-8')).hexdigest()[:16]
+        return os.path.join(self.cache_dir, f"{name}-{key}.pcm")
+
+    def load_cached(self, path):
+        """캐시된 PCM 버퍼를 mmap으로 불러오기 (없으면 None)"""
+        try:
+            with open(path, 'rb') as f:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+                    return pygame.mixer.Sound(buffer=buf)
+        except (OSError, ValueError):
+            return None
+
+    def store_cached(self, path, buf):
+        """PCM 버퍼를 캐시에 원자적으로 기록"""
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            with open(tmp_path, 'wb') as f:
+                buf.tofile(f)
+            os.replace(tmp_path, path)
+        except OSError:
+            # 캐시는 선택 사항이므로 기록 실패는 무시
+            pass
+
+    def create_effect(self, name):
+        """효과음 생성 (디스크 캐시 우선)"""
+        params = SOUND_EFFECTS[name]
+        settings = self.mixer_settings()
+        path = self.cache_path(name, params, settings)
+
+        sound = self.load_cached(path)
+        if sound is not None:
+            return sound
+
+        frequency, _, channels = settings
+        buf = self.interleave(self.synthesize(params, frequency), channels)
+        self.store_cached(path, buf)
+        return pygame.mixer.Sound(buffer=buf)
 
     def create_tone(self, frequency, duration, volume=0.1):
         """특정 주파수의 톤 생성"""
-        sample_rate = 22050
+        sample_rate, size, channels = self.mixer_settings()
         n_samples = int(round(duration * sample_rate))
 
         # 사인파 생성
-        buf = array.array('h')
-        max_sample = 2 ** (abs(pygame.mixer.get_init()[1]) - 1) - 1
-        for i in range(n_samples):
-            sample = int(max_sample * volume * math.sin(2 * math.pi * frequency * i / sample_rate))
-            buf.append(sample)
-            buf.append(sample)  # 스테레오
-
-        sound = pygame.mixer.Sound(buffer=buf)
-        return sound
+        max_sample = 2 ** (abs(size) - 1) - 1
+        phase_step = 2 * math.pi * frequency / sample_rate
+        sin = math.sin
+        mono = array.array('h', [int(max_sample * volume * sin(phase_step * i)) for i in range(n_samples)])
+        return pygame.mixer.Sound(buffer=self.interleave(mono, channels))
 
     def create_shoot_sound(self):
         """총알 발사 사운드 생성"""
-        sample_rate = 22050
-        duration = 0.1
-        n_samples = int(round(duration * sample_rate))
-
-        buf = array.array('h')
-        max_sample = 2 ** 14
-
-        for i in range(n_samples):
-            # 주파수가 감소하는 효과
-            freq = 800 - (i / n_samples) * 400
-            volume = 0.3 * (1 - i / n_samples)
-            sample = int(max_sample * volume * math.sin(2 * math.pi * freq * i / sample_rate))
-            buf.append(sample)
-            buf.append(sample)
-
-        return pygame.mixer.Sound(buffer=buf)
+        return self.create_effect('shoot')
 
     def create_explosion_sound(self):
         """폭발 사운드 생성"""
-        sample_rate = 22050
-        duration = 0.3
-        n_samples = int(round(duration * sample_rate))
-
-        buf = array.array('h')
-        max_sample = 2 ** 14
-
-        for i in range(n_samples):
-            # 노이즈 기반 폭발음
-            volume = 0.4 * (1 - i / n_samples)
-            sample = int(max_sample * volume * (random.random() * 2 - 1))
-            buf.append(sample)
-            buf.append(sample)
-
-        return pygame.mixer.Sound(buffer=buf)
+        return self.create_effect('explosion')
 
     def create_hit_sound(self):
         """적 명중 사운드 생성"""
-        sample_rate = 22050
-        duration = 0.15
-        n_samples = int(round(duration * sample_rate))
-
-        buf = array.array('h')
-        max_sample = 2 ** 14
-
-        for i in range(n_samples):
-            freq = 1200 - (i / n_samples) * 800
-            volume = 0.25 * (1 - i / n_samples)
-            sample = int(max_sample * volume * math.sin(2 * math.pi * freq * i / sample_rate))
-            buf.append(sample)
-            buf.append(sample)
-
-        return pygame.mixer.Sound(buffer=buf)
+        return self.create_effect('hit')
 
     def create_game_over_sound(self):
         """게임 오버 사운드 생성"""
-        sample_rate = 22050
-        duration = 0.5
-        n_samples = int(round(duration * sample_rate))
-
-        buf = array.array('h')
-        max_sample = 2 ** 14
-
-        for i in range(n_samples):
-            # 하강하는 톤
-            freq = 400 - (i / n_samples) * 300
-            volume = 0.3
-            sample = int(max_sample * volume * math.sin(2 * math.pi * freq * i / sample_rate))
-            buf.append(sample)
-            buf.append(sample)
-
-        return pygame.mixer.Sound(buffer=buf)
+        return self.create_effect('game_over')
 
     def create_level_up_sound(self):
         """레벨업 사운드 생성"""
-        sample_rate = 22050
-        duration = 0.3
-        n_samples = int(round(duration * sample_rate))
-
-        buf = array.array('h')
-        max_sample = 2 ** 14
-
-        for i in range(n_samples):
-            # 상승하는 톤
-            freq = 400 + (i / n_samples) * 400
-            volume = 0.25 * (1 - i / n_samples * 0.5)
-            sample = int(max_sample * volume * math.sin(2 * math.pi * freq * i / sample_rate))
-            buf.append(sample)
-            buf.append(sample)
-
-        return pygame.mixer.Sound(buffer=buf)
+        return self.create_effect('level_up')
 
     def create_powerup_sound(self):
         """파워업 획득 사운드 생성"""
-        sample_rate = 22050
-        duration = 0.2
-        n_samples = int(round(duration * sample_rate))
-
-        buf = array.array('h')
-        max_sample = 2 ** 14
-
-        for i in range(n_samples):
-            # 상승하는 아르페지오
-            progress = i / n_samples
-            freq = 600 + math.sin(progress * math.pi * 8) * 200
-            volume = 0.2 * (1 - progress * 0.5)
-            sample = int(max_sample * volume * math.sin(2 * math.pi * freq * i / sample_rate))
-            buf.append(sample)
-            buf.append(sample)
-
-        return pygame.mixer.Sound(buffer=buf)
+        return self.create_effect('powerup')
 
     def create_sounds(self):
         """모든 사운드 생성"""
@@ -215,93 +613,253 @@ class SoundManager:
             # 사운드 생성 실패 시 빈 딕셔너리 유지
             self.sounds = {}
 
+    def reserve_channels(self):
+        """믹서 채널 수를 정하고 앞쪽 채널을 예약 (Sound.play()의 자동 배정에서 제외)"""
+        try:
+            pygame.mixer.set_num_channels(SOUND_CHANNELS)
+            pygame.mixer.set_reserved(SOUND_RESERVED_CHANNELS)
+            self.channels = [pygame.mixer.Channel(index) for index in range(SOUND_CHANNELS)]
+        except pygame.error:
+            self.channels = []
+
     def play(self, sound_name):
-        """사운드 재생"""
+        """사운드 재생 요청 (flush()에서 재생)"""
         if sound_name in self.sounds:
+            self.pending[sound_name] = self.pending.get(sound_name, 0) + 1
+
+    def allocate(self, priority):
+        """우선순위에 맞는 채널 고르기
+
+        빈 채널이 없으면 우선순위가 같거나 낮은 채널 중 (우선순위, 재생 시작)이 가장 작은
+        채널을 빼앗고, 그런 채널도 없으면 None을 반환한다.
+        """
+        if priority >= SOUND_RESERVED_PRIORITY:
+            candidates = range(len(self.channels))
+        else:
+            candidates = range(SOUND_RESERVED_CHANNELS, len(self.channels))
+        victim = None
+        for index in candidates:
+            if not self.channels[index].get_busy():
+                return index
+            voice = self.voices.get(index, (0, 0))
+            if voice[0] <= priority and (victim is None or voice < self.voices.get(victim, (0, 0))):
+                victim = index
+        if victim is not None:
+            self.stolen += 1
+        return victim
+
+    def flush(self, now):
+        """이번 틱에 요청된 효과음을 우선순위 순으로 재생"""
+        if not self.pending:
+            return
+        pending = sorted(self.pending.items(), key=lambda item: SOUND_VOICES[item[0]][0], reverse=True)
+        self.pending.clear()
+        for sound_name, count in pending:
+            if count > 1:
+                self.dropped[sound_name] += count - 1
+                self.drops['coalesced'] += count - 1
+
+            priority, interval = SOUND_VOICES[sound_name]
+            last = self.last_played.get(sound_name)
+            if last is not None and 0 <= now - last < interval:
+                self.dropped[sound_name] += 1
+                self.drops['rate'] += 1
+                continue
+
+            index = self.allocate(priority) if self.channels else None
+            if index is None:
+                self.dropped[sound_name] += 1
+                self.drops['voices'] += 1
+                continue
             try:
-                self.sounds[sound_name].play()
-            except:
-                pass
-
-
-class PowerUp(pygame.sprite.Sprite):
+                self.channels[index].play(self.sounds[sound_name])
+            except pygame.error:
+                self.dropped[sound_name] += 1
+                self.drops['voices'] += 1
+                continue
+            self.voices[index] = (priority, now)
+            self.last_played[sound_name] = now
+            self.played[sound_name] += 1
+
+    def stats(self):
+        """효과음 재생 통계"""
+        return {
+            'played': dict(self.played),
+            'dropped': dict(self.dropped),
+            'drops': dict(self.drops),
+            'stolen': self.stolen,
+        }
+
+
+class PooledSprite(pygame.sprite.Sprite):
+    """객체 풀에서 재사용되는 스프라이트 (kill 시 풀로 반환)"""
+
+    pool = None
+    rect = None
+    timer = None  # Scheduler에 예약된 이벤트 (죽으면 취소)
+
+    def kill(self):
+        """모든 그룹에서 제거하고 예약된 이벤트를 취소한 뒤 풀에 반환"""
+        if self.alive():
+            super().kill()
+            if self.timer is not None:
+                Scheduler.cancel(self.timer)
+                self.timer = None
+            if self.pool is not None:
+                self.clear()
+                self.pool.release(self)
+
+    def clear(self):
+        """풀에 반환하기 전에 게임이 소유한 객체 참조 해제
+
+        풀은 프로세스 전체가 공유하므로 반환된 엔티티가 끝난 게임의 그룹이나 색인을
+        붙잡고 있지 않게 한다 (게임 참조가 있는 하위 클래스에서 재정의).
+        """
+
+    def fit_rect(self):
+        """현재 이미지 크기에 맞게 rect 재사용 (없으면 생성)"""
+        if self.rect is None:
+            self.rect = self.image.get_rect()
+        else:
+            self.rect.size = self.image.get_size()
+
+
+class EntityPool:
+    """엔티티 객체 풀
+
+    죽은 엔티티를 reset()으로 초기화해 재사용하여 프레임마다 생기는 객체 생성과
+    가비지 컬렉션을 줄인다.
+    """
+
+    def __init__(self, factory):
+        self.factory = factory
+        self.free = []
+        self.live = 0
+        self.high_water = 0
+        self.allocated = 0
+        self.reused = 0
+
+    def acquire(self, *args, **kwargs):
+        """풀에서 엔티티를 꺼내 초기화 (비어 있으면 새로 생성)"""
+        if self.free:
+            entity = self.free.pop()
+            entity.reset(*args, **kwargs)
+            self.reused += 1
+        else:
+            entity = self.factory(*args, **kwargs)
+            entity.pool = self
+            self.allocated += 1
+
+        self.live += 1
+        if self.live > self.high_water:
+            self.high_water = self.live
+        return entity
+
+    def release(self, entity):
+        """죽은 엔티티를 풀에 반환"""
+        self.live -= 1
+        self.free.append(entity)
+
+    def stats(self):
+        """풀 통계"""
+        return {
+            'live': self.live,
+            'free': len(self.free),
+            'high_water': self.high_water,
+            'allocated': self.allocated,
+            'allocations_avoided': self.reused,
+        }
+
+
+class PowerUp(PooledSprite):
     """파워업 아이템 클래스"""
 
-    def __init__(self, x, y, font=None):
+    def __init__(self, x, y, font=None, rng=random):
         super().__init__()
+        self.reset(x, y, rng)
+
+    def reset(self, x, y, rng=random):
+        """파워업 상태 초기화 (풀 재사용 시 호출)"""
         # 랜덤하게 파워업 타입 선택 (SINGLE 제외)
-        available_types = [k for k in POWERUP_TYPES.keys() if k != 'SINGLE']
-        self.powerup_type = random.choice(available_types)
+        self.powerup_type = rng.choice(DROP_POWERUP_TYPES)
         self.powerup_info = POWERUP_TYPES[self.powerup_type]
 
+        # 공용 아틀라스에 미리 그려둔 이미지 사용
+        self.image = ATLAS.powerup(self.powerup_type)
+
+        self.fit_rect()
+        self.rect.centerx = x
+        self.rect.centery = y
+        self.speed_y = 2
+
+    @staticmethod
+    def render_image(powerup_type):
+        """파워업 이미지 그리기 (아틀라스에서 타입별 1회 호출)"""
         # 배경 원 생성
-        self.image = pygame.Surface((40, 40), pygame.SRCALPHA)
+        image = pygame.Surface((40, 40), pygame.SRCALPHA)
 
         # 배경 원 그리기
-        pygame.draw.circle(self.image, self.powerup_info['color'] + (200,), (20, 20), 18)
-        pygame.draw.circle(self.image, WHITE, (20, 20), 18, 2)
+        pygame.draw.circle(image, POWERUP_TYPES[powerup_type]['color'] + (200,), (20, 20), 18)
+        pygame.draw.circle(image, WHITE, (20, 20), 18, 2)
 
         # 심볼/도형으로 파워업 표시
-        self.draw_powerup_symbol()
+        PowerUp.draw_powerup_symbol(image, powerup_type)
+        return image
 
-        self.rect = self.image.get_rect()
-        self.rect.centerx = x
-        self.rect.centery = y
-        self.speed_y = 2
-
-    def draw_powerup_symbol(self):
+    @staticmethod
+    def draw_powerup_symbol(image, powerup_type):
         """파워업 타입별 심볼 그리기"""
         center_x, center_y = 20, 20
 
-        if self.powerup_type == 'DOUBLE':
+        if powerup_type == 'DOUBLE':
             # 💚 더블샷: 두 개의 작은 원
-            pygame.draw.circle(self.image, WHITE, (center_x - 5, center_y), 4)
-            pygame.draw.circle(self.image, WHITE, (center_x + 5, center_y), 4)
+            pygame.draw.circle(image, WHITE, (center_x - 5, center_y), 4)
+            pygame.draw.circle(image, WHITE, (center_x + 5, center_y), 4)
 
-        elif self.powerup_type == 'TRIPLE':
+        elif powerup_type == 'TRIPLE':
             # 🧡 트리플샷: 세 개의 작은 원
-            pygame.draw.circle(self.image, WHITE, (center_x - 6, center_y), 3)
-            pygame.draw.circle(self.image, WHITE, (center_x, center_y), 3)
-            pygame.draw.circle(self.image, WHITE, (center_x + 6, center_y), 3)
+            pygame.draw.circle(image, WHITE, (center_x - 6, center_y), 3)
+            pygame.draw.circle(image, WHITE, (center_x, center_y), 3)
+            pygame.draw.circle(image, WHITE, (center_x + 6, center_y), 3)
 
-        elif self.powerup_type == 'MISSILE':
+        elif powerup_type == 'MISSILE':
             # 🔴 유도탄: 화살표
-            pygame.draw.polygon(self.image, WHITE, [
+            pygame.draw.polygon(image, WHITE, [
                 (center_x, center_y - 8),
                 (center_x - 6, center_y + 4),
                 (center_x, center_y),
                 (center_x + 6, center_y + 4)
             ])
 
-        elif self.powerup_type == 'MISSILE_DOUBLE':
+        elif powerup_type == 'MISSILE_DOUBLE':
             # 💗 2발 유도탄: 두 개의 작은 화살표
-            pygame.draw.polygon(self.image, WHITE, [
+            pygame.draw.polygon(image, WHITE, [
                 (center_x - 5, center_y - 6),
                 (center_x - 8, center_y + 2),
                 (center_x - 5, center_y),
                 (center_x - 2, center_y + 2)
             ])
-            pygame.draw.polygon(self.image, WHITE, [
+            pygame.draw.polygon(image, WHITE, [
                 (center_x + 5, center_y - 6),
                 (center_x + 2, center_y + 2),
                 (center_x + 5, center_y),
                 (center_x + 8, center_y + 2)
             ])
 
-        elif self.powerup_type == 'MISSILE_TRIPLE':
+        elif powerup_type == 'MISSILE_TRIPLE':
             # 💜 3발 유도탄: 세 개의 작은 화살표
             for i, offset in enumerate([-7, 0, 7]):
-                pygame.draw.polygon(self.image, WHITE, [
+                pygame.draw.polygon(image, WHITE, [
                     (center_x + offset, center_y - 6),
                     (center_x + offset - 3, center_y + 2),
                     (center_x + offset, center_y),
                     (center_x + offset + 3, center_y + 2)
                 ])
 
-        elif self.powerup_type == 'FLAMETHROWER':
+        elif powerup_type == 'FLAMETHROWER':
             # 🔥 화염방사기: 불꽃 모양
             # 외부 불꽃
-            pygame.draw.polygon(self.image, YELLOW, [
+            pygame.draw.polygon(image, YELLOW, [
                 (center_x, center_y - 8),
                 (center_x - 6, center_y + 4),
                 (center_x - 3, center_y),
@@ -310,14 +868,14 @@ class PowerUp(pygame.sprite.Sprite):
                 (center_x + 6, center_y + 4)
             ])
             # 내부 불꽃
-            pygame.draw.polygon(self.image, WHITE, [
+            pygame.draw.polygon(image, WHITE, [
                 (center_x, center_y - 4),
                 (center_x - 3, center_y + 2),
                 (center_x, center_y + 2),
                 (center_x + 3, center_y + 2)
             ])
 
-        elif self.powerup_type == 'SMART_MISSILE':
+        elif powerup_type == 'SMART_MISSILE':
             # ⭐ 스마트미사일: 별 모양
             points = []
             for i in range(10):
@@ -329,10 +887,10 @@ class PowerUp(pygame.sprite.Sprite):
                 px = center_x + math.cos(angle) * radius
                 py = center_y + math.sin(angle) * radius
                 points.append((px, py))
-            pygame.draw.polygon(self.image, YELLOW, points)
-            pygame.draw.polygon(self.image, WHITE, points, 1)
+            pygame.draw.polygon(image, YELLOW, points)
+            pygame.draw.polygon(image, WHITE, points, 1)
 
-    def update(self):
+    def update(self, now=None):
         """파워업 위치 업데이트"""
         self.rect.y += self.speed_y
 
@@ -346,15 +904,7 @@ class Player(pygame.sprite.Sprite):
 
     def __init__(self):
         super().__init__()
-        self.image = pygame.Surface((40, 30))
-        self.image.fill(BLACK)
-
-        # 우주선 모양 그리기 (삼각형)
-        pygame.draw.polygon(self.image, GREEN, [
-            (20, 0),   # 상단 중앙
-            (0, 30),   # 좌하단
-            (40, 30)   # 우하단
-        ])
+        self.image = ATLAS.player()
 
         self.rect = self.image.get_rect()
         self.rect.centerx = SCREEN_WIDTH // 2
@@ -368,16 +918,29 @@ class Player(pygame.sprite.Sprite):
         self.powerup_timer = 0
         self.bullet_type = BULLET_NORMAL
 
-    def update(self):
-        """플레이어 위치 업데이트"""
-        keys = pygame.key.get_pressed()
+    @staticmethod
+    def render_image():
+        """플레이어 우주선 이미지 그리기"""
+        image = pygame.Surface((40, 30))
+        image.fill(BLACK)
 
-        # 좌우 이동
-        if keys[pygame.K_LEFT] and self.rect.left > 0:
+        # 우주선 모양 그리기 (삼각형)
+        pygame.draw.polygon(image, GREEN, [
+            (20, 0),   # 상단 중앙
+            (0, 30),   # 좌하단
+            (40, 30)   # 우하단
+        ])
+        return image
+
+    def move(self, inputs):
+        """입력 비트마스크에 따라 좌우 이동"""
+        if inputs & INPUT_LEFT and self.rect.left > 0:
             self.rect.x -= self.speed
-        if keys[pygame.K_RIGHT] and self.rect.right < SCREEN_WIDTH:
+        if inputs & INPUT_RIGHT and self.rect.right < SCREEN_WIDTH:
             self.rect.x += self.speed
 
+    def update(self, now=None):
+        """플레이어 상태 업데이트"""
         # 파워업 타이머 감소
         if self.powerup_timer > 0:
             self.powerup_timer -= 1
@@ -422,67 +985,37 @@ class Player(pygame.sprite.Sprite):
         if self.current_powerup != 'RAPID':
             self.shoot_delay = 250
 
-    def shoot(self, enemies_group=None):
-        """총알 발사"""
-        now = pygame.time.get_ticks()
+    def ready_to_shoot(self, now=None):
+        """발사 간격이 지났으면 발사 시각을 기록하고 True 반환"""
+        if now is None:
+            now = pygame.time.get_ticks()
         if now - self.last_shot > self.shoot_delay:
             self.last_shot = now
-            bullets = []
-
-            if self.bullet_type == BULLET_NORMAL:
-                bullets.append(Bullet(self.rect.centerx, self.rect.top, -1, BULLET_NORMAL, enemies_group))
-
-            elif self.bullet_type == BULLET_DOUBLE:
-                bullets.append(Bullet(self.rect.centerx - 10, self.rect.top, -1, BULLET_DOUBLE, enemies_group))
-                bullets.append(Bullet(self.rect.centerx + 10, self.rect.top, -1, BULLET_DOUBLE, enemies_group))
+            return True
+        return False
 
-            elif self.bullet_type == BULLET_TRIPLE:
-                bullets.append(Bullet(self.rect.centerx, self.rect.top, -1, BULLET_TRIPLE, enemies_group))
-                bullets.append(Bullet(self.rect.centerx - 15, self.rect.top, -1, BULLET_TRIPLE, enemies_group))
-                bullets.append(Bullet(self.rect.centerx + 15, self.rect.top, -1, BULLET_TRIPLE, enemies_group))
-
-            elif self.bullet_type == BULLET_MISSILE:
-                bullets.append(Bullet(self.rect.centerx, self.rect.top, -1, BULLET_MISSILE, enemies_group))
-
-            elif self.bullet_type == BULLET_MISSILE_DOUBLE:
-                bullets.append(Bullet(self.rect.centerx - 12, self.rect.top, -1, BULLET_MISSILE_DOUBLE, enemies_group))
-                bullets.append(Bullet(self.rect.centerx + 12, self.rect.top, -1, BULLET_MISSILE_DOUBLE, enemies_group))
-
-            elif self.bullet_type == BULLET_MISSILE_TRIPLE:
-                bullets.append(Bullet(self.rect.centerx, self.rect.top, -1, BULLET_MISSILE_TRIPLE, enemies_group))
-                bullets.append(Bullet(self.rect.centerx - 15, self.rect.top, -1, BULLET_MISSILE_TRIPLE, enemies_group))
-                bullets.append(Bullet(self.rect.centerx + 15, self.rect.top, -1, BULLET_MISSILE_TRIPLE, enemies_group))
-
-            elif self.bullet_type == BULLET_FLAMETHROWER:
-                # 화염방사기: 짧고 넓은 불꽃
-                bullets.append(Bullet(self.rect.centerx, self.rect.top, -1, BULLET_FLAMETHROWER, enemies_group))
-
-            elif self.bullet_type == BULLET_SMART_MISSILE:
-                bullets.append(Bullet(self.rect.centerx, self.rect.top, -1, BULLET_SMART_MISSILE, enemies_group))
+    def shoot(self, enemies_group=None, now=None, target_index=None, rng=random):
+        """총알 발사"""
+        if not self.ready_to_shoot(now):
+            return []
 
-            return bullets
-        return []
+        return [BULLET_POOL.acquire(self.rect.centerx + offset, self.rect.top, -1, self.bullet_type,
+                                    enemies_group, target_index, rng)
+                for offset in SHOT_PATTERNS[self.bullet_type]]
 
 
 class Enemy(pygame.sprite.Sprite):
     """적 우주선 클래스"""
 
-    def __init__(self, x, y, enemy_type=0):
+    serials = itertools.count()  # 생성 순서 (발사 판정 순서 유지용)
+
+    def __init__(self, x, y, enemy_type=0, rng=random, fire_delay=ENEMY_FIRE_DELAY):
         super().__init__()
+        self.serial = next(Enemy.serials)
         self.enemy_type = enemy_type
-        self.image = pygame.Surface((30, 30))
-        self.image.fill(BLACK)
-
+        self.rng = rng
         # 적 타입에 따라 색상 변경
-        colors = [RED, YELLOW, CYAN]
-        color = colors[enemy_type % 3]
-
-        # 적 모양 그리기 (역삼각형)
-        pygame.draw.polygon(self.image, color, [
-            (15, 30),  # 하단 중앙
-            (0, 0),    # 좌상단
-            (30, 0)    # 우상단
-        ])
+        self.image = ATLAS.enemy(enemy_type % len(ENEMY_COLORS))
 
         self.rect = self.image.get_rect()
         self.rect.x = x
@@ -493,10 +1026,31 @@ class Enemy(pygame.sprite.Sprite):
         self.original_y = y
         self.move_range = 50
         self.last_shot = 0
-        self.shoot_delay = random.randint(2000, 5000)
+        self.fire_delay = fire_delay
+        self.shoot_delay = rng.randint(*fire_delay)
+        # 편대에 속하면 Formation이 위치를 한꺼번에 갱신
+        self.formation = None
+        self.slot = None
+
+    @staticmethod
+    def render_image(color_index):
+        """적 우주선 이미지 그리기 (행 색상별)"""
+        image = pygame.Surface((30, 30))
+        image.fill(BLACK)
+
+        # 적 모양 그리기 (역삼각형)
+        pygame.draw.polygon(image, ENEMY_COLORS[color_index], [
+            (15, 30),  # 하단 중앙
+            (0, 0),    # 좌상단
+            (30, 0)    # 우상단
+        ])
+        return image
+
+    def update(self, now=None):
+        """적 위치 업데이트 (편대에 속한 적은 Formation.step()이 갱신)"""
+        if self.formation is not None:
+            return
 
-    def update(self):
-        """적 위치 업데이트"""
         # 좌우로 이동
         self.rect.x += self.speed * self.direction
 
@@ -505,86 +1059,468 @@ class Enemy(pygame.sprite.Sprite):
             self.direction *= -1
             self.rect.y += 3  # 아래로 조금 이동 (10 -> 3으로 감소)
 
-    def shoot(self):
-        """총알 발사 (확률적)"""
-        now = pygame.time.get_ticks()
+    def kill(self):
+        """모든 그룹과 편대에서 제거"""
+        super().kill()
+        if self.formation is not None:
+            self.formation.remove(self)
+
+    def ready_to_shoot(self, now=None):
+        """발사 여부 결정 (확률적, 발사하면 다음 발사 간격 갱신)"""
+        if now is None:
+            now = pygame.time.get_ticks()
         if now - self.last_shot > self.shoot_delay:
-            if random.random() < 0.3:  # 30% 확률로 발사
+            if self.rng.random() < 0.3:  # 30% 확률로 발사
                 self.last_shot = now
-                self.shoot_delay = random.randint(2000, 5000)
-                bullet = Bullet(self.rect.centerx, self.rect.bottom, 1, BULLET_NORMAL)
-                return bullet
+                self.shoot_delay = self.rng.randint(*self.fire_delay)
+                return True
+        return False
+
+    def shoot(self, now=None):
+        """총알 발사 (확률적)"""
+        if self.ready_to_shoot(now):
+            bullet = BULLET_POOL.acquire(self.rect.centerx, self.rect.bottom, 1, BULLET_NORMAL, rng=self.rng)
+            return bullet
         return None
 
 
-class Bullet(pygame.sprite.Sprite):
+class Formation:
+    """열 배열 기반 적 편대 컨트롤러
+
+    좌우 왕복 상태(좌표, 왕복 중심, 속도, 방향, 이동 범위)가 같은 칸들은 하나의 줄(lane)로
+    묶어 줄 단위 열 배열에 보관하고 (격자 편대에서는 세로 한 줄), 칸마다는 줄 번호와 세로
+    좌표, 급강하 상태만 보관한다. step() 한 번에 모든 줄을 진행한 뒤 칸의 rect에 반영한다.
+    칸의 움직임은 Enemy.update()와 같다 (중심에서 move_range를 넘으면 방향을 바꾸고
+    3픽셀 내려감, rect 정수 좌표 반올림).
+    급강하 중인 칸은 경로 구간 배열(DIVE_PATHS를 펼친 dx, dy, 틱 수 열)을 따라 움직이고,
+    경로가 끝나면 그동안 계속 움직인 편대의 자기 자리로 돌아온다. 적이 죽으면 칸을
+    제거 표시했다가 다음 step()에서 한꺼번에 정리한다.
+    """
+
+    def __init__(self, paths=DIVE_PATHS):
+        # 경로 구간 열 (경로 p는 segment_dx[path_starts[p]:path_ends[p]])
+        self.segment_dx = array.array('i')
+        self.segment_dy = array.array('i')
+        self.segment_ticks = array.array('i')
+        self.path_starts = []
+        self.path_ends = []
+        for path in paths:
+            self.path_starts.append(len(self.segment_ticks))
+            for dx, dy, ticks in path:
+                self.segment_dx.append(dx)
+                self.segment_dy.append(dy)
+                self.segment_ticks.append(ticks)
+            self.path_ends.append(len(self.segment_ticks))
+        self.clear()
+
+    def clear(self):
+        """모든 칸 제거"""
+        # 칸별 열
+        self.enemies = []
+        self.rects = []
+        self.lanes = []  # 칸이 속한 줄 번호
+        self.ys = []  # 편대 안의 세로 좌표 (급강하 중에도 유지)
+        self.alive = []
+        self.dead = 0
+
+        # 줄별 열
+        self.xs = []
+        self.origin_xs = []
+        self.speeds = []
+        self.directions = []
+        self.ranges = []
+        self.lane_slots = []  # 줄에 속한 칸 번호 목록
+        self.lane_rects = []  # 줄에 속한 칸의 rect 목록
+        self.lane_keys = {}  # 좌우 왕복 상태 -> 줄 번호 (첫 step() 전까지 같은 상태의 칸을 묶음)
+
+        # 급강하 상태 (급강하 중이 아니면 segments가 -1)
+        self.segments = []  # 진행 중인 구간 인덱스 (경로 끝이면 path_ends 값 = 복귀 구간)
+        self.segment_ends = []
+        self.dive_ticks = []  # 현재 구간에서 지난 틱 수
+        self.dive_xs = []  # 현재 구간 시작 좌표
+        self.dive_ys = []
+        self.divers = []  # 급강하 중인 칸 번호
+
+    def __len__(self):
+        return len(self.enemies)
+
+    def add(self, enemy):
+        """적을 편대 칸으로 추가 (현재 위치, 속도, 방향, 이동 범위를 가져옴)"""
+        slot = len(self.enemies)
+        key = (enemy.rect.x, enemy.original_x, enemy.speed, enemy.direction, enemy.move_range)
+        lane = self.lane_keys.get(key)
+        if lane is None:
+            lane = self.lane_keys[key] = len(self.xs)
+            self.xs.append(enemy.rect.x)
+            self.origin_xs.append(enemy.original_x)
+            self.speeds.append(enemy.speed)
+            self.directions.append(enemy.direction)
+            self.ranges.append(enemy.move_range)
+            self.lane_slots.append([])
+            self.lane_rects.append([])
+        self.lane_slots[lane].append(slot)
+        self.lane_rects[lane].append(enemy.rect)
+
+        enemy.formation = self
+        enemy.slot = slot
+        self.enemies.append(enemy)
+        self.rects.append(enemy.rect)
+        self.lanes.append(lane)
+        self.ys.append(enemy.rect.y)
+        self.alive.append(True)
+        self.segments.append(-1)
+        self.segment_ends.append(-1)
+        self.dive_ticks.append(0)
+        self.dive_xs.append(0)
+        self.dive_ys.append(0)
+
+    def remove(self, enemy):
+        """죽은 적의 칸 제거 표시 (compact()에서 실제로 제거)"""
+        if self.alive[enemy.slot]:
+            self.alive[enemy.slot] = False
+            self.dead += 1
+        enemy.formation = None
+
+    def compact(self):
+        """제거 표시된 칸을 열 배열에서 한꺼번에 제거 (빈 줄도 제거)"""
+        if not self.dead:
+            return
+
+        keep = self.alive
+        compress = itertools.compress
+        for name in ('enemies', 'rects', 'lanes', 'ys', 'segments', 'segment_ends', 'dive_ticks',
+                     'dive_xs', 'dive_ys'):
+            setattr(self, name, list(compress(getattr(self, name), keep)))
+        self.alive = [True] * len(self.enemies)
+        self.dead = 0
+
+        # 남은 칸이 있는 줄만 순서대로 다시 번호를 매김
+        used = sorted(set(self.lanes))
+        renumber = {lane: index for index, lane in enumerate(used)}
+        for name in ('xs', 'origin_xs', 'speeds', 'directions', 'ranges'):
+            column = getattr(self, name)
+            setattr(self, name, [column[lane] for lane in used])
+        self.lanes = [renumber[lane] for lane in self.lanes]
+        self.lane_slots = [[] for _ in used]
+        self.lane_rects = [[] for _ in used]
+        for slot, (enemy, lane) in enumerate(zip(self.enemies, self.lanes)):
+            enemy.slot = slot
+            self.lane_slots[lane].append(slot)
+            self.lane_rects[lane].append(enemy.rect)
+        self.lane_keys = {}
+        self.divers = [slot for slot, segment in enumerate(self.segments) if segment >= 0]
+
+    def dive(self, slot, path=0):
+        """칸 하나를 path 경로로 급강하 시작 (이미 급강하 중이면 무시)"""
+        if self.segments[slot] >= 0 or not self.alive[slot]:
+            return False
+        self.segments[slot] = self.path_starts[path]
+        self.segment_ends[slot] = self.path_ends[path]
+        self.dive_ticks[slot] = 0
+        self.dive_xs[slot] = self.rects[slot].x
+        self.dive_ys[slot] = self.rects[slot].y
+        self.divers.append(slot)
+        return True
+
+    def launch(self, count, rng=random):
+        """편대에 남아 있는 칸 중 count개를 골라 임의의 경로로 급강하 (시작한 칸 수 반환)"""
+        waiting = [slot for slot, segment in enumerate(self.segments) if segment < 0 and self.alive[slot]]
+        chosen = rng.sample(waiting, min(count, len(waiting)))
+        for slot in chosen:
+            self.dive(slot, rng.randrange(len(self.path_starts)))
+        return len(chosen)
+
+    def step(self):
+        """한 틱 진행: 편대 전체 좌우 왕복, 급강하 경로 진행, 적 rect 반영"""
+        self.compact()
+        if not self.enemies:
+            return
+        # 움직이기 시작한 줄에는 새 칸을 묶지 않음
+        self.lane_keys = {}
+
+        # 줄 단위 좌우 이동 (pygame.Rect와 같이 0에서 먼 쪽으로 반올림)
+        xs = [int(v + 0.5) if v >= 0 else int(v - 0.5)
+              for v in map(operator.add, self.xs, map(operator.mul, self.speeds, self.directions))]
+        self.xs = xs
+        for rects, x in zip(self.lane_rects, xs):
+            for rect in rects:
+                rect.x = x
+
+        # 범위를 벗어난 줄은 방향 전환 후 아래로 조금 이동
+        turned = [lane for lane, (x, origin, limit) in enumerate(zip(xs, self.origin_xs, self.ranges))
+                  if x - origin > limit or origin - x > limit]
+        if turned:
+            directions, ys, rects, enemies = self.directions, self.ys, self.rects, self.enemies
+            for lane in turned:
+                direction = directions[lane] = -directions[lane]
+                for slot in self.lane_slots[lane]:
+                    enemies[slot].direction = direction
+                    ys[slot] += 3
+                    rects[slot].y = ys[slot]
+
+        if self.divers:
+            self.step_divers()
+
+    def step_divers(self):
+        """급강하 중인 칸을 경로 구간을 따라 한 틱 진행"""
+        segment_dx, segment_dy, segment_ticks = self.segment_dx, self.segment_dy, self.segment_ticks
+        segments, segment_ends, dive_ticks = self.segments, self.segment_ends, self.dive_ticks
+        dive_xs, dive_ys, rects = self.dive_xs, self.dive_ys, self.rects
+        xs, ys, lanes = self.xs, self.ys, self.lanes
+        finished = False
+
+        for slot in self.divers:
+            segment = segments[slot]
+            tick = dive_ticks[slot] + 1
+
+            # 끝난 구간(틱 수 0인 순간 이동 포함)은 다음 구간으로
+            while segment < segment_ends[slot] and tick >= segment_ticks[segment]:
+                tick -= segment_ticks[segment]
+                dive_xs[slot] += segment_dx[segment]
+                dive_ys[slot] += segment_dy[segment]
+                segment += 1
+
+            if segment < segment_ends[slot]:
+                fraction = tick / segment_ticks[segment]
+                x = dive_xs[slot] + segment_dx[segment] * fraction
+                y = dive_ys[slot] + segment_dy[segment] * fraction
+            else:
+                # 복귀 구간: 편대의 현재 자리로
+                fraction = min(tick / DIVE_RETURN_TICKS, 1.0)
+                x = dive_xs[slot] + (xs[lanes[slot]] - dive_xs[slot]) * fraction
+                y = dive_ys[slot] + (ys[slot] - dive_ys[slot]) * fraction
+                if tick >= DIVE_RETURN_TICKS:
+                    segment = -1
+                    finished = True
+
+            segments[slot] = segment
+            dive_ticks[slot] = tick
+            rects[slot].topleft = (round(x), round(y))
+
+        if finished:
+            self.divers = [slot for slot in self.divers if segments[slot] >= 0]
+
+
+def ramp_linear(level, growth):
+    """레벨마다 growth씩 일정하게 증가하는 배율"""
+    return 1 + growth * (level - 1)
+
+
+def ramp_quadratic(level, growth):
+    """레벨의 제곱에 비례해 증가하는 배율"""
+    return 1 + growth * (level - 1) ** 2
+
+
+def ramp_exponential(level, growth):
+    """레벨마다 (1 + growth)배씩 증가하는 배율"""
+    return (1 + growth) ** (level - 1)
+
+
+# 스트레스 모드 램프 곡선 (이름 -> 곡선(레벨, 증가율), 레벨 1에서 1)
+RAMP_CURVES = {
+    'linear': ramp_linear,
+    'quadratic': ramp_quadratic,
+    'exponential': ramp_exponential,
+}
+
+
+class StressMode:
+    """끝없는 스트레스 모드 웨이브 생성기
+
+    웨이브의 적 수, 발사 빈도, 이동 속도를 레벨 1 기준값 x 램프 곡선(레벨, 증가율)으로
+    키우고 각 상한에서 멈춘다. 발사 빈도와 속도는 적 수보다 완만하게(증가율의 1/2,
+    1/4) 늘어난다. 편대의 가로세로 비는 게임 난수로 정하므로 같은 시드면 같은 웨이브가
+    만들어진다.
+    """
+
+    def __init__(self, ramp=STRESS_RAMP, growth=STRESS_GROWTH, base_enemies=STRESS_BASE_ENEMIES,
+                 max_enemies=STRESS_MAX_ENEMIES):
+        if ramp not in RAMP_CURVES:
+            raise ValueError(f"unknown ramp curve: {ramp!r} (expected one of {', '.join(RAMP_CURVES)})")
+        self.ramp = ramp
+        self.curve = RAMP_CURVES[ramp]
+        self.growth = growth
+        self.base_enemies = base_enemies
+        self.max_enemies = max_enemies
+
+    def enemy_count(self, level):
+        """레벨의 웨이브 적 수"""
+        return max(1, min(int(self.base_enemies * self.curve(level, self.growth)), self.max_enemies))
+
+    def fire_rate(self, level):
+        """레벨의 기본 대비 발사 빈도 배율"""
+        return min(self.curve(level, self.growth / 2), STRESS_MAX_FIRE_RATE)
+
+    def speed(self, level):
+        """레벨의 적 이동 속도"""
+        return min(ENEMY_SPEED * self.curve(level, self.growth / 4), STRESS_MAX_SPEED)
+
+    def dives(self, level):
+        """레벨의 초당 급강하 수"""
+        return min(level // 2, STRESS_MAX_DIVES)
+
+    def wave(self, level, rng=random):
+        """레벨의 웨이브 배치 (Game.spawn_enemies() 인자 dict)
+
+        적 수를 가로세로 비가 임의인 격자로 배치하고 화면 위쪽 절반에 들어가도록 간격을
+        좁힌다 (적이 많으면 서로 겹침). 격자를 채우므로 실제 적 수는 행 단위로 올림된다.
+        """
+        count = self.enemy_count(level)
+        aspect = rng.uniform(1.5, 4.0)  # 가로 / 세로
+        cols = max(1, min(count, round(math.sqrt(count * aspect))))
+        rows = -(-count // cols)
+        spacing = (max(1, min(80, (SCREEN_WIDTH - 160) // max(cols - 1, 1))),
+                   max(1, min(60, (SCREEN_HEIGHT // 2 - 50) // max(rows - 1, 1))))
+        rate = self.fire_rate(level)
+        return {
+            'rows': rows,
+            'cols': cols,
+            'spacing': spacing,
+            'origin': ((SCREEN_WIDTH - 30 - spacing[0] * (cols - 1)) // 2, 50),
+            'speed': self.speed(level),
+            'fire_delay': (int(ENEMY_FIRE_DELAY[0] / rate), int(ENEMY_FIRE_DELAY[1] / rate)),
+        }
+
+
+def bullet_params(bullet_type, direction, rng=random):
+    """총알 타입별 초기 설정 (image, speed, speed_x, speed_y, lifetime)"""
+    lifetime = 0  # 화염방사기용
+
+    if bullet_type == BULLET_NORMAL:
+        image = ATLAS.bullet(bullet_type, direction)
+        speed = -BULLET_SPEED if direction == -1 else ENEMY_BULLET_SPEED
+        speed_x = 0
+        speed_y = speed
+
+    elif bullet_type == BULLET_DOUBLE or bullet_type == BULLET_TRIPLE:
+        image = ATLAS.bullet(bullet_type, direction)
+        speed = -BULLET_SPEED if direction == -1 else ENEMY_BULLET_SPEED
+        speed_x = 0
+        speed_y = speed
+
+    elif bullet_type in [BULLET_MISSILE, BULLET_MISSILE_DOUBLE, BULLET_MISSILE_TRIPLE]:
+        # 유도탄
+        image = ATLAS.bullet(bullet_type, direction)
+        speed = 5
+        speed_x = 0
+        speed_y = -speed if direction == -1 else speed
+
+    elif bullet_type == BULLET_FLAMETHROWER:
+        # 화염방사기: 작고 짧은 불꽃
+        size = rng.randint(FLAME_MIN_SIZE, FLAME_MAX_SIZE)
+        color = rng.choice(FLAME_COLORS)
+        image = ATLAS.flame(size, color)
+        speed = -BULLET_SPEED * 1.2
+        speed_x = rng.uniform(-1, 1)
+        speed_y = speed
+        lifetime = rng.randint(15, 25)  # 짧은 수명
+
+    elif bullet_type == BULLET_SMART_MISSILE:
+        # 스마트 미사일: 5킬까지 추적
+        image = ATLAS.bullet(bullet_type, direction)
+        speed = 6
+        speed_x = 0
+        speed_y = -speed
+
+    else:
+        raise ValueError(f"unknown bullet type: {bullet_type}")
+
+    return image, speed, speed_x, speed_y, lifetime
+
+
+def steer_homing(bullet_type, x, y, speed_x, speed_y, speed, target):
+    """유도탄 속도 벡터를 (x, y)에서 목표 방향으로 조정해 (speed_x, speed_y) 반환"""
+    # 타겟 방향 계산
+    dx = target.rect.centerx - x
+    dy = target.rect.centery - y
+    distance = math.sqrt(dx**2 + dy**2)
+
+    if distance > 0:
+        # 유도 강도
+        homing_strength = HOMING_STRENGTHS[bullet_type]
+
+        # 속도 벡터 조정
+        speed_x += (dx / distance) * homing_strength
+        speed_y += (dy / distance) * homing_strength
+
+        # 속도 정규화
+        speed_magnitude = math.sqrt(speed_x**2 + speed_y**2)
+        if speed_magnitude > speed:
+            speed_x = (speed_x / speed_magnitude) * speed
+            speed_y = (speed_y / speed_magnitude) * speed
+
+    return speed_x, speed_y
+
+
+class Bullet(PooledSprite):
     """총알 클래스"""
 
-    def __init__(self, x, y, direction, bullet_type=BULLET_NORMAL, enemies_group=None):
+    def __init__(self, x, y, direction, bullet_type=BULLET_NORMAL, enemies_group=None, target_index=None,
+                 rng=random):
         super().__init__()
+        self.reset(x, y, direction, bullet_type, enemies_group, target_index, rng)
+
+    def reset(self, x, y, direction, bullet_type=BULLET_NORMAL, enemies_group=None, target_index=None,
+              rng=random):
+        """총알 상태 초기화 (풀 재사용 시 호출)"""
         self.bullet_type = bullet_type
         self.direction = direction
         self.enemies_group = enemies_group
+        self.target_index = target_index  # 프레임 공용 최근접 적 색인
         self.target = None
         self.kill_count = 0  # 스마트 미사일용
-        self.lifetime = 0  # 화염방사기용
 
         # 총알 타입별 설정
+        self.image, self.speed, self.speed_x, self.speed_y, self.lifetime = bullet_params(bullet_type, direction, rng)
+
+        self.fit_rect()
+        self.rect.centerx = x
+        self.rect.centery = y
+
+    def clear(self):
+        """적 그룹, 최근접 적 색인, 추적 대상 참조 해제"""
+        self.enemies_group = None
+        self.target_index = None
+        self.target = None
+
+    @staticmethod
+    def render_image(bullet_type, direction):
+        """총알 타입별 이미지 그리기 (화염 제외)"""
         if bullet_type == BULLET_NORMAL:
-            self.image = pygame.Surface((4, 10))
-            self.image.fill(CYAN if direction == -1 else RED)
-            self.speed = -BULLET_SPEED if direction == -1 else ENEMY_BULLET_SPEED
-            self.speed_x = 0
-            self.speed_y = self.speed
+            image = pygame.Surface((4, 10))
+            image.fill(CYAN if direction == -1 else RED)
 
         elif bullet_type == BULLET_DOUBLE or bullet_type == BULLET_TRIPLE:
-            self.image = pygame.Surface((5, 12))
-            self.image.fill(ORANGE)
-            self.speed = -BULLET_SPEED if direction == -1 else ENEMY_BULLET_SPEED
-            self.speed_x = 0
-            self.speed_y = self.speed
+            image = pygame.Surface((5, 12))
+            image.fill(ORANGE)
 
         elif bullet_type in [BULLET_MISSILE, BULLET_MISSILE_DOUBLE, BULLET_MISSILE_TRIPLE]:
-            # 유도탄
-            self.image = pygame.Surface((8, 14), pygame.SRCALPHA)
-            pygame.draw.polygon(self.image, RED, [(4, 0), (0, 14), (8, 14)])
-            pygame.draw.circle(self.image, YELLOW, (4, 10), 2)
-            self.speed = 5
-            self.speed_x = 0
-            self.speed_y = -self.speed if direction == -1 else self.speed
-
-        elif bullet_type == BULLET_FLAMETHROWER:
-            # 화염방사기: 작고 짧은 불꽃
-            size = random.randint(6, 10)
-            self.image = pygame.Surface((size, size), pygame.SRCALPHA)
-            color = random.choice([
-                (255, 100, 0),   # 주황
-                (255, 150, 0),   # 밝은 주황
-                (255, 50, 0),    # 빨강-주황
-                (255, 200, 0),   # 노랑-주황
-            ])
-            pygame.draw.circle(self.image, color, (size//2, size//2), size//2)
-            self.speed = -BULLET_SPEED * 1.2
-            self.speed_x = random.uniform(-1, 1)
-            self.speed_y = self.speed
-            self.lifetime = random.randint(15, 25)  # 짧은 수명
+            image = pygame.Surface((8, 14), pygame.SRCALPHA)
+            pygame.draw.polygon(image, RED, [(4, 0), (0, 14), (8, 14)])
+            pygame.draw.circle(image, YELLOW, (4, 10), 2)
 
         elif bullet_type == BULLET_SMART_MISSILE:
-            # 스마트 미사일: 5킬까지 추적
-            self.image = pygame.Surface((12, 18), pygame.SRCALPHA)
-            pygame.draw.polygon(self.image, (255, 215, 0), [(6, 0), (0, 18), (12, 18)])
-            pygame.draw.circle(self.image, WHITE, (6, 12), 3)
-            pygame.draw.circle(self.image, RED, (6, 12), 2)
-            self.speed = 6
-            self.speed_x = 0
-            self.speed_y = -self.speed
-
-        self.rect = self.image.get_rect()
-        self.rect.centerx = x
-        self.rect.centery = y
+            image = pygame.Surface((12, 18), pygame.SRCALPHA)
+            pygame.draw.polygon(image, (255, 215, 0), [(6, 0), (0, 18), (12, 18)])
+            pygame.draw.circle(image, WHITE, (6, 12), 3)
+            pygame.draw.circle(image, RED, (6, 12), 2)
+
+        else:
+            raise ValueError(f"unknown bullet type: {bullet_type}")
+        return image
+
+    @staticmethod
+    def render_flame(size, color):
+        """화염 불꽃 이미지 그리기 (크기/색상별)"""
+        image = pygame.Surface((size, size), pygame.SRCALPHA)
+        pygame.draw.circle(image, color, (size//2, size//2), size//2)
+        return image
 
     def find_nearest_enemy(self):
         """가장 가까운 적 찾기"""
+        if self.target_index is not None:
+            return self.target_index.nearest(self.rect.centerx, self.rect.centery)
+
         if not self.enemies_group or len(self.enemies_group) == 0:
             return None
 
@@ -602,34 +1538,21 @@ class Bullet(pygame.sprite.Sprite):
 
         return nearest
 
-    def update(self):
+    def update(self, now=None):
         """총알 위치 업데이트"""
         # 유도탄 AI
-        if self.bullet_type in [BULLET_MISSILE, BULLET_MISSILE_DOUBLE, BULLET_MISSILE_TRIPLE, BULLET_SMART_MISSILE]:
-            target = self.find_nearest_enemy()
-
-            if target:
-                # 타겟 방향 계산
-                dx = target.rect.centerx - self.rect.centerx
-                dy = target.rect.centery - self.rect.centery
-                distance = math.sqrt(dx**2 + dy**2)
-
-                if distance > 0:
-                    # 유도 강도
-                    homing_strength = 0.3 if self.bullet_type == BULLET_SMART_MISSILE else 0.2
-
-                    # 속도 벡터 조정
-                    self.speed_x += (dx / distance) * homing_strength
-                    self.speed_y += (dy / distance) * homing_strength
-
-                    # 속도 정규화
-                    speed_magnitude = math.sqrt(self.speed_x**2 + self.speed_y**2)
-                    if speed_magnitude > self.speed:
-                        self.speed_x = (self.speed_x / speed_magnitude) * self.speed
-                        self.speed_y = (self.speed_y / speed_magnitude) * self.speed
-
-        # 화염방사기 수명 감소
-        if self.bullet_type == BULLET_FLAMETHROWER:
+        if self.bullet_type in HOMING_TYPES:
+            # 목표가 죽기 전까지는 같은 목표를 계속 추적
+            if self.target is None or not self.target.alive():
+                self.target = self.find_nearest_enemy()
+
+            if self.target:
+                self.speed_x, self.speed_y = steer_homing(
+                    self.bullet_type, self.rect.centerx, self.rect.centery,
+                    self.speed_x, self.speed_y, self.speed, self.target)
+
+        # 화염방사기 수명 감소 (Scheduler에 만료를 예약한 총알은 제외)
+        if self.bullet_type == BULLET_FLAMETHROWER and self.timer is None:
             self.lifetime -= 1
             if self.lifetime <= 0:
                 self.kill()
@@ -646,75 +1569,1102 @@ class Bullet(pygame.sprite.Sprite):
             self.kill()
 
 
-class Explosion(pygame.sprite.Sprite):
+class Explosion(PooledSprite):
     """폭발 효과 클래스"""
 
-    def __init__(self, x, y):
+    def __init__(self, x, y, now=None):
         super().__init__()
-        self.images = []
+        self.reset(x, y, now)
 
-        # 폭발 애니메이션 프레임 생성
-        for size in range(10, 50, 10):
-            image = pygame.Surface((size, size))
-            image.fill(BLACK)
-            pygame.draw.circle(image, YELLOW, (size//2, size//2), size//2)
-            self.images.append(image)
+    def reset(self, x, y, now=None):
+        """폭발 상태 초기화 (풀 재사용 시 호출)"""
+        # 공용 아틀라스의 폭발 애니메이션 프레임
+        self.images = ATLAS.explosion_frames()
 
         self.index = 0
         self.image = self.images[self.index]
-        self.rect = self.image.get_rect()
+        self.fit_rect()
         self.rect.center = (x, y)
-        self.last_update = pygame.time.get_ticks()
+        self.last_update = pygame.time.get_ticks() if now is None else now
         self.frame_rate = 50
 
-    def update(self):
-        """폭발 애니메이션 업데이트"""
-        now = pygame.time.get_ticks()
+    @staticmethod
+    def render_frame(size):
+        """폭발 애니메이션 프레임 그리기"""
+        image = pygame.Surface((size, size))
+        image.fill(BLACK)
+        pygame.draw.circle(image, YELLOW, (size//2, size//2), size//2)
+        return image
+
+    def update(self, now=None):
+        """폭발 애니메이션 업데이트 (Scheduler에 예약된 폭발은 예약 시각에 advance())"""
+        if self.timer is not None:
+            return
+        if now is None:
+            now = pygame.time.get_ticks()
         if now - self.last_update > self.frame_rate:
-            self.last_update = now
-            self.index += 1
+            self.advance(now)
+
+    def advance(self, now):
+        """다음 애니메이션 프레임으로 (마지막 프레임이 끝나면 제거, 살아 있으면 True)"""
+        self.last_update = now
+        self.index += 1
+
+        if self.index < len(self.images):
+            self.image = self.images[self.index]
+            center = self.rect.center
+            self.rect.size = self.image.get_size()
+            self.rect.center = center
+            return True
+        self.kill()
+        return False
+
+
+def take(column, indices):
+    """column에서 indices 위치의 값 튜플 (operator.itemgetter로 한 번에 모음)"""
+    if len(indices) > 1:
+        return operator.itemgetter(*indices)(column)
+    return tuple(column[index] for index in indices)
+
+
+class BulletField:
+    """열 배열(struct-of-arrays) 기반 총알 엔진
+
+    총알마다 스프라이트 객체를 두지 않고 위치, 속도, 타입, 크기를 열 단위 리스트로
+    보관한다. 이동, 수명 만료, 화면 밖 제거는 모든 총알에 대해 한꺼번에 처리한다.
+    유도탄과 화염처럼 상태가 있는 총알은 states 열에 [speed, lifetime, kill_count, target]을
+    두고 homing_slots, flame_slots 인덱스 목록으로 모아 그 열만 처리한다 (유도 계산도 열 단위).
+    타입별 동작(유도, 화염 수명, 스마트 미사일 킬 수, rect 정수 좌표 반올림)은 Bullet과 같다.
+    """
+
+    def __init__(self, target_index=None):
+        self.target_index = target_index
+        self.clear()
+
+    def clear(self):
+        """모든 총알 제거"""
+        self.xs = []  # rect.left
+        self.ys = []  # rect.top
+        self.speed_xs = []
+        self.speed_ys = []
+        self.types = []
+        self.widths = []
+        self.heights = []
+        self.images = []
+        self.states = []  # 유도탄/화염만 [speed, lifetime, kill_count, target], 나머지는 None
+        self.alive = []
+        self.dead = 0
+        self.homing_slots = []  # 유도탄 인덱스 (오름차순)
+        self.flame_slots = []  # 화염 인덱스 (오름차순)
+        self.max_height = 0
+
+    def __len__(self):
+        return len(self.xs)
+
+    def spawn(self, x, y, direction, bullet_type=BULLET_NORMAL, rng=random):
+        """(x, y)를 중심으로 총알 생성"""
+        image, speed, speed_x, speed_y, lifetime = bullet_params(bullet_type, direction, rng)
+        width, height = image.get_size()
+
+        self.xs.append(x - width // 2)
+        self.ys.append(y - height // 2)
+        self.speed_xs.append(speed_x)
+        self.speed_ys.append(speed_y)
+        self.types.append(bullet_type)
+        self.widths.append(width)
+        self.heights.append(height)
+        self.images.append(image)
+        self.alive.append(True)
+        if height > self.max_height:
+            self.max_height = height
+
+        if bullet_type in HOMING_TYPES or lifetime:
+            self.states.append([speed, lifetime, 0, None])
+            if lifetime:
+                self.flame_slots.append(len(self.xs) - 1)
+            else:
+                self.homing_slots.append(len(self.xs) - 1)
+        else:
+            self.states.append(None)
+
+    def kill(self, index):
+        """총알 제거 표시 (compact()에서 실제로 제거)"""
+        if self.alive[index]:
+            self.alive[index] = False
+            self.dead += 1
+
+    def steer(self):
+        """유도탄 조향 (목표가 죽기 전까지는 같은 목표 유지)
+
+        유도탄 열(homing_slots)만 한꺼번에 모아 중심 좌표를 계산하고, 목표를 잃은 유도탄은
+        최근접 적 색인 한 번의 일괄 질의로 다시 찾은 뒤, steer_homing()과 같은 연산 순서로
+        속도 열을 한 번 순회하며 조향한다.
+        """
+        add, floordiv, repeat = operator.add, operator.floordiv, itertools.repeat
+        slots = self.homing_slots
+        states = take(self.states, slots)
+        center_xs = list(map(add, take(self.xs, slots), map(floordiv, take(self.widths, slots), repeat(2))))
+        center_ys = list(map(add, take(self.ys, slots), map(floordiv, take(self.heights, slots), repeat(2))))
+
+        # 목표를 잃은 유도탄만 모아 최근접 적 다시 찾기
+        targets = [state[3] for state in states]
+        lost = [row for row, target in enumerate(targets) if target is None or not target.alive()]
+        if lost:
+            if self.target_index is not None:
+                found = self.target_index.nearest_many(list(zip(take(center_xs, lost), take(center_ys, lost))))
+            else:
+                found = [None] * len(lost)
+            for row, target in zip(lost, found):
+                states[row][3] = targets[row] = target
+
+        # 조향: steer_homing()과 같은 식을 한 번의 열 순회로 계산 (유도탄마다 함수 호출 없음)
+        sqrt = math.sqrt
+        speed_xs, speed_ys = self.speed_xs, self.speed_ys
+        strengths = map(HOMING_STRENGTHS.__getitem__, take(self.types, slots))
+        for index, x, y, target, state, speed_x, speed_y, strength in zip(
+                slots, center_xs, center_ys, targets, states, take(speed_xs, slots), take(speed_ys, slots),
+                strengths):
+            if target is None:
+                continue
+            rect = target.rect
+            dx = rect.centerx - x
+            dy = rect.centery - y
+            distance = sqrt(dx**2 + dy**2)
+            if distance > 0:
+                speed_x += (dx / distance) * strength
+                speed_y += (dy / distance) * strength
+                speed = state[0]
+                speed_magnitude = sqrt(speed_x**2 + speed_y**2)
+                if speed_magnitude > speed:
+                    speed_x = (speed_x / speed_magnitude) * speed
+                    speed_y = (speed_y / speed_magnitude) * speed
+                speed_xs[index] = speed_x
+                speed_ys[index] = speed_y
+
+    def expire(self):
+        """화염방사기 수명 감소 (수명이 다한 총알은 제거 표시)"""
+        alive = self.alive
+        for index, state in zip(self.flame_slots, take(self.states, self.flame_slots)):
+            if state[1] > 0:
+                state[1] -= 1
+                if state[1] <= 0:
+                    alive[index] = False
+
+    def step(self):
+        """한 틱 진행: 유도, 수명 감소, 이동, 화면 밖 제거"""
+        if not self.xs:
+            return
+
+        if self.homing_slots:
+            self.steer()
+        if self.flame_slots:
+            self.expire()
+
+        # 위치 업데이트: 일반 총알은 정수 속도로 세로 이동만 하고, 유도탄과 화염은 실수 속도로
+        # 움직인 뒤 pygame.Rect와 같이 0에서 먼 쪽으로 반올림
+        self.ys = list(map(operator.add, self.ys, self.speed_ys))
+        moving = self.homing_slots + self.flame_slots
+        if moving:
+            xs, ys = self.xs, self.ys
+            for index, x, y in zip(moving, map(operator.add, take(xs, moving), take(self.speed_xs, moving)),
+                                   take(ys, moving)):
+                xs[index] = int(x + 0.5) if x >= 0 else int(x - 0.5)
+                ys[index] = int(y + 0.5) if y >= 0 else int(y - 0.5)
+
+        # 화면을 벗어나면 제거
+        height = SCREEN_HEIGHT
+        width = SCREEN_WIDTH
+        inside = [-h <= y <= height and -w <= x <= width
+                  for x, y, w, h in zip(self.xs, self.ys, self.widths, self.heights)]
+        if self.flame_slots:
+            inside = list(map(operator.and_, inside, self.alive))
+        self.alive = inside
+        self.dead = inside.count(False)
+        self.compact()
+
+    def compact(self):
+        """제거 표시된 총알을 열 배열에서 한꺼번에 제거"""
+        if not self.dead:
+            return
+
+        keep = self.alive
+        compress = itertools.compress
+        self.xs = list(compress(self.xs, keep))
+        self.ys = list(compress(self.ys, keep))
+        self.speed_xs = list(compress(self.speed_xs, keep))
+        self.speed_ys = list(compress(self.speed_ys, keep))
+        self.types = list(compress(self.types, keep))
+        self.widths = list(compress(self.widths, keep))
+        self.heights = list(compress(self.heights, keep))
+        self.images = list(compress(self.images, keep))
+        self.alive = [True] * len(self.xs)
+        self.dead = 0
+
+        if self.homing_slots or self.flame_slots:
+            self.states = list(compress(self.states, keep))
+            # 남은 총알의 새 인덱스 = 앞쪽에 남은 총알 수 - 1
+            ranks = list(itertools.accumulate(keep))
+            self.homing_slots = [ranks[index] - 1 for index in self.homing_slots if keep[index]]
+            self.flame_slots = [ranks[index] - 1 for index in self.flame_slots if keep[index]]
+        else:
+            self.states = [None] * len(self.xs)
+
+    def overlapping(self, rect):
+        """rect와 겹치는 살아있는 총알 인덱스 (생성 순서대로)"""
+        left, top, right, bottom = rect.left, rect.top, rect.right, rect.bottom
+
+        # 세로 범위로 먼저 거른 뒤 정확히 판정
+        low = top - self.max_height
+        band = [index for index, y in enumerate(self.ys) if low < y < bottom]
+        xs, ys, widths, heights, alive = self.xs, self.ys, self.widths, self.heights, self.alive
+        return [index for index in band
+                if alive[index] and xs[index] < right and xs[index] + widths[index] > left
+                and ys[index] + heights[index] > top]
+
+    def kill_count(self, index):
+        """스마트 미사일 킬 수 증가 후 현재 킬 수 반환"""
+        state = self.states[index]
+        state[2] += 1
+        return state[2]
+
+    def rect(self, index):
+        """총알의 rect"""
+        return pygame.Rect(self.xs[index], self.ys[index], self.widths[index], self.heights[index])
+
+    def rects(self):
+        """살아있는 모든 총알의 rect 목록"""
+        return [pygame.Rect(x, y, w, h) for x, y, w, h in zip(self.xs, self.ys, self.widths, self.heights)]
+
+    def blit_items(self):
+        """Surface.blits()용 (이미지, 위치) 목록"""
+        return list(zip(self.images, zip(self.xs, self.ys)))
+
+    def interpolated_items(self, alpha):
+        """직전 틱과 현재 틱 사이 alpha 지점의 (이미지, 위치) 목록
+
+        인덱스가 compact()로 바뀌므로 직전 위치는 저장하지 않고 속도로 되짚는다.
+        """
+        back = alpha - 1.0
+        return [(image, (round(x + speed_x * back), round(y + speed_y * back)))
+                for image, x, y, speed_x, speed_y
+                in zip(self.images, self.xs, self.ys, self.speed_xs, self.speed_ys)]
+
+
+class ParticleSystem:
+    """열 배열 기반 파티클 시스템 (폭발 불꽃, 화염 잔불)
+
+    파티클마다 시작 위치, 속도, 생성 시각, 밝기 감소율(수명), 중력, 스프라이트 번호(색상과
+    크기)를 array 열에 방출 순서대로 연속해서 보관한다. 위치는 틱마다 적분하지 않고 그릴 때
+    시작 위치 + 속도 x 경과 시간 (+ 중력 낙하)으로 모든 파티클을 한꺼번에 계산하므로, 시간이
+    흐를 때 드는 비용은 수명이 다한 방출 구간을 잘라내는 것뿐이다 (이어진 구간은 array 구간
+    삭제 한 번). 스프라이트는 색상/크기/밝기 단계별로 아틀라스에 미리 그려 두고 가산
+    혼합(BLEND_ADD)으로 그린다 (검은 바탕은 보이지 않고 겹치는 곳은 밝아짐). 시계는 그리는
+    쪽에서 advance()로 진행한다.
+
+    살아 있는 파티클이 cap에 가까워질수록 새 방출의 파티클 수를 줄이고, draw_limit보다
+    많으면 일정 간격으로 골라 그려 파티클이 많아도 프레임 시간이 일정 수준을 넘지 않는다.
+    난수는 게임 난수와 별개이므로 시뮬레이션 결과에 영향을 주지 않는다.
+    """
+
+    def __init__(self, cap=PARTICLE_CAP, draw_limit=PARTICLE_DRAW_LIMIT, seed=None):
+        self.cap = cap
+        self.draw_limit = draw_limit
+        self.rng = random.Random(seed)
+        self.time = 0.0
+        self.emitted = 0
+        self.throttled = 0  # cap 때문에 방출하지 않은 파티클 수
+        self.drawn = 0  # 마지막 프레임에 그린 파티클 수
+        self.clear()
+
+    def clear(self):
+        """모든 파티클 제거"""
+        # 파티클별 열 (방출 순서대로, 위치는 스프라이트 왼쪽 위 기준)
+        self.xs = array.array('f')
+        self.ys = array.array('f')
+        self.speed_xs = array.array('f')
+        self.speed_ys = array.array('f')
+        self.births = array.array('d')  # 오래 실행해도 경과 시간이 정확하도록 배정밀도
+        self.fade_rates = array.array('f')  # 밝기 단계 / 수명
+        self.gravities = array.array('f')  # 중력 / 2 (낙하 = 값 x 경과 시간^2)
+        self.variants = array.array('B')  # 색상 번호 x 크기 수 + 크기 번호
+        # 방출별 (파티클 수, 소멸 시각)
+        self.counts = []
+        self.deaths = []
+
+    def __len__(self):
+        return len(self.xs)
+
+    @staticmethod
+    def render_sprite(size, color, brightness):
+        """파티클 스프라이트 그리기 (가장자리는 어둡고 가운데는 밝은 원)"""
+        image = pygame.Surface((size, size))
+        image.fill(BLACK)
+        glow = tuple(int(c * brightness * 0.5) for c in color)
+        core = tuple(int(c * brightness) for c in color)
+        if size <= 2:
+            image.fill(core)
+        else:
+            pygame.draw.circle(image, glow, (size // 2, size // 2), size // 2)
+            pygame.draw.circle(image, core, (size // 2, size // 2), max(1, size // 4))
+        return image
+
+    def quality(self):
+        """새 방출에 적용할 파티클 수 비율 (살아 있는 파티클이 cap에 가까울수록 0에 가까움)"""
+        if self.cap <= 0:
+            return 0.0
+        return max(0.0, 1.0 - len(self.xs) / self.cap)
+
+    def emit(self, x, y, count, speed, life, colors, sizes=range(len(PARTICLE_SIZES)), velocity=(0, 0),
+             gravity=PARTICLE_GRAVITY):
+        """(x, y)에서 임의의 방향으로 파티클 방출 (실제로 방출한 수 반환)
+
+        speed는 (최소, 최대) 속력, colors와 sizes는 고를 PARTICLE_COLORS / PARTICLE_SIZES
+        번호, velocity는 모든 파티클에 더할 속도, life는 수명 (틱)이다.
+        """
+        wanted = count
+        count = int(count * self.quality() + 0.5)
+        self.throttled += wanted - count
+        if count <= 0:
+            return 0
+
+        random_ = self.rng.random
+        low, high = speed
+        base_x, base_y = velocity
+        size_count = len(PARTICLE_SIZES)
+        xs, ys, speed_xs, speed_ys, variants = self.xs, self.ys, self.speed_xs, self.speed_ys, self.variants
+        for _ in range(count):
+            angle = random_() * math.tau
+            magnitude = low + (high - low) * random_()
+            size = sizes[int(random_() * len(sizes))]
+            half = PARTICLE_SIZES[size] / 2
+            xs.append(x - half)
+            ys.append(y - half)
+            speed_xs.append(base_x + math.cos(angle) * magnitude)
+            speed_ys.append(base_y + math.sin(angle) * magnitude)
+            variants.append(colors[int(random_() * len(colors))] * size_count + size)
+        self.births.extend(itertools.repeat(self.time, count))
+        self.fade_rates.extend(itertools.repeat(PARTICLE_FADE_LEVELS / life, count))
+        self.gravities.extend(itertools.repeat(gravity / 2, count))
+
+        self.counts.append(count)
+        self.deaths.append(self.time + life)
+        self.emitted += count
+        return count
+
+    def advance(self, ticks=1):
+        """시계를 ticks만큼 진행하고 수명이 다한 방출 구간 제거"""
+        self.time += ticks
+        now = self.time
+        expired = [index for index, death in enumerate(self.deaths) if death <= now]
+        if not expired:
+            return
 
-            if self.index < len(self.images):
-                self.image = self.images[self.index]
-                self.rect = self.image.get_rect(center=self.rect.center)
+        # 이어진 방출끼리 묶어 뒤쪽 구간부터 잘라냄 (앞쪽 구간의 위치가 바뀌지 않게)
+        ends = list(itertools.accumulate(self.counts))
+        runs = []
+        for index in expired:
+            start = ends[index] - self.counts[index]
+            if runs and runs[-1][1] == start:
+                runs[-1][1] = ends[index]
             else:
-                self.kill()
+                runs.append([start, ends[index]])
+        columns = (self.xs, self.ys, self.speed_xs, self.speed_ys, self.births, self.fade_rates, self.gravities,
+                   self.variants)
+        for start, end in reversed(runs):
+            for column in columns:
+                del column[start:end]
+        keep = [death > now for death in self.deaths]
+        self.counts = list(itertools.compress(self.counts, keep))
+        self.deaths = list(itertools.compress(self.deaths, keep))
+
+    def draw(self, screen):
+        """살아 있는 파티클을 가산 혼합으로 그리기"""
+        total = len(self.xs)
+        if not total:
+            self.drawn = 0
+            return
 
+        stride = -(-total // self.draw_limit) if self.draw_limit > 0 else 1
+        sprites = ATLAS.particles()
+        add, mul, repeat = operator.add, operator.mul, itertools.repeat
+        ages = list(map(operator.sub, repeat(self.time), self.births[::stride]))
+        xs = map(add, self.xs[::stride], map(mul, self.speed_xs[::stride], ages))
+        ys = map(add, map(add, self.ys[::stride], map(mul, self.speed_ys[::stride], ages)),
+                 map(mul, self.gravities[::stride], map(mul, ages, ages)))
+        levels = map(int, map(mul, ages, self.fade_rates[::stride]))
+        images = map(sprites.__getitem__,
+                     map(add, map(mul, levels, repeat(len(PARTICLE_COLORS) * len(PARTICLE_SIZES))),
+                         self.variants[::stride]))
+        items = list(zip(images, zip(xs, ys), repeat(None), repeat(pygame.BLEND_ADD)))
+        screen.blits(items, doreturn=False)
+        self.drawn = len(items)
+
+    def stats(self):
+        """파티클 통계"""
+        return {
+            'live': len(self.xs),
+            'bursts': len(self.counts),
+            'drawn': self.drawn,
+            'emitted': self.emitted,
+            'throttled': self.throttled,
+            'quality': self.quality(),
+        }
+
+
+class FontLoader:
+    """한글 지원 시스템 폰트 로더
+
+    후보 폰트 이름이 어떤 파일로 해석됐는지 디스크에 캐시해 다음 실행부터는 시스템
+    폰트 검색 없이 그 파일을 바로 연다. 캐시가 없으면 검색하고, background=True면
+    검색을 백그라운드 스레드에서 하는 동안 기본 폰트를 돌려준다 (done이 True가 되면
+    font()가 검색된 폰트를 돌려줌). 후보가 하나도 없다는 결과도 캐시한다.
+    """
+
+    def __init__(self, candidates=FONT_CANDIDATES, cache_path=None):
+        self.candidates = list(candidates)
+        self.cache_path = cache_path
+        self.path = None
+        self.source = None  # 'cache', 'scan', 'background'
+        self.done = False
+        self.thread = None
+        self.fonts = {}
+
+    def start(self, background=False):
+        """폰트 파일 경로 확인 시작 (이미 시작했으면 무시)"""
+        if self.source is not None:
+            return
 
-class Game:
-    """게임 메인 클래스"""
+        cached = self.load_cached()
+        if cached is not None:
+            self.path = cached or None
+            self.source = 'cache'
+            self.done = True
+        elif background:
+            self.source = 'background'
+            self.thread = threading.Thread(target=self.scan, name='font-scan', daemon=True)
+            self.thread.start()
+        else:
+            self.source = 'scan'
+            self.scan()
+
+    def scan(self):
+        """시스템 폰트를 검색해 첫 번째로 있는 후보의 경로를 찾고 캐시에 기록"""
+        path = pygame.font.match_font(self.candidates)
+        self.path = path
+        self.store_cached(path or '')
+        self.done = True
+
+    def cache_key(self):
+        """캐시 항목 키 (후보 목록)"""
+        return ','.join(self.candidates)
+
+    def load_cached(self):
+        """캐시된 경로 ('': 후보 없음, None: 캐시 없음 또는 파일이 사라짐)"""
+        try:
+            with open(self.cache_path or font_cache_path()) as f:
+                cache = json.load(f)
+            if cache.get('version') != FONT_CACHE_VERSION:
+                return None
+            path = cache['fonts'][self.cache_key()]
+        except (OSError, ValueError, KeyError, TypeError, AttributeError):
+            return None
 
-    def __init__(self):
-        self.screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
-        pygame.display.set_caption("Space War - 갤러그 스타일 슈팅 게임")
-        self.clock = pygame.time.Clock()
+        if path and not os.path.isfile(path):
+            return None
+        return path
 
-        # 한글 지원 폰트 설정
+    def store_cached(self, path):
+        """해석 결과를 캐시에 원자적으로 기록"""
+        cache_path = self.cache_path or font_cache_path()
         try:
-            # macOS, Windows, Linux에서 사용 가능한 한글 폰트 시도
-            font_candidates = ['AppleSDGothicNeo', 'AppleGothic', 'Malgun Gothic',
-                             'NanumGothic', 'Arial Unicode MS', 'DejaVu Sans']
-            font_loaded = False
-
-            for font_name in font_candidates:
-                try:
-                    self.font = pygame.font.SysFont(font_name, 36)
-                    self.small_font = pygame.font.SysFont(font_name, 24)
-                    font_loaded = True
-                    break
-                except:
+            with open(cache_path) as f:
+                cache = json.load(f)
+            if not isinstance(cache, dict) or cache.get('version') != FONT_CACHE_VERSION:
+                raise ValueError
+        except (OSError, ValueError):
+            cache = {'version': FONT_CACHE_VERSION, 'fonts': {}}
+        cache['fonts'][self.cache_key()] = path
+
+        try:
+            os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+            tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+            with open(tmp_path, 'w') as f:
+                json.dump(cache, f)
+            os.replace(tmp_path, cache_path)
+        except OSError:
+            # 캐시는 선택 사항이므로 기록 실패는 무시
+            pass
+
+    def font(self, size):
+        """size 크기의 폰트 (아직 검색 중이거나 후보가 없으면 기본 폰트)"""
+        path = self.path if self.done else None
+        key = (path, size)
+        font = self.fonts.get(key)
+        if font is None:
+            try:
+                font = pygame.font.Font(path, size)
+            except (OSError, pygame.error):
+                font = pygame.font.Font(None, size)
+            self.fonts[key] = font
+        return font
+
+
+# 프로세스 내 모든 게임이 공유하는 폰트 로더
+FONTS = FontLoader()
+
+
+# 엔티티 객체 풀 (프로세스 내 모든 게임이 공유)
+BULLET_POOL = EntityPool(Bullet)
+EXPLOSION_POOL = EntityPool(Explosion)
+POWERUP_POOL = EntityPool(PowerUp)
+
+
+class Scheduler:
+    """틱 단위 이벤트 스케줄러 (이진 힙)
+
+    schedule(tick, callback, *args)로 예약한 이벤트를 run(tick)이 예약 틱이 지난 것만
+    (틱, 예약 순서)대로 호출하므로, 틱마다 드는 비용은 엔티티 수가 아니라 만기된
+    이벤트 수에 비례한다. 취소한 이벤트는 힙에 남았다가 만기 때 버린다.
+    """
+
+    def __init__(self):
+        self.heap = []
+        self.counter = itertools.count()
+        self.fired = 0
+
+    def __len__(self):
+        return len(self.heap)
+
+    def schedule(self, tick, callback, *args):
+        """tick에 callback(*args) 호출 예약 (cancel()에 넘길 이벤트 반환)"""
+        event = [tick, next(self.counter), callback, args]
+        heapq.heappush(self.heap, event)
+        return event
+
+    @staticmethod
+    def cancel(event):
+        """예약 취소 (이미 호출됐거나 취소된 이벤트면 무시)"""
+        event[2] = None
+
+    def run(self, tick):
+        """tick 이하로 예약된 이벤트 호출"""
+        heap = self.heap
+        while heap and heap[0][0] <= tick:
+            event = heapq.heappop(heap)
+            callback = event[2]
+            if callback is not None:
+                event[2] = None
+                self.fired += 1
+                callback(*event[3])
+
+
+class SpatialGrid:
+    """균일 격자 공간 해시 (충돌 검사 broadphase)
+
+    매 프레임 그룹으로부터 다시 구성하며, 질의 결과는 pygame.sprite.spritecollide와
+    같은 순서(그룹 순서)와 같은 판정(rect 충돌)을 따른다.
+    """
+
+    def __init__(self, cell_size=GRID_CELL_SIZE):
+        self.cell_size = cell_size
+        self.cells = {}
+        self.sprites = []
+        self.rects = None
+
+    def rebuild(self, group):
+        """그룹의 스프라이트로 격자 재구성"""
+        self.cells.clear()
+        self.sprites = group.sprites()
+        if len(self.sprites) <= GRID_LINEAR_LIMIT:
+            # 스프라이트가 적으면 격자 구성보다 rect 목록 직접 비교가 빠름
+            self.rects = [sprite.rect for sprite in self.sprites]
+            return
+        self.rects = None
+        cells = self.cells
+        cell_size = self.cell_size
+
+        for index, sprite in enumerate(self.sprites):
+            rect = sprite.rect
+            x0 = rect.left // cell_size
+            x1 = (rect.right - 1) // cell_size
+            y0 = rect.top // cell_size
+            y1 = (rect.bottom - 1) // cell_size
+            for cx in range(x0, x1 + 1):
+                for cy in range(y0, y1 + 1):
+                    key = (cx, cy)
+                    if key in cells:
+                        cells[key].append(index)
+                    else:
+                        cells[key] = [index]
+
+    def query(self, rect):
+        """rect와 겹치는 살아있는 스프라이트를 그룹 순서대로 반환"""
+        if self.rects is not None:
+            sprites = self.sprites
+            return [sprites[index] for index in rect.collidelistall(self.rects) if sprites[index].alive()]
+
+        cells = self.cells
+        cell_size = self.cell_size
+        x0 = rect.left // cell_size
+        x1 = (rect.right - 1) // cell_size
+        y0 = rect.top // cell_size
+        y1 = (rect.bottom - 1) // cell_size
+
+        candidates = set()
+        for cx in range(x0, x1 + 1):
+            for cy in range(y0, y1 + 1):
+                bucket = cells.get((cx, cy))
+                if bucket:
+                    candidates.update(bucket)
+
+        hits = []
+        for index in sorted(candidates):
+            sprite = self.sprites[index]
+            if sprite.alive() and rect.colliderect(sprite.rect):
+                hits.append(sprite)
+        return hits
+
+    def collide(self, sprite, dokill=False):
+        """spritecollide(sprite, group, dokill)와 동일한 결과를 격자로 계산"""
+        return self.collide_rect(sprite.rect, dokill)
+
+    def collide_rect(self, rect, dokill=False):
+        """rect와 겹치는 스프라이트 (dokill이면 제거)"""
+        hits = self.query(rect)
+        if dokill:
+            for hit in hits:
+                hit.kill()
+        return hits
+
+
+class TargetIndex:
+    """유도탄 공용 최근접 적 색인
+
+    프레임마다 invalidate()로 표시만 해 두고, 첫 질의 때 적 중심 좌표로 격자를
+    한 번 구성한다. 같은 프레임의 모든 유도탄이 이 색인을 공유한다.
+    """
+
+    def __init__(self, cell_size=TARGET_CELL_SIZE):
+        self.cell_size = cell_size
+        self.cells = {}
+        self.group = None
+        self.dirty = True
+        self.bounds = (0, 0, 0, 0)
+
+    def invalidate(self, group):
+        """다음 질의 때 group으로 색인을 다시 구성하도록 표시"""
+        self.group = group
+        self.dirty = True
+
+    def rebuild(self):
+        """적 중심 좌표로 격자 구성"""
+        self.cells.clear()
+        self.dirty = False
+        if not self.group:
+            return
+
+        cells = self.cells
+        cell_size = self.cell_size
+        for index, enemy in enumerate(self.group):
+            x, y = enemy.rect.center
+            key = (x // cell_size, y // cell_size)
+            entry = (index, x, y, enemy)
+            if key in cells:
+                cells[key].append(entry)
+            else:
+                cells[key] = [entry]
+
+        xs = [key[0] for key in cells]
+        ys = [key[1] for key in cells]
+        self.bounds = (min(xs), max(xs), min(ys), max(ys))
+
+    def nearest(self, x, y):
+        """(x, y)에서 가장 가까운 살아있는 적 (동점이면 그룹 순서가 앞선 적)"""
+        if self.dirty:
+            self.rebuild()
+        if not self.cells:
+            return None
+
+        cells = self.cells
+        cell_size = self.cell_size
+        qx = x // cell_size
+        qy = y // cell_size
+        min_x, max_x, min_y, max_y = self.bounds
+        max_ring = max(abs(qx - min_x), abs(qx - max_x), abs(qy - min_y), abs(qy - max_y))
+
+        best = None
+        best_index = 0
+        best_distance = float('inf')
+
+        for ring in range(max_ring + 1):
+            if ring == 0:
+                keys = [(qx, qy)]
+            else:
+                keys = [(cx, qy - ring) for cx in range(qx - ring, qx + ring + 1)]
+                keys += [(cx, qy + ring) for cx in range(qx - ring, qx + ring + 1)]
+                keys += [(qx - ring, cy) for cy in range(qy - ring + 1, qy + ring)]
+                keys += [(qx + ring, cy) for cy in range(qy - ring + 1, qy + ring)]
+
+            for key in keys:
+                bucket = cells.get(key)
+                if not bucket:
                     continue
+                for index, ex, ey, enemy in bucket:
+                    distance = (ex - x) ** 2 + (ey - y) ** 2
+                    if distance < best_distance or (distance == best_distance and index < best_index):
+                        if enemy.alive():
+                            best = enemy
+                            best_index = index
+                            best_distance = distance
+
+            # 다음 고리의 적은 최소 ring * cell_size 이상 떨어져 있음
+            if best is not None and best_distance < (ring * cell_size) ** 2:
+                break
+
+        return best
+
+    def nearest_many(self, points):
+        """여러 (x, y) 지점의 nearest() 결과 목록 (결과는 nearest()와 같음)
+
+        지점을 TARGET_BLOCK_SIZE 칸으로 묶어 칸마다 한 번 후보 적을 추린 뒤 (candidates()),
+        후보가 하나인 칸은 탐색 없이 그 적을, 여럿인 칸의 지점은 후보끼리만 거리를 비교한다.
+        """
+        if self.dirty:
+            self.rebuild()
+        entries = sorted(entry for bucket in self.cells.values() for entry in bucket if entry[3].alive())
+        if not entries:
+            return [None] * len(points)
+
+        size = TARGET_BLOCK_SIZE
+        blocks = {}
+        results = []
+        for point in points:
+            x, y = point
+            key = (x // size, y // size)
+            if key in blocks:
+                candidates = blocks[key]
+            else:
+                candidates = blocks[key] = self.candidates(key[0] * size, key[1] * size, size, entries)
+            if len(candidates) == 1:
+                results.append(candidates[0][3])
+                continue
+            best = None
+            best_distance = float('inf')
+            for _, ex, ey, enemy in candidates:
+                distance = (ex - x) ** 2 + (ey - y) ** 2
+                if distance < best_distance:
+                    best = enemy
+                    best_distance = distance
+            results.append(best)
+        return results
+
+    @staticmethod
+    def candidates(x0, y0, size, entries):
+        """[x0, x0+size] x [y0, y0+size] 칸 안 어느 지점의 최근접 적도 될 수 있는 항목 (그룹 순서)
+
+        칸 안 어디서든 가장 먼 거리가 가장 작은 적보다, 가장 가까운 거리조차 먼 적은
+        칸 안 모든 지점에서 그 적보다 멀어 동점도 될 수 없으므로 뺀다.
+        """
+        x1 = x0 + size
+        y1 = y0 + size
+        bounds = []
+        for entry in entries:
+            _, ex, ey, _ = entry
+            dx0 = abs(ex - x0)
+            dx1 = abs(ex - x1)
+            dy0 = abs(ey - y0)
+            dy1 = abs(ey - y1)
+            near_x = 0 if x0 <= ex <= x1 else min(dx0, dx1)
+            near_y = 0 if y0 <= ey <= y1 else min(dy0, dy1)
+            bounds.append((near_x ** 2 + near_y ** 2, max(dx0, dx1) ** 2 + max(dy0, dy1) ** 2))
+        reach = min(far for _, far in bounds)
+        return [entry for entry, (near, _) in zip(entries, bounds) if near <= reach]
+
+
+class Starfield:
+    """미리 그려둔 별 레이어를 서로 다른 속도로 스크롤하는 시차(parallax) 배경
+
+    레이어마다 화면 크기 서피스를 한 장씩 만들어 두고 매 프레임 레이어당 두 번만
+    블릿하므로, 프레임 비용은 별 개수와 관계없이 일정하다. 서피스는 처음 그릴 때
+    만들어 화면을 그리지 않는 헤드리스 게임은 비용을 치르지 않는다.
+    """
+
+    def __init__(self, layers=STAR_LAYERS, density=STAR_DENSITY, seed=None):
+        self.density = density
+        self.seed = seed
+        self.baked = False
+        # [서피스, 스크롤 속도, 스크롤 위치] (먼 레이어일수록 느리게)
+        self.layers = [[None, STAR_SCROLL_SPEED * ((i + 1) / layers), 0.0] for i in range(layers)]
+
+    def bake(self):
+        """별 레이어 서피스 그리기"""
+        rng = random.Random(self.seed)
+        layers = len(self.layers)
+        density = self.density
+
+        for i in range(layers):
+            # 먼 레이어일수록 어둡게
+            depth = (i + 1) / layers
+            brightness = int(255 * (0.35 + 0.65 * depth))
+            color = (brightness, brightness, brightness)
+
+            surface = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT))
+            surface.fill(BLACK)
+            if i > 0:
+                # 맨 뒤 레이어만 불투명, 나머지는 검은색을 투명 처리
+                surface.set_colorkey(BLACK, pygame.RLEACCEL)
+
+            count = density // layers + (1 if i < density % layers else 0)
+            for _ in range(count):
+                x = rng.randint(0, SCREEN_WIDTH)
+                y = rng.randint(0, SCREEN_HEIGHT - 1)
+                pygame.draw.circle(surface, color, (x, y), 1)
+
+            if pygame.display.get_surface() is not None:
+                surface = surface.convert()
+            self.layers[i][0] = surface
+
+        self.baked = True
+
+    def advance(self, frames=1):
+        """레이어 스크롤 위치 진행"""
+        for layer in self.layers:
+            layer[2] = (layer[2] + layer[1] * frames) % SCREEN_HEIGHT
+
+    def draw(self, screen):
+        """레이어를 뒤에서부터 그리기 (레이어당 블릿 2회)"""
+        if not self.layers:
+            screen.fill(BLACK)
+            return
+        if not self.baked:
+            self.bake()
+
+        for surface, speed, offset in self.layers:
+            y = int(offset)
+            screen.blit(surface, (0, y))
+            screen.blit(surface, (0, y - SCREEN_HEIGHT))
+
+
+class HudText:
+    """HUD 텍스트 렌더링 캐시
+
+    고정 문자열은 (텍스트, 색상)별로 한 번만 렌더링한다. 숫자 필드는 미리 렌더링한
+    글리프를 슬롯별 서피스에 이어 붙이며, 값이 바뀔 때만 다시 조합한다.
+    """
+
+    def __init__(self, font):
+        self.font = font
+        self.labels = {}
+        self.glyphs = {}
+        self.fields = {}
+
+    def label(self, text, color):
+        """고정 문자열 서피스 (캐시)"""
+        key = (text, color)
+        surface = self.labels.get(key)
+        if surface is None:
+            if len(self.labels) >= TEXT_CACHE_LIMIT:
+                self.labels.clear()
+            surface = self.font.render(text, True, color)
+            self.labels[key] = surface
+        return surface
+
+    def glyph(self, char, color):
+        """숫자 필드용 글리프 서피스 (캐시)"""
+        key = (char, color)
+        surface = self.glyphs.get(key)
+        if surface is None:
+            surface = self.font.render(char, True, color)
+            self.glyphs[key] = surface
+        return surface
+
+    def field(self, slot, prefix, value, suffix, color):
+        """접두어 + 숫자 + 접미어로 된 필드 (값이 바뀔 때만 글리프 조합)"""
+        key = (prefix, value, suffix, color)
+        entry = self.fields.get(slot)
+        if entry is not None and entry[0] == key:
+            return entry[1]
+
+        parts = [self.label(prefix, color)]
+        parts.extend(self.glyph(char, color) for char in value)
+        if suffix:
+            parts.append(self.label(suffix, color))
+        width = sum(part.get_width() for part in parts)
+        height = max(part.get_height() for part in parts)
+
+        if entry is not None and entry[1].get_size() == (width, height):
+            surface = entry[1]
+            surface.fill((0, 0, 0, 0))
+        else:
+            surface = pygame.Surface((width, height), pygame.SRCALPHA)
+
+        # 투명 서피스에 글리프를 그대로 복사 (알파 합성으로 가장자리가 어두워지지 않도록)
+        x = 0
+        for part in parts:
+            surface.blit(part, (x, 0), special_flags=pygame.BLEND_RGBA_MAX)
+            x += part.get_width()
+
+        self.fields[slot] = (key, surface)
+        return surface
+
+
+class FrameProfiler:
+    """프레임 구간별 프로파일러
+
+    start()로 프레임을 시작한 뒤 구간이 끝날 때마다 lap(이름)을 호출하면 직전 표시
+    시점부터의 시간이 그 구간에 기록된다. 구간별로 최근 window 프레임의 평균을 유지하고,
+    trace를 켜면 Chrome trace-event 형식으로 내보낼 이벤트를 모은다. 꺼져 있을 때
+    start()와 lap()은 플래그만 확인한다.
+    """
+
+    def __init__(self, window=FPS, trace_limit=PROFILE_TRACE_LIMIT):
+        self.enabled = False
+        self.window = window
+        self.trace_limit = trace_limit
+        self.samples = {}
+        self.trace = None
+        self.frame_start = None
+        self.mark = 0
+
+    def enable(self, trace=False):
+        """측정 시작 (trace=True면 trace 이벤트도 기록)"""
+        self.enabled = True
+        if trace and self.trace is None:
+            self.trace = collections.deque(maxlen=self.trace_limit)
+
+    def disable(self):
+        """측정 중지 (모은 trace 이벤트는 유지)"""
+        self.enabled = False
+        self.frame_start = None
+
+    def start(self):
+        """새 프레임 시작 (직전 프레임 전체 구간을 'frame'으로 기록)"""
+        if not self.enabled:
+            return
+        if self.frame_start is not None:
+            self.record('frame', self.frame_start, self.mark - self.frame_start)
+        self.mark = self.frame_start = time.perf_counter_ns()
+
+    def lap(self, name):
+        """직전 표시 시점부터 지금까지를 name 구간으로 기록"""
+        if not self.enabled:
+            return
+        now = time.perf_counter_ns()
+        self.record(name, self.mark, now - self.mark)
+        self.mark = now
+
+    def record(self, name, start, duration):
+        """구간 시간 기록 (나노초)"""
+        samples = self.samples.get(name)
+        if samples is None:
+            samples = self.samples[name] = collections.deque(maxlen=self.window)
+        samples.append(duration)
+        if self.trace is not None:
+            self.trace.append((name, start, duration))
+
+    def averages(self):
+        """구간별 최근 평균 시간 [(이름, 마이크로초)] (처음 기록된 순서대로)"""
+        return [(name, sum(samples) // len(samples) // 1000) for name, samples in self.samples.items()]
+
+    def export_trace(self, path):
+        """모은 이벤트를 Chrome trace-event JSON으로 저장 (chrome://tracing, Perfetto)"""
+        events = list(self.trace or ())
+        base = min((start for name, start, duration in events), default=0)
+        pid = os.getpid()
+        trace_events = [{
+            'name': name,
+            'cat': name.split('.')[0],
+            'ph': 'X',
+            'ts': (start - base) / 1000,
+            'dur': duration / 1000,
+            'pid': pid,
+            'tid': 0,
+        } for name, start, duration in events]
+        with open(path, 'w') as f:
+            json.dump({'traceEvents': trace_events, 'displayTimeUnit': 'ms'}, f)
 
-            if not font_loaded:
-                # 기본 폰트로 대체
-                self.font = pygame.font.Font(None, 36)
-                self.small_font = pygame.font.Font(None, 24)
-        except:
-            self.font = pygame.font.Font(None, 36)
-            self.small_font = pygame.font.Font(None, 24)
+
+class Game:
+    """게임 메인 클래스"""
+
+    def __init__(self, headless=False, dirty_rects=False, star_layers=STAR_LAYERS, star_density=STAR_DENSITY,
+                 bullet_engine=BULLET_ENGINE_SPRITE, seed=None, particle_cap=None):
+        self.headless = headless
+        self.bullet_engine = bullet_engine
+        self.dirty_rendering = dirty_rects
+        self.star_layers = star_layers
+        self.star_density = star_density
+        startup = time.perf_counter()
+        init_pygame(headless)
+
+        if headless:
+            # 헤드리스 모드: 창 없이 오프스크린 서피스에 그림
+            self.screen = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT))
+        else:
+            self.screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+            pygame.display.set_caption("Space War - 갤러그 스타일 슈팅 게임")
+        self.clock = pygame.time.Clock()
+        # 시작 시간 측정 (각 단계가 끝난 시점까지의 누적 초)
+        self.startup_times = {'display': time.perf_counter() - startup}
+
+        # 엔티티 서피스 미리 그리기 (디스플레이 포맷 변환 포함)
+        ATLAS.prerender()
+        self.startup_times['atlas'] = time.perf_counter() - startup
+
+        # 시뮬레이션 시계: update() 한 번에 정확히 한 틱씩 진행
+        self.frame_count = 0
+        self.fire_pressed = False
+
+        # 시간 예약 이벤트 (적 발사 대기, 폭발 애니메이션, 화염 수명)
+        self.scheduler = Scheduler()
+        self.armed_enemies = []  # 발사 간격이 지나 매 틱 발사 판정하는 적 [(생성 순서, 적)]
+
+        # 보간 렌더링용 직전 틱 스프라이트 위치 (run()에서만 기록)
+        self.previous_positions = {}
+        self.dropped_ticks = 0
+
+        # 게임별 난수 생성기 (시드가 같고 입력이 같으면 같은 게임이 재현됨)
+        self.requested_seed = seed
+        self.seed = seed if seed is not None else random.randrange(1 << 32)
+        self.rng = random.Random(self.seed)
+
+        # 시차 스크롤 배경 (자체 난수 생성기를 사용하므로 게임 난수에 영향 없음)
+        self.starfield = Starfield(star_layers, star_density, self.seed)
+
+        # 폭발 불꽃과 화염 잔불 파티클 (0이면 끄고 폭발 스프라이트를 그림, dirty rectangle 모드는 사용 안 함)
+        # 파티클 시계는 draw()에서 진행하므로 그리지 않는 헤드리스 게임은 기본으로 끔 (그린다면 cap을 지정)
+        if particle_cap is None:
+            particle_cap = 0 if headless else PARTICLE_CAP
+        self.particle_cap = particle_cap
+        self.particles = ParticleSystem(0 if dirty_rects else particle_cap, seed=self.seed)
+
+        # dirty rectangle 렌더링 상태 (None이면 다음 프레임을 전체 그리기)
+        self.previous_rects = None
+        self.previous_hud = {}
+        self.last_dirty_rects = []
+        if dirty_rects:
+            self.background = self.create_static_background()
+
+        # 구간별 프로파일러 (F3으로 오버레이 표시)
+        self.profiler = FrameProfiler()
+        self.show_profile = False
+        self.profile_lines = []
+
+        # 한글 지원 폰트 (캐시된 경로를 바로 열고, 없으면 화면에서는 백그라운드로 검색)
+        FONTS.start(background=not headless)
+        self.gauge_surface = pygame.Surface((200, 10), pygame.SRCALPHA)
+        self.gauge_key = None
+        self.load_fonts()
+        self.startup_times['fonts'] = time.perf_counter() - startup
 
         # 사운드 매니저 초기화
-        self.sound_manager = SoundManager()
+        self.sound_manager = SoundManager(enabled=not headless)
+        self.startup_times['sounds'] = time.perf_counter() - startup
+
+        # 재시작 시 이전 게임의 엔티티를 풀에 반환
+        if hasattr(self, 'all_sprites'):
+            for sprite in self.all_sprites.sprites():
+                sprite.kill()
 
         # 스프라이트 그룹
         self.all_sprites = pygame.sprite.Group()
@@ -724,11 +2674,26 @@ class Game:
         self.explosions = pygame.sprite.Group()
         self.powerups = pygame.sprite.Group()
 
+        # 적 편대 (모든 적의 이동을 한꺼번에 진행)
+        self.formation = Formation()
+        self.stress = None  # StressMode면 레벨마다 절차적 웨이브 생성
+
+        # 충돌 검사용 공간 해시
+        self.enemy_grid = SpatialGrid()
+        self.powerup_grid = SpatialGrid()
+        self.enemy_bullet_grid = SpatialGrid()
+        self.target_index = TargetIndex()
+
+        # 열 배열 총알 엔진 (bullet_engine == 'soa'일 때 사용)
+        self.player_field = BulletField(self.target_index)
+        self.enemy_field = BulletField()
+
         # 게임 상태
         self.score = 0
         self.lives = 3
         self.game_over = False
         self.level = 1
+        self.powerups_collected = 0
 
         # 플레이어 생성
         self.player = Player()
@@ -736,26 +2701,51 @@ class Game:
 
         # 적 생성
         self.spawn_enemies()
+        self.startup_times['total'] = time.perf_counter() - startup
+
+    def load_fonts(self):
+        """폰트와 HUD 텍스트 캐시 준비 (백그라운드 폰트 검색이 끝나면 다시 호출)"""
+        self.font = FONTS.font(36)
+        self.small_font = FONTS.font(24)
+        self.hud_text = HudText(self.small_font)
+        self.title_text = HudText(self.font)
+        self.fonts_ready = FONTS.done
+        # dirty rectangle 모드는 글자 모양이 바뀌었으므로 다음 프레임을 전체 그리기
+        self.previous_rects = None
+
+    def spawn_enemies(self, rows=None, cols=8, spacing=(80, 60), origin=(100, 50), speed=None,
+                      fire_delay=ENEMY_FIRE_DELAY):
+        """적 우주선 편대 생성
+
+        rows를 생략하면 스트레스 모드에서는 StressMode가 만든 웨이브를, 아니면 레벨에 따라
+        3~5행 x 8열 격자를 만든다. speed를 생략하면 레벨에 따라 정한다.
+        """
+        if rows is None and self.stress is not None:
+            self.spawn_enemies(**self.stress.wave(self.level, self.rng))
+            return
 
-    def spawn_enemies(self):
-        """적 우주선 생성"""
         # 기존 적 제거
         for enemy in self.enemies:
             enemy.kill()
+        self.formation.clear()
 
         # 격자 형태로 적 배치
-        rows = 3 + self.level // 2
-        cols = 8
+        if rows is None:
+            rows = min(3 + self.level // 2, 5)
+        if speed is None:
+            # 레벨이 올라갈수록 적 속도 증가 (매우 조금씩)
+            speed = ENEMY_SPEED + (self.level - 1) * 0.1
 
-        for row in range(min(rows, 5)):
+        for row in range(rows):
             for col in range(cols):
-                x = 100 + col * 80
-                y = 50 + row * 60
-                enemy = Enemy(x, y, row)
-                # 레벨이 올라갈수록 적 속도 증가 (매우 조금씩)
-                enemy.speed = ENEMY_SPEED + (self.level - 1) * 0.1
+                x = origin[0] + col * spacing[0]
+                y = origin[1] + row * spacing[1]
+                enemy = Enemy(x, y, row, self.rng, fire_delay)
+                enemy.speed = speed
                 self.all_sprites.add(enemy)
                 self.enemies.add(enemy)
+                self.formation.add(enemy)
+                self.schedule_enemy_fire(enemy)
 
     def handle_events(self):
         """이벤트 처리"""
@@ -765,191 +2755,2455 @@ class Game:
 
             if event.type == pygame.KEYDOWN:
                 if event.key == pygame.K_SPACE and not self.game_over:
-                    # 총알 발사 (enemies_group 전달)
-                    bullets = self.player.shoot(self.enemies)
-                    if bullets:
-                        for bullet in bullets:
-                            self.all_sprites.add(bullet)
-                            self.player_bullets.add(bullet)
-                        self.sound_manager.play('shoot')
+                    # 발사 입력은 다음 update()에서 처리
+                    self.fire_pressed = True
 
                 if event.key == pygame.K_r and self.game_over:
                     # 게임 재시작
-                    self.__init__()
+                    self.restart()
+
+                if event.key == pygame.K_F3:
+                    self.toggle_profile()
 
                 if event.key == pygame.K_ESCAPE:
                     return False
 
         return True
 
-    def update(self):
-        """게임 상태 업데이트"""
-        if self.game_over:
-            return
+    def restart(self, seed=None):
+        """같은 설정으로 게임 재시작 (seed를 주지 않으면 처음 요청한 시드, 프로파일러와 스트레스 모드는 유지)"""
+        profiler, show_profile, stress = self.profiler, self.show_profile, self.stress
+        self.__init__(headless=self.headless, dirty_rects=self.dirty_rendering,
+                      star_layers=self.star_layers, star_density=self.star_density,
+                      bullet_engine=self.bullet_engine,
+                      seed=self.requested_seed if seed is None else seed, particle_cap=self.particle_cap)
+        self.profiler, self.show_profile = profiler, show_profile
+        if stress is not None:
+            self.stress = stress
+            self.spawn_enemies()
 
-        # 스프라이트 업데이트
-        self.all_sprites.update()
+    def toggle_profile(self):
+        """프로파일러 오버레이 켜기/끄기 (trace 기록 중이면 측정은 계속)"""
+        self.show_profile = not self.show_profile
+        if self.show_profile:
+            self.profiler.enable()
+        elif self.profiler.trace is None:
+            self.profiler.disable()
 
-        # 적 총알 발사
-        for enemy in self.enemies:
-            bullet = enemy.shoot()
-            if bullet:
+    def read_input(self):
+        """키보드 상태를 입력 비트마스크로 변환"""
+        keys = pygame.key.get_pressed()
+        inputs = 0
+        if keys[pygame.K_LEFT]:
+            inputs |= INPUT_LEFT
+        if keys[pygame.K_RIGHT]:
+            inputs |= INPUT_RIGHT
+        if self.fire_pressed:
+            inputs |= INPUT_FIRE
+            self.fire_pressed = False
+        return inputs
+
+    def now(self):
+        """시뮬레이션 시간 (밀리초)"""
+        return self.frame_count * 1000 // FPS
+
+    @staticmethod
+    def tick_at(ms):
+        """시뮬레이션 시간이 처음으로 ms 이상이 되는 틱"""
+        return -(-ms * FPS // 1000)
+
+    def schedule_enemy_fire(self, enemy):
+        """적의 발사 간격이 지나는 틱에 발사 판정 대상으로 등록 예약"""
+        self.scheduler.schedule(self.tick_at(enemy.last_shot + enemy.shoot_delay + 1), self.arm_enemy, enemy)
+
+    def arm_enemy(self, enemy):
+        """발사 간격이 지난 적을 생성 순서대로 발사 판정 대상에 추가"""
+        if enemy.alive():
+            bisect.insort(self.armed_enemies, (enemy.serial, enemy))
+
+    def add_explosion(self, x, y, now):
+        """폭발 생성 (애니메이션 프레임 전환은 Scheduler로 예약)"""
+        explosion = EXPLOSION_POOL.acquire(x, y, now)
+        self.all_sprites.add(explosion)
+        self.explosions.add(explosion)
+        if self.particles.cap:
+            self.particles.emit(x, y, EXPLOSION_PARTICLES, EXPLOSION_PARTICLE_SPEED, EXPLOSION_PARTICLE_LIFE,
+                                EXPLOSION_PARTICLE_COLORS)
+        explosion.timer = self.scheduler.schedule(self.tick_at(now + explosion.frame_rate + 1),
+                                                  self.advance_explosion, explosion)
+        return explosion
+
+    def advance_explosion(self, explosion):
+        """예약된 폭발 애니메이션 프레임 전환 후 다음 전환 예약"""
+        now = self.now()
+        explosion.timer = None
+        if explosion.advance(now):
+            explosion.timer = self.scheduler.schedule(self.tick_at(now + explosion.frame_rate + 1),
+                                                      self.advance_explosion, explosion)
+
+    def fire(self, now):
+        """플레이어 총알 발사"""
+        if self.bullet_engine == BULLET_ENGINE_SOA:
+            if self.player.ready_to_shoot(now):
+                field = self.player_field
+                for offset in SHOT_PATTERNS[self.player.bullet_type]:
+                    field.spawn(self.player.rect.centerx + offset, self.player.rect.top, -1,
+                                self.player.bullet_type, self.rng)
+                    if field.types[-1] == BULLET_FLAMETHROWER:
+                        self.emit_embers(field.xs[-1] + field.widths[-1] // 2, field.ys[-1] + field.heights[-1] // 2,
+                                         field.speed_xs[-1], field.speed_ys[-1])
+                self.sound_manager.play('shoot')
+            return
+
+        # 총알 발사 (enemies_group 전달)
+        bullets = self.player.shoot(self.enemies, now, self.target_index, self.rng)
+        if bullets:
+            for bullet in bullets:
                 self.all_sprites.add(bullet)
-                self.enemy_bullets.add(bullet)
+                self.player_bullets.add(bullet)
+                if bullet.lifetime:
+                    # 화염은 이번 틱부터 수명이 줄어 lifetime번째 틱에 사라짐
+                    bullet.timer = self.scheduler.schedule(self.frame_count + bullet.lifetime - 1, bullet.kill)
+                    self.emit_embers(bullet.rect.centerx, bullet.rect.centery, bullet.speed_x, bullet.speed_y)
+            self.sound_manager.play('shoot')
+
+    def emit_embers(self, x, y, speed_x, speed_y):
+        """화염 불꽃 뒤로 흩어지는 잔불 파티클 방출"""
+        if self.particles.cap:
+            self.particles.emit(x, y, FLAME_PARTICLES, FLAME_PARTICLE_SPEED, FLAME_PARTICLE_LIFE,
+                                FLAME_PARTICLE_COLORS, range(2), (speed_x * 0.5, speed_y * 0.5), 0.0)
+
+    def update(self, inputs=0):
+        """게임 상태 업데이트 (한 틱)"""
+        if self.game_over:
+            return
+
+        self.frame_count += 1
+        now = self.now()
+
+        # 유도탄 목표 색인은 이번 프레임 첫 질의 때 한 번만 구성
+        self.target_index.invalidate(self.enemies)
+
+        # 플레이어 입력 처리
+        profiler = self.profiler
+        if inputs & INPUT_FIRE:
+            self.fire(now)
+        self.player.move(inputs)
+        profiler.lap('update.input')
+
+        # 스트레스 모드는 1초마다 레벨에 비례한 수의 적이 급강하
+        if self.stress is not None and self.frame_count % FPS == 0:
+            self.formation.launch(self.stress.dives(self.level), self.rng)
+
+        # 예약 이벤트, 스프라이트 업데이트 (적은 편대 단위로 한꺼번에)
+        self.scheduler.run(self.frame_count)
+        self.formation.step()
+        self.all_sprites.update(now)
+        if self.bullet_engine == BULLET_ENGINE_SOA:
+            # 스프라이트 엔진과 같이 이미 있던 총알만 이번 틱에 이동
+            self.player_field.step()
+            self.enemy_field.step()
+        profiler.lap('update.sprites')
+
+        # 적 총알 발사 (발사 간격이 지난 적만 생성 순서대로 판정)
+        if self.armed_enemies:
+            waiting = []
+            for entry in self.armed_enemies:
+                enemy = entry[1]
+                if not enemy.alive():
+                    continue
+                if self.bullet_engine == BULLET_ENGINE_SOA:
+                    fired = enemy.ready_to_shoot(now)
+                    if fired:
+                        self.enemy_field.spawn(enemy.rect.centerx, enemy.rect.bottom, 1, BULLET_NORMAL)
+                else:
+                    bullet = enemy.shoot(now)
+                    fired = bullet is not None
+                    if fired:
+                        self.all_sprites.add(bullet)
+                        self.enemy_bullets.add(bullet)
+                if fired:
+                    self.schedule_enemy_fire(enemy)
+                else:
+                    waiting.append(entry)
+            self.armed_enemies = waiting
+        profiler.lap('update.enemy_fire')
 
         # 플레이어 총알과 적 충돌 검사
-        for bullet in self.player_bullets:
-            hits = pygame.sprite.spritecollide(bullet, self.enemies, True)
-
-            if hits:
-                for hit in hits:
-                    self.score += 10
-                    explosion = Explosion(hit.rect.centerx, hit.rect.centery)
-                    self.all_sprites.add(explosion)
-                    self.explosions.add(explosion)
-                    self.sound_manager.play('hit')
-
-                    # 파워업 드롭 (30% 확률)
-                    if random.random() < 0.3:
-                        powerup = PowerUp(hit.rect.centerx, hit.rect.centery)
-                        self.all_sprites.add(powerup)
-                        self.powerups.add(powerup)
-
-                    # 스마트 미사일 킬 카운트 증가
-                    if bullet.bullet_type == BULLET_SMART_MISSILE:
-                        bullet.kill_count += 1
-                        if bullet.kill_count >= 5:
-                            bullet.kill()
-                            break
-
-                # 일반 총알은 적 명중 시 제거
-                if bullet.bullet_type not in [BULLET_SMART_MISSILE]:
-                    bullet.kill()
-
-        # 파워업과 플레이어 충돌 검사
-        powerup_hits = pygame.sprite.spritecollide(self.player, self.powerups, True)
+        self.enemy_grid.rebuild(self.enemies)
+        if self.bullet_engine == BULLET_ENGINE_SOA:
+            self.collide_player_field(now)
+        else:
+            for bullet in self.player_bullets:
+                hits = self.enemy_grid.collide(bullet, True)
+
+                if hits:
+                    for hit in hits:
+                        self.destroy_enemy(hit, now)
+
+                        # 스마트 미사일 킬 카운트 증가
+                        if bullet.bullet_type == BULLET_SMART_MISSILE:
+                            bullet.kill_count += 1
+                            if bullet.kill_count >= 5:
+                                bullet.kill()
+                                break
+
+                    # 일반 총알은 적 명중 시 제거
+                    if bullet.bullet_type not in [BULLET_SMART_MISSILE]:
+                        bullet.kill()
+        profiler.lap('update.collide_bullets')
+
+        # 파워업과 플레이어 충돌 검사 (이번 프레임에 떨어진 파워업 포함)
+        self.powerup_grid.rebuild(self.powerups)
+        powerup_hits = self.powerup_grid.collide(self.player, True)
         for powerup in powerup_hits:
             self.player.activate_powerup(powerup.powerup_type)
+            self.powerups_collected += 1
             self.sound_manager.play('powerup')
+        profiler.lap('update.collide_powerups')
 
         # 적 총알과 플레이어 충돌 검사
-        hits = pygame.sprite.spritecollide(self.player, self.enemy_bullets, True)
+        if self.bullet_engine == BULLET_ENGINE_SOA:
+            hits = self.enemy_field.overlapping(self.player.rect)
+            for index in hits:
+                self.enemy_field.kill(index)
+            self.enemy_field.compact()
+        else:
+            self.enemy_bullet_grid.rebuild(self.enemy_bullets)
+            hits = self.enemy_bullet_grid.collide(self.player, True)
         if hits:
-            self.lives -= 1
-            explosion = Explosion(self.player.rect.centerx, self.player.rect.centery)
-            self.all_sprites.add(explosion)
-            self.explosions.add(explosion)
-            self.sound_manager.play('explosion')
-
-            if self.lives <= 0:
-                self.game_over = True
-                self.sound_manager.play('game_over')
+            self.hit_player(now)
+        profiler.lap('update.collide_enemy_bullets')
 
         # 적과 플레이어 충돌 검사
-        hits = pygame.sprite.spritecollide(self.player, self.enemies, True)
+        hits = self.enemy_grid.collide(self.player, True)
         if hits:
-            self.lives -= 1
-            explosion = Explosion(self.player.rect.centerx, self.player.rect.centery)
-            self.all_sprites.add(explosion)
-            self.explosions.add(explosion)
-            self.sound_manager.play('explosion')
-
-            if self.lives <= 0:
-                self.game_over = True
-                self.sound_manager.play('game_over')
+            self.hit_player(now)
 
         # 모든 적을 처치하면 다음 레벨
         if len(self.enemies) == 0:
             self.level += 1
             self.sound_manager.play('level_up')
             self.spawn_enemies()
+        profiler.lap('update.collide_player')
+
+        # 이번 틱에 요청된 효과음 재생 (같은 틱의 중복은 한 번만)
+        self.sound_manager.flush(now)
+        profiler.lap('update.sound')
+
+    def destroy_enemy(self, hit, now):
+        """총알에 맞은 적 처리 (점수, 폭발, 파워업 드롭)"""
+        self.score += 10
+        self.add_explosion(hit.rect.centerx, hit.rect.centery, now)
+        self.sound_manager.play('hit')
+
+        # 파워업 드롭 (30% 확률)
+        if self.rng.random() < 0.3:
+            powerup = POWERUP_POOL.acquire(hit.rect.centerx, hit.rect.centery, rng=self.rng)
+            self.all_sprites.add(powerup)
+            self.powerups.add(powerup)
+
+    def hit_player(self, now):
+        """플레이어 피격 처리 (생명 감소, 폭발, 게임 오버)"""
+        self.lives -= 1
+        self.add_explosion(self.player.rect.centerx, self.player.rect.centery, now)
+        self.sound_manager.play('explosion')
+
+        if self.lives <= 0:
+            self.game_over = True
+            self.sound_manager.play('game_over')
+
+    def collide_player_field(self, now):
+        """열 배열 엔진의 플레이어 총알과 적 충돌 검사 (스프라이트 엔진과 같은 판정)"""
+        field = self.player_field
+        if not len(field) or not self.enemies:
+            return
 
-    def draw(self):
-        """화면 그리기"""
-        # 배경
-        self.screen.fill(BLACK)
+        # 적 무리 전체 영역과 겹치는 총알만 격자로 정밀 검사
+        bounds = self.enemy_grid.sprites[0].rect.unionall([enemy.rect for enemy in self.enemy_grid.sprites])
+        for index in field.overlapping(bounds):
+            hits = self.enemy_grid.collide_rect(field.rect(index), True)
+            if not hits:
+                continue
 
-        # 별 그리기 (배경 효과)
-        for i in range(50):
-            x = random.randint(0, SCREEN_WIDTH)
-            y = random.randint(0, SCREEN_HEIGHT)
-            pygame.draw.circle(self.screen, WHITE, (x, y), 1)
+            bullet_type = field.types[index]
+            for hit in hits:
+                self.destroy_enemy(hit, now)
 
-        # 스프라이트 그리기
-        self.all_sprites.draw(self.screen)
+                # 스마트 미사일 킬 카운트 증가
+                if bullet_type == BULLET_SMART_MISSILE:
+                    if field.kill_count(index) >= 5:
+                        field.kill(index)
+                        break
 
-        # UI 그리기
-        score_text = self.small_font.render(f"점수: {self.score}", True, WHITE)
-        lives_text = self.small_font.render(f"생명: {self.lives}", True, WHITE)
-        level_text = self.small_font.render(f"레벨: {self.level}", True, WHITE)
+            # 일반 총알은 적 명중 시 제거
+            if bullet_type != BULLET_SMART_MISSILE:
+                field.kill(index)
 
-        self.screen.blit(score_text, (10, 10))
-        self.screen.blit(lives_text, (10, 40))
-        self.screen.blit(level_text, (SCREEN_WIDTH - 100, 10))
+        field.compact()
+
+    def hud_items(self):
+        """HUD 요소 목록 [(슬롯, 내용 키, 서피스, 위치 rect)] (그리는 순서대로)"""
+        items = []
+
+        # UI 그리기 (값이 바뀐 필드만 다시 조합)
+        hud_text = self.hud_text
+        score_text = hud_text.field('score', "점수: ", str(self.score), "", WHITE)
+        lives_text = hud_text.field('lives', "생명: ", str(self.lives), "", WHITE)
+        level_text = hud_text.field('level', "레벨: ", str(self.level), "", WHITE)
+
+        items.append(('score', self.score, score_text, score_text.get_rect(topleft=(10, 10))))
+        items.append(('lives', self.lives, lives_text, lives_text.get_rect(topleft=(10, 40))))
+        items.append(('level', self.level, level_text, level_text.get_rect(topleft=(SCREEN_WIDTH - 100, 10))))
 
         # 파워업 상태 표시
         if self.player.current_powerup:
             powerup_info = POWERUP_TYPES[self.player.current_powerup]
-            remaining_time = self.player.powerup_timer / FPS
-            powerup_text = self.small_font.render(
-                f"파워업: {powerup_info['name']} ({remaining_time:.1f}초)",
-                True,
-                powerup_info['color']
-            )
-            self.screen.blit(powerup_text, (10, 70))
+            remaining_time = f"{self.player.powerup_timer / FPS:.1f}"
+            powerup_text = hud_text.field('powerup', f"파워업: {powerup_info['name']} (", remaining_time,
+                                          "초)", powerup_info['color'])
+            items.append(('powerup', (powerup_info['name'], remaining_time), powerup_text,
+                          powerup_text.get_rect(topleft=(10, 70))))
 
             # 파워업 게이지 바
             bar_width = 200
             bar_height = 10
-            bar_x = 10
-            bar_y = 100
             progress = self.player.powerup_timer / (powerup_info['duration'] * FPS)
-
-            # 배경 바
-            pygame.draw.rect(self.screen, WHITE, (bar_x, bar_y, bar_width, bar_height), 2)
-            # 진행 바
-            pygame.draw.rect(self.screen, powerup_info['color'],
-                           (bar_x + 2, bar_y + 2, int((bar_width - 4) * progress), bar_height - 4))
+            fill_width = int((bar_width - 4) * progress)
+
+            # 게이지 서피스는 진행 폭이 바뀔 때만 다시 그림
+            gauge_key = (fill_width, powerup_info['color'])
+            if self.gauge_key != gauge_key:
+                self.gauge_key = gauge_key
+                gauge = self.gauge_surface
+                gauge.fill((0, 0, 0, 0))
+                # 배경 바
+                pygame.draw.rect(gauge, WHITE, (0, 0, bar_width, bar_height), 2)
+                # 진행 바
+                pygame.draw.rect(gauge, powerup_info['color'], (2, 2, fill_width, bar_height - 4))
+            items.append(('gauge', gauge_key, self.gauge_surface, self.gauge_surface.get_rect(topleft=(10, 100))))
 
         # 게임 오버 화면
         if self.game_over:
-            game_over_text = self.font.render("게임 오버!", True, RED)
-            restart_text = self.small_font.render("R키를 눌러 재시작", True, WHITE)
-            final_score = self.small_font.render(f"최종 점수: {self.score}", True, YELLOW)
+            game_over_text = self.title_text.label("게임 오버!", RED)
+            restart_text = hud_text.label("R키를 눌러 재시작", WHITE)
+            final_score = hud_text.field('final_score', "최종 점수: ", str(self.score), "", YELLOW)
 
             text_rect = game_over_text.get_rect(center=(SCREEN_WIDTH//2, SCREEN_HEIGHT//2 - 50))
             restart_rect = restart_text.get_rect(center=(SCREEN_WIDTH//2, SCREEN_HEIGHT//2))
             score_rect = final_score.get_rect(center=(SCREEN_WIDTH//2, SCREEN_HEIGHT//2 + 50))
 
-            self.screen.blit(game_over_text, text_rect)
-            self.screen.blit(restart_text, restart_rect)
-            self.screen.blit(final_score, score_rect)
+            items.append(('game_over', None, game_over_text, text_rect))
+            items.append(('restart', None, restart_text, restart_rect))
+            items.append(('final_score', self.score, final_score, score_rect))
 
         # 조작 안내
-        controls_text = self.small_font.render("조작: ←→ 이동 | SPACE 발사 | R 재시작 | ESC 종료", True, WHITE)
+        controls_text = hud_text.label("조작: ←→ 이동 | SPACE 발사 | R 재시작 | ESC 종료", WHITE)
         controls_rect = controls_text.get_rect(center=(SCREEN_WIDTH//2, SCREEN_HEIGHT - 20))
-        self.screen.blit(controls_text, controls_rect)
+        items.append(('controls', None, controls_text, controls_rect))
+
+        # 프로파일러 오버레이 (구간별 최근 평균, 읽을 수 있도록 주기적으로 갱신)
+        if self.show_profile:
+            if self.frame_count % PROFILE_OVERLAY_INTERVAL == 0 or not self.profile_lines:
+                self.profile_lines = self.profiler.averages()
+            y = 40
+            for name, micros in self.profile_lines:
+                line = hud_text.field(('profile', name), f"{name} ", str(micros), "us", GREEN)
+                items.append((('profile', name), micros, line, line.get_rect(topright=(SCREEN_WIDTH - 10, y))))
+                y += line.get_height()
+
+        return items
+
+    def draw_background(self, scroll=1):
+        """배경 그리기 (scroll: 별 레이어를 진행할 틱 수)"""
+        # 별 레이어 스크롤 (배경이 화면 전체를 덮으므로 별도 fill 불필요)
+        self.starfield.advance(scroll)
+        self.starfield.draw(self.screen)
+
+    def remember_positions(self):
+        """보간 렌더링을 위해 틱 진행 직전의 스프라이트 위치 기록"""
+        self.previous_positions = {sprite: sprite.rect.topleft for sprite in self.all_sprites}
+
+    def interpolated_items(self, alpha):
+        """직전 틱과 현재 틱 사이 alpha 지점에 그릴 스프라이트 (이미지, 위치) 목록
+
+        이번 틱에 새로 생긴 스프라이트와 INTERPOLATION_SNAP보다 멀리 움직인 스프라이트는
+        현재 위치에 그린다. 파티클을 쓰면 폭발 스프라이트는 빠진다.
+        """
+        previous = self.previous_positions
+        hide_explosions = self.particles.cap > 0
+        items = []
+        for sprite in self.all_sprites:
+            if hide_explosions and isinstance(sprite, Explosion):
+                continue
+            x, y = sprite.rect.topleft
+            last = previous.get(sprite)
+            if last is not None:
+                dx, dy = x - last[0], y - last[1]
+                if -INTERPOLATION_SNAP <= dx <= INTERPOLATION_SNAP and -INTERPOLATION_SNAP <= dy <= INTERPOLATION_SNAP:
+                    x = round(last[0] + dx * alpha)
+                    y = round(last[1] + dy * alpha)
+            items.append((sprite.image, (x, y)))
+        return items
+
+    def draw(self, alpha=None, scroll=1):
+        """화면 그리기
+
+        alpha가 주어지면 스프라이트를 직전 틱과 현재 틱 사이 alpha(0~1) 지점에 보간해
+        그리고, 배경 별은 scroll 틱만큼 진행한다 (dirty rectangle 모드는 보간하지 않음).
+        """
+        if not self.fonts_ready and FONTS.done:
+            self.load_fonts()
+
+        if self.dirty_rendering:
+            self.draw_dirty()
+            return
 
-        pygame.display.flip()
+        # 배경
+        profiler = self.profiler
+        self.draw_background(scroll)
+        profiler.lap('draw.background')
+
+        # 스프라이트 그리기 (파티클을 쓰면 폭발은 스프라이트 대신 파티클로 그림)
+        if alpha is None:
+            if self.particles.cap:
+                self.screen.blits([(sprite.image, sprite.rect) for sprite in self.all_sprites
+                                   if not isinstance(sprite, Explosion)], doreturn=False)
+            else:
+                self.all_sprites.draw(self.screen)
+            if self.bullet_engine == BULLET_ENGINE_SOA:
+                self.screen.blits(self.player_field.blit_items(), doreturn=False)
+                self.screen.blits(self.enemy_field.blit_items(), doreturn=False)
+        else:
+            self.screen.blits(self.interpolated_items(alpha), doreturn=False)
+            if self.bullet_engine == BULLET_ENGINE_SOA:
+                self.screen.blits(self.player_field.interpolated_items(alpha), doreturn=False)
+                self.screen.blits(self.enemy_field.interpolated_items(alpha), doreturn=False)
+        profiler.lap('draw.sprites')
+
+        if self.particles.cap:
+            self.particles.advance(scroll)
+            self.particles.draw(self.screen)
+            profiler.lap('draw.particles')
 
-    def run(self):
-        """게임 메인 루프"""
+        # UI 그리기
+        for slot, key, surface, rect in self.hud_items():
+            self.screen.blit(surface, rect)
+        profiler.lap('draw.hud')
+
+        if not self.headless:
+            pygame.display.flip()
+        profiler.lap('draw.flip')
+
+    def create_static_background(self):
+        """dirty rectangle 모드용 고정 배경 (별 레이어를 스크롤 없이 합성)"""
+        background = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT))
+        self.starfield.draw(background)
+        if pygame.display.get_surface() is not None:
+            background = background.convert()
+        return background
+
+    def draw_dirty(self):
+        """변경된 영역만 다시 그리고 그 영역만 화면에 반영 (dirty rectangle)
+
+        지난 프레임의 스프라이트 영역과 내용이 바뀐 HUD 영역을 배경으로 지운 뒤
+        스프라이트와 HUD를 다시 그린다. 지워진 영역이나 스프라이트와 겹치는 HUD는
+        전체 영역을 지우고 다시 그려 반투명 글자가 겹쳐 진해지지 않도록 한다.
+        """
+        screen = self.screen
+        sprites = self.all_sprites.sprites()
+        sprite_rects = [sprite.rect.copy() for sprite in sprites]
+        blit_items = [(sprite.image, sprite.rect) for sprite in sprites]
+        if self.bullet_engine == BULLET_ENGINE_SOA:
+            for field in (self.player_field, self.enemy_field):
+                sprite_rects.extend(field.rects())
+                blit_items.extend(field.blit_items())
+        hud = self.hud_items()
+
+        if self.previous_rects is None:
+            # 첫 프레임은 전체 그리기
+            screen.blit(self.background, (0, 0))
+            screen.blits(blit_items, doreturn=False)
+            for slot, key, surface, rect in hud:
+                screen.blit(surface, rect)
+            dirty = [screen.get_rect()]
+        else:
+            dirty = list(self.previous_rects)
+            previous_hud = self.previous_hud
+            redraw = [False] * len(hud)
+
+            # 내용이나 위치가 바뀐 HUD 요소
+            current_slots = set()
+            for index, (slot, key, surface, rect) in enumerate(hud):
+                current_slots.add(slot)
+                previous = previous_hud.get(slot)
+                if previous is None or previous != (key, rect):
+                    redraw[index] = True
+                    dirty.append(rect)
+                    if previous is not None:
+                        dirty.append(previous[1])
+            for slot, (key, rect) in previous_hud.items():
+                if slot not in current_slots:
+                    dirty.append(rect)
+
+            # 지워질 영역이나 스프라이트와 겹치는 HUD 요소는 전체를 다시 그림
+            changed = True
+            while changed:
+                changed = False
+                for index, (slot, key, surface, rect) in enumerate(hud):
+                    if redraw[index]:
+                        continue
+                    if rect.collidelist(dirty) != -1 or rect.collidelist(sprite_rects) != -1:
+                        redraw[index] = True
+                        dirty.append(rect)
+                        changed = True
+
+            # 배경으로 지우고 스프라이트와 HUD 다시 그리기
+            background = self.background
+            for rect in dirty:
+                screen.blit(background, rect, rect)
+            screen.blits(blit_items, doreturn=False)
+            for index, (slot, key, surface, rect) in enumerate(hud):
+                if redraw[index]:
+                    screen.blit(surface, rect)
+
+            dirty.extend(sprite_rects)
+
+        self.previous_rects = sprite_rects
+        self.previous_hud = {slot: (key, rect) for slot, key, surface, rect in hud}
+        self.last_dirty_rects = dirty
+        self.profiler.lap('draw.dirty')
+
+        if not self.headless:
+            if len(dirty) > DIRTY_RECT_LIMIT:
+                pygame.display.flip()
+            else:
+                pygame.display.update(dirty)
+        self.profiler.lap('draw.flip')
+
+    def pool_stats(self):
+        """엔티티 객체 풀 통계
+
+        풀은 모듈 전역(BULLET_POOL, EXPLOSION_POOL, POWERUP_POOL)이라 같은 프로세스의 모든
+        Game이 함께 쓴다. 따라서 값은 이 게임만의 수가 아니라 프로세스 전체의 수다
+        (VectorEnv나 배치 실행처럼 한 프로세스에 게임이 여러 개면 모두 합산됨).
+        """
+        return {
+            'bullet': BULLET_POOL.stats(),
+            'explosion': EXPLOSION_POOL.stats(),
+            'powerup': POWERUP_POOL.stats(),
+        }
+
+    def state_digest(self):
+        """시뮬레이션 상태 다이제스트 (리플레이 재현 검증용)"""
+        player = self.player
+        fields = [(field.xs, field.ys, field.speed_xs, field.speed_ys, field.types)
+                  for field in (self.player_field, self.enemy_field)]
+        state = [
+            self.frame_count, self.score, self.lives, self.level, self.game_over,
+            tuple(player.rect), player.bullet_type, player.current_powerup, player.powerup_timer,
+            player.last_shot, player.shoot_delay,
+            [(tuple(enemy.rect), enemy.direction, enemy.last_shot, enemy.shoot_delay) for enemy in self.enemies],
+            [(tuple(bullet.rect), bullet.bullet_type, bullet.speed_x, bullet.speed_y,
+              bullet.lifetime if bullet.timer is None else bullet.timer[0] - self.frame_count,
+              bullet.kill_count) for bullet in self.player_bullets],
+            [(tuple(bullet.rect), bullet.speed_y) for bullet in self.enemy_bullets],
+            fields,
+            [(tuple(powerup.rect), powerup.powerup_type) for powerup in self.powerups],
+            [(tuple(explosion.rect), explosion.index) for explosion in self.explosions],
+            self.rng.getstate(),
+        ]
+        return hashlib.blake2b(repr(state).encode(), digest_size=16).digest()
+
+    def save_state(self):
+        """시뮬레이션 전체 상태를 바이너리로 직렬화 (서피스 제외, load_state()로 복원)
+
+        엔티티는 all_sprites 순서대로 종류 목록과 종류별 고정 길이 레코드로 저장하고,
+        엔티티끼리의 참조(유도탄 목표, 편대 칸, 예약 이벤트, 발사 판정 대상)는 종류별
+        목록의 번호로 저장한다. 취소된 예약 이벤트와 죽은 적의 발사 예약은 저장하지 않는다.
+        """
+        self.formation.compact()
+        player = self.player
+        order = bytearray()
+        enemies, player_bullets, enemy_bullets, powerups, explosions = [], [], [], [], []
+        for sprite in self.all_sprites:
+            if sprite is player:
+                order.append(ENTITY_PLAYER)
+            elif isinstance(sprite, Enemy):
+                order.append(ENTITY_ENEMY)
+                enemies.append(sprite)
+            elif isinstance(sprite, Bullet):
+                if sprite in self.player_bullets:
+                    order.append(ENTITY_PLAYER_BULLET)
+                    player_bullets.append(sprite)
+                else:
+                    order.append(ENTITY_ENEMY_BULLET)
+                    enemy_bullets.append(sprite)
+            elif isinstance(sprite, PowerUp):
+                order.append(ENTITY_POWERUP)
+                powerups.append(sprite)
+            else:
+                order.append(ENTITY_EXPLOSION)
+                explosions.append(sprite)
+        enemy_ids = {enemy: index for index, enemy in enumerate(enemies)}
+
+        def target_id(target):
+            return enemy_ids.get(target, -1) if target is not None else -1
+
+        def flame_key(bullet_type, image):
+            if bullet_type != BULLET_FLAMETHROWER:
+                return 0, 0
+            size, color = ATLAS.flame_keys[image]
+            return size, FLAME_COLORS.index(color)
+
+        def pack_bullet(bullet):
+            return STATE_BULLET.pack(
+                bullet.rect.x, bullet.rect.y, bullet.direction, bullet.bullet_type,
+                bullet.speed, bullet.speed_x, bullet.speed_y, bullet.lifetime, bullet.kill_count,
+                target_id(bullet.target), *flame_key(bullet.bullet_type, bullet.image),
+                (type(bullet.speed) is float) * STATE_FLOAT_SPEED
+                | (type(bullet.speed_x) is float) * STATE_FLOAT_SPEED_X
+                | (type(bullet.speed_y) is float) * STATE_FLOAT_SPEED_Y)
+
+        records = [
+            STATE_PLAYER.pack(player.rect.x, player.rect.y, player.last_shot, player.shoot_delay,
+                              player.powerup_timer,
+                              POWERUP_INDEX[player.current_powerup] if player.current_powerup else -1,
+                              player.bullet_type),
+        ]
+        records += [STATE_ENEMY.pack(enemy.rect.x, enemy.rect.y, enemy.enemy_type, enemy.speed, enemy.direction,
+                                     enemy.original_x, enemy.original_y, enemy.move_range, enemy.last_shot,
+                                     enemy.shoot_delay, *enemy.fire_delay)
+                    for enemy in enemies]
+        records += [pack_bullet(bullet) for bullet in player_bullets]
+        records += [pack_bullet(bullet) for bullet in enemy_bullets]
+        records += [STATE_POWERUP.pack(powerup.rect.x, powerup.rect.y, POWERUP_INDEX[powerup.powerup_type])
+                    for powerup in powerups]
+        records += [STATE_EXPLOSION.pack(explosion.rect.x, explosion.rect.y, explosion.index, explosion.last_update)
+                    for explosion in explosions]
+
+        # 편대 (compact() 후이므로 모든 칸이 살아 있음)
+        formation = self.formation
+        records += [STATE_LANE.pack(*lane) for lane in zip(formation.xs, formation.origin_xs, formation.speeds,
+                                                           formation.directions, formation.ranges)]
+        records += [STATE_SLOT.pack(enemy_ids[enemy], *slot)
+                    for enemy, *slot in zip(formation.enemies, formation.lanes, formation.ys, formation.segments,
+                                            formation.segment_ends, formation.dive_ticks, formation.dive_xs,
+                                            formation.dive_ys)]
+
+        # 예약 이벤트 (예약 순서대로 다시 예약하면 같은 순서로 호출됨)
+        explosion_ids = {explosion: index for index, explosion in enumerate(explosions)}
+        bullet_ids = {bullet: index for index, bullet in enumerate(player_bullets)}
+        events = []
+        for tick, _, callback, args in sorted(self.scheduler.heap):
+            if callback is None:
+                continue
+            if callback == self.arm_enemy:
+                if args[0] in enemy_ids:
+                    events.append(STATE_EVENT.pack(tick, STATE_EVENT_ARM, enemy_ids[args[0]]))
+            elif callback == self.advance_explosion:
+                events.append(STATE_EVENT.pack(tick, STATE_EVENT_EXPLOSION, explosion_ids[args[0]]))
+            elif getattr(callback, '__self__', None) in bullet_ids:
+                events.append(STATE_EVENT.pack(tick, STATE_EVENT_FLAME, bullet_ids[callback.__self__]))
+            else:
+                raise ValueError(f"cannot save scheduled event: {callback!r}")
+        records += events
+        armed = [STATE_INDEX.pack(enemy_ids[enemy]) for _, enemy in self.armed_enemies if enemy in enemy_ids]
+        records += armed
+
+        # 열 배열 총알
+        field_counts = []
+        for field in (self.player_field, self.enemy_field):
+            count = 0
+            for index in itertools.compress(range(len(field)), field.alive):
+                state = field.states[index]
+                speed, lifetime, kill_count, target = state if state is not None else (0, 0, 0, None)
+                speed_x, speed_y = field.speed_xs[index], field.speed_ys[index]
+                size, color = flame_key(field.types[index], field.images[index])
+                records.append(STATE_FIELD_BULLET.pack(
+                    field.xs[index], field.ys[index], speed_x, speed_y, field.types[index], field.widths[index],
+                    field.heights[index], color,
+                    (state is not None) * STATE_HAS_STATE | (type(speed) is float) * STATE_FLOAT_SPEED
+                    | (type(speed_x) is float) * STATE_FLOAT_SPEED_X | (type(speed_y) is float) * STATE_FLOAT_SPEED_Y,
+                    speed, lifetime, kill_count, target_id(target)))
+                count += 1
+            field_counts.append(count)
+
+        flags = self.game_over * STATE_GAME_OVER | (self.stress is not None) * STATE_STRESS
+        version, internal, gauss = self.rng.getstate()
+        header = [
+            STATE_HEADER.pack(STATE_MAGIC, STATE_VERSION, REPLAY_ENGINES.index(self.bullet_engine), flags,
+                              self.seed, self.frame_count, self.score, self.lives, self.level,
+                              self.powerups_collected, self.scheduler.fired, len(formation.xs),
+                              len(formation.enemies), len(events), len(armed), *field_counts),
+            STATE_RNG.pack(version, *internal, gauss is not None, gauss or 0.0),
+        ]
+        if self.stress is not None:
+            header.append(STATE_STRESS_MODE.pack(list(RAMP_CURVES).index(self.stress.ramp), self.stress.growth,
+                                                 self.stress.base_enemies, self.stress.max_enemies))
+        header.append(STATE_INDEX.pack(len(order)))
+        header.append(order)
+        return b''.join(header + records)
+
+    def load_state(self, data):
+        """save_state()로 저장한 상태로 복원 (시드와 총알 엔진도 저장된 값으로 바뀜)"""
+        if len(data) < STATE_HEADER.size or data[:4] != STATE_MAGIC:
+            raise ValueError("not a saved game state")
+        (_, version, engine, flags, seed, frame_count, score, lives, level, powerups_collected, fired,
+         lane_count, slot_count, event_count, armed_count,
+         player_field_count, enemy_field_count) = STATE_HEADER.unpack_from(data)
+        if version != STATE_VERSION:
+            raise ValueError(f"unsupported game state version {version} (expected {STATE_VERSION})")
+        offset = STATE_HEADER.size
+        rng_state = STATE_RNG.unpack_from(data, offset)
+        offset += STATE_RNG.size
+        stress = None
+        if flags & STATE_STRESS:
+            ramp, growth, base_enemies, max_enemies = STATE_STRESS_MODE.unpack_from(data, offset)
+            stress = StressMode(list(RAMP_CURVES)[ramp], growth, base_enemies, max_enemies)
+            offset += STATE_STRESS_MODE.size
+        count, = STATE_INDEX.unpack_from(data, offset)
+        offset += STATE_INDEX.size
+        order = data[offset:offset + count]
+        offset += count
+
+        def records(layout, count):
+            nonlocal offset
+            end = offset + layout.size * count
+            if end > len(data):
+                raise ValueError("truncated game state")
+            result = list(layout.iter_unpack(data[offset:end]))
+            offset = end
+            return result
+
+        player_record, = records(STATE_PLAYER, order.count(ENTITY_PLAYER))
+        enemy_records = records(STATE_ENEMY, order.count(ENTITY_ENEMY))
+        player_bullet_records = records(STATE_BULLET, order.count(ENTITY_PLAYER_BULLET))
+        enemy_bullet_records = records(STATE_BULLET, order.count(ENTITY_ENEMY_BULLET))
+        powerup_records = records(STATE_POWERUP, order.count(ENTITY_POWERUP))
+        explosion_records = records(STATE_EXPLOSION, order.count(ENTITY_EXPLOSION))
+        lane_records = records(STATE_LANE, lane_count)
+        slot_records = records(STATE_SLOT, slot_count)
+        event_records = records(STATE_EVENT, event_count)
+        armed_records = records(STATE_INDEX, armed_count)
+        field_records = (records(STATE_FIELD_BULLET, player_field_count),
+                         records(STATE_FIELD_BULLET, enemy_field_count))
+
+        # 현재 엔티티를 풀에 반환하고 예약 이벤트 초기화
+        player = self.player
+        for sprite in self.all_sprites.sprites():
+            if sprite is not player:
+                sprite.kill()
+        self.all_sprites.remove(player)
+        self.formation.clear()
+        self.scheduler = Scheduler()
+        self.scheduler.fired = fired
+        self.armed_enemies = []
+
+        self.bullet_engine = REPLAY_ENGINES[engine]
+        self.seed = seed
+        self.frame_count = frame_count
+        self.score = score
+        self.lives = lives
+        self.level = level
+        self.game_over = bool(flags & STATE_GAME_OVER)
+        self.powerups_collected = powerups_collected
+        self.stress = stress
+        self.fire_pressed = False
+
+        def number(value, is_float):
+            return value if is_float else int(value)
+
+        def flame_image(size, color):
+            return ATLAS.flame(size, FLAME_COLORS[color])
+
+        def restore_bullet(bullet, record):
+            (bullet.rect.x, bullet.rect.y, _, _, speed, speed_x, speed_y, bullet.lifetime, bullet.kill_count,
+             _, size, color, float_flags) = record
+            if bullet.bullet_type == BULLET_FLAMETHROWER:
+                bullet.image = flame_image(size, color)
+                x, y = bullet.rect.topleft
+                bullet.fit_rect()
+                bullet.rect.topleft = (x, y)
+            bullet.speed = number(speed, float_flags & STATE_FLOAT_SPEED)
+            bullet.speed_x = number(speed_x, float_flags & STATE_FLOAT_SPEED_X)
+            bullet.speed_y = number(speed_y, float_flags & STATE_FLOAT_SPEED_Y)
+
+        (player.rect.x, player.rect.y, player.last_shot, player.shoot_delay, player.powerup_timer,
+         powerup, player.bullet_type) = player_record
+        player.current_powerup = POWERUP_NAMES[powerup] if powerup >= 0 else None
+
+        # all_sprites 순서대로 엔티티를 만들고 그룹마다 한 번에 추가 (그리기와 업데이트 순서 유지)
+        sprites, enemies, player_bullets, enemy_bullets, powerups, explosions = [], [], [], [], [], []
+        records_by_kind = {
+            ENTITY_ENEMY: iter(enemy_records),
+            ENTITY_PLAYER_BULLET: iter(player_bullet_records),
+            ENTITY_ENEMY_BULLET: iter(enemy_bullet_records),
+            ENTITY_POWERUP: iter(powerup_records),
+            ENTITY_EXPLOSION: iter(explosion_records),
+        }
+        for kind in order:
+            if kind == ENTITY_PLAYER:
+                sprites.append(player)
+                continue
+            record = next(records_by_kind[kind])
+            if kind == ENTITY_ENEMY:
+                (x, y, enemy_type, speed, direction, original_x, original_y, move_range, last_shot, shoot_delay,
+                 *fire_delay) = record
+                enemy = Enemy(x, y, enemy_type, self.rng, tuple(fire_delay))
+                enemy.speed = speed
+                enemy.direction = direction
+                enemy.original_x = original_x
+                enemy.original_y = original_y
+                enemy.move_range = move_range
+                enemy.last_shot = last_shot
+                enemy.shoot_delay = shoot_delay
+                sprites.append(enemy)
+                enemies.append(enemy)
+            elif kind == ENTITY_PLAYER_BULLET:
+                bullet = BULLET_POOL.acquire(0, 0, record[2], record[3], self.enemies, self.target_index, self.rng)
+                restore_bullet(bullet, record)
+                sprites.append(bullet)
+                player_bullets.append(bullet)
+            elif kind == ENTITY_ENEMY_BULLET:
+                bullet = BULLET_POOL.acquire(0, 0, record[2], record[3], rng=self.rng)
+                restore_bullet(bullet, record)
+                sprites.append(bullet)
+                enemy_bullets.append(bullet)
+            elif kind == ENTITY_POWERUP:
+                x, y, powerup_index = record
+                powerup = POWERUP_POOL.acquire(0, 0, rng=self.rng)
+                powerup.powerup_type = POWERUP_NAMES[powerup_index]
+                powerup.powerup_info = POWERUP_TYPES[powerup.powerup_type]
+                powerup.image = ATLAS.powerup(powerup.powerup_type)
+                powerup.fit_rect()
+                powerup.rect.topleft = (x, y)
+                sprites.append(powerup)
+                powerups.append(powerup)
+            else:
+                x, y, index, last_update = record
+                explosion = EXPLOSION_POOL.acquire(0, 0, last_update)
+                explosion.index = index
+                explosion.image = explosion.images[index]
+                explosion.fit_rect()
+                explosion.rect.topleft = (x, y)
+                sprites.append(explosion)
+                explosions.append(explosion)
+        self.all_sprites.add(*sprites)
+        self.enemies.add(*enemies)
+        self.player_bullets.add(*player_bullets)
+        self.enemy_bullets.add(*enemy_bullets)
+        self.powerups.add(*powerups)
+        self.explosions.add(*explosions)
+
+        for bullet, record in zip(player_bullets, player_bullet_records):
+            bullet.target = enemies[record[9]] if record[9] >= 0 else None
+
+        # 편대
+        formation = self.formation
+        for x, origin_x, speed, direction, move_range in lane_records:
+            formation.xs.append(x)
+            formation.origin_xs.append(origin_x)
+            formation.speeds.append(speed)
+            formation.directions.append(direction)
+            formation.ranges.append(move_range)
+            formation.lane_slots.append([])
+            formation.lane_rects.append([])
+        for slot, (enemy_id, lane, y, segment, segment_end, dive_tick, dive_x, dive_y) in enumerate(slot_records):
+            enemy = enemies[enemy_id]
+            enemy.formation = formation
+            enemy.slot = slot
+            formation.enemies.append(enemy)
+            formation.rects.append(enemy.rect)
+            formation.lanes.append(lane)
+            formation.ys.append(y)
+            formation.alive.append(True)
+            formation.segments.append(segment)
+            formation.segment_ends.append(segment_end)
+            formation.dive_ticks.append(dive_tick)
+            formation.dive_xs.append(dive_x)
+            formation.dive_ys.append(dive_y)
+            formation.lane_slots[lane].append(slot)
+            formation.lane_rects[lane].append(enemy.rect)
+            if segment >= 0:
+                formation.divers.append(slot)
+
+        # 예약 이벤트와 발사 판정 대상
+        scheduler = self.scheduler
+        for tick, kind, index in event_records:
+            if kind == STATE_EVENT_ARM:
+                scheduler.schedule(tick, self.arm_enemy, enemies[index])
+            elif kind == STATE_EVENT_EXPLOSION:
+                explosions[index].timer = scheduler.schedule(tick, self.advance_explosion, explosions[index])
+            else:
+                bullet = player_bullets[index]
+                bullet.timer = scheduler.schedule(tick, bullet.kill)
+        self.armed_enemies = [(enemies[index].serial, enemies[index]) for index, in armed_records]
+
+        # 열 배열 총알
+        for field, direction, field_record in zip((self.player_field, self.enemy_field), (-1, 1), field_records):
+            field.clear()
+            for (x, y, speed_x, speed_y, bullet_type, width, height, color, field_flags, speed, lifetime, kill_count,
+                 target) in field_record:
+                field.xs.append(x)
+                field.ys.append(y)
+                field.speed_xs.append(number(speed_x, field_flags & STATE_FLOAT_SPEED_X))
+                field.speed_ys.append(number(speed_y, field_flags & STATE_FLOAT_SPEED_Y))
+                field.types.append(bullet_type)
+                field.widths.append(width)
+                field.heights.append(height)
+                field.images.append(flame_image(width, color) if bullet_type == BULLET_FLAMETHROWER
+                                    else ATLAS.bullet(bullet_type, direction))
+                field.alive.append(True)
+                if field_flags & STATE_HAS_STATE:
+                    field.states.append([number(speed, field_flags & STATE_FLOAT_SPEED), lifetime, kill_count,
+                                         enemies[target] if target >= 0 else None])
+                    if bullet_type == BULLET_FLAMETHROWER:
+                        field.flame_slots.append(len(field.xs) - 1)
+                    else:
+                        field.homing_slots.append(len(field.xs) - 1)
+                else:
+                    field.states.append(None)
+            field.max_height = max(field.heights, default=0)
+
+        # 엔티티를 만들며 쓴 난수를 되돌림
+        version, *internal, has_gauss, gauss = rng_state
+        self.rng.setstate((version, tuple(internal), gauss if has_gauss else None))
+
+        # 배경 별은 저장된 시드로 다시 배치 (스크롤 위치는 렌더링 상태이므로 유지)
+        if self.starfield.seed != seed:
+            self.starfield = Starfield(self.star_layers, self.star_density, seed)
+            if self.dirty_rendering:
+                self.background = self.create_static_background()
+
+        # 보간, dirty rectangle, 유도탄 목표 색인, 파티클은 새로 시작
+        self.particles.clear()
+        self.previous_positions = {}
+        self.previous_rects = None
+        self.target_index.invalidate(self.enemies)
+
+    def run(self, record_path=None, trace_path=None, render_fps=RENDER_FPS):
+        """게임 메인 루프 (고정 틱 시뮬레이션 + 보간 렌더링)
+
+        시뮬레이션은 렌더링 속도와 무관하게 초당 FPS 틱으로 진행한다. 흐른 시간을
+        누산기에 더해 한 틱 분량이 쌓일 때마다 update()를 호출하고, 남은 시간 비율로
+        직전 틱과 현재 틱 사이를 보간해 그린다. 렌더 프레임 하나에서 따라잡는 틱은
+        MAX_CATCHUP_TICKS까지이며 그보다 밀린 시간은 버린다 (게임이 잠시 느려짐).
+        render_fps는 렌더링 프레임 상한이다 (0이면 제한 없음).
+
+        record_path가 주어지면 입력을 녹화하고, trace_path가 주어지면 구간별 시간을
+        기록해 종료 시 각각 저장한다.
+        """
         running = True
-
+        replay = Replay.start(self) if record_path else None
+        if trace_path:
+            self.profiler.enable(trace=True)
+
+        tick = 1.0 / FPS
+        accumulator = tick  # 첫 프레임에 한 틱 진행
+        drawn_alpha = 0.0  # 직전 프레임을 그린 보간 지점
+        previous = time.perf_counter()
         while running:
-            self.clock.tick(FPS)
+            self.clock.tick(render_fps)
+            current = time.perf_counter()
+            elapsed = current - previous
+            previous = current
+            accumulator += elapsed
+
+            self.profiler.start()
             running = self.handle_events()
-            self.update()
-            self.draw()
+            self.profiler.lap('events')
+
+            ticks = 0
+            while accumulator >= tick:
+                if ticks == MAX_CATCHUP_TICKS:
+                    # 따라잡지 못한 시간은 버림
+                    dropped = int(accumulator / tick)
+                    self.dropped_ticks += dropped
+                    accumulator -= dropped * tick
+                    break
+                inputs = self.read_input()
+                if replay is not None and not self.game_over:
+                    if self.frame_count < len(replay.inputs):
+                        # 재시작하면 새 게임부터 다시 녹화
+                        replay = Replay.start(self)
+                    replay.record(inputs)
+                self.remember_positions()
+                self.profiler.lap('interpolate')
+                self.update(inputs)
+                accumulator -= tick
+                ticks += 1
+
+            # 배경과 파티클은 벽시계가 아니라 시뮬레이션한 만큼만 진행 (버린 틱 제외)
+            alpha = accumulator / tick
+            self.draw(alpha=alpha, scroll=ticks + alpha - drawn_alpha)
+            drawn_alpha = alpha
+
+        if replay is not None:
+            replay.finish(self)
+            replay.save(record_path)
+        if trace_path:
+            self.profiler.export_trace(trace_path)
 
         pygame.quit()
         sys.exit()
 
+    def run_headless(self, max_frames, policy=None, render=False):
+        """헤드리스 시뮬레이션 루프 (벽시계와 무관하게 최대 속도로 진행)
+
+        policy(game)가 주어지면 매 틱 입력 비트마스크를 받아 사용한다.
+        게임 오버 또는 max_frames 도달 시 종료하고 진행한 틱 수를 반환한다.
+        """
+        start_frame = self.frame_count
+        while not self.game_over and self.frame_count - start_frame < max_frames:
+            self.profiler.start()
+            inputs = policy(self) if policy else 0
+            self.update(inputs)
+            if render:
+                self.draw()
+        return self.frame_count - start_frame
+
+
+class Replay:
+    """입력 녹화/재생
+
+    게임 시드, 총알 엔진, 틱별 입력 비트마스크를 기록한다. 파일에는 같은 입력이
+    이어지는 구간을 (비트마스크, 틱 수) 런으로 압축해 저장하고, 녹화를 끝낸 시점의
+    상태 다이제스트를 함께 저장해 재생 결과가 비트 단위로 같은지 확인한다.
+    """
+
+    def __init__(self, seed, bullet_engine=BULLET_ENGINE_SPRITE, inputs=b'', digest=bytes(16)):
+        self.seed = seed
+        self.bullet_engine = bullet_engine
+        self.inputs = bytearray(inputs)
+        self.digest = digest
+
+    @classmethod
+    def start(cls, game):
+        """game의 설정으로 새 녹화 시작 (game은 아직 진행 전이어야 함)"""
+        return cls(game.seed, game.bullet_engine)
+
+    def record(self, inputs):
+        """한 틱의 입력 비트마스크 기록"""
+        self.inputs.append(inputs)
+
+    def finish(self, game):
+        """녹화 종료 시점의 상태 다이제스트 기록"""
+        self.digest = game.state_digest()
+
+    def save(self, path):
+        """리플레이 파일 저장 (임시 파일에 쓴 뒤 교체)"""
+        runs = bytearray()
+        for inputs, group in itertools.groupby(self.inputs):
+            count = sum(1 for _ in group)
+            while count > 0:
+                length = min(count, 0xFFFF)
+                runs += REPLAY_RUN.pack(inputs, length)
+                count -= length
+
+        header = REPLAY_HEADER.pack(REPLAY_MAGIC, REPLAY_VERSION, REPLAY_ENGINES.index(self.bullet_engine),
+                                    self.seed, len(self.inputs), self.digest)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(header)
+            f.write(runs)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        """리플레이 파일 읽기"""
+        with open(path, 'rb') as f:
+            data = f.read()
+
+        if len(data) < REPLAY_HEADER.size:
+            raise ValueError(f"not a replay file: {path}")
+        magic, version, engine, seed, ticks, digest = REPLAY_HEADER.unpack_from(data)
+        if magic != REPLAY_MAGIC or engine >= len(REPLAY_ENGINES):
+            raise ValueError(f"not a replay file: {path}")
+        if version != REPLAY_VERSION:
+            raise ValueError(f"unsupported replay version {version} (expected {REPLAY_VERSION}): {path}")
+
+        body = data[REPLAY_HEADER.size:]
+        if len(body) % REPLAY_RUN.size:
+            raise ValueError(f"truncated replay file: {path}")
+        inputs = bytearray()
+        for mask, length in REPLAY_RUN.iter_unpack(body):
+            inputs += bytes((mask,)) * length
+        if len(inputs) != ticks:
+            raise ValueError(f"truncated replay file: {path}")
+
+        return cls(seed, REPLAY_ENGINES[engine], inputs, digest)
+
+    def play(self, render=False):
+        """헤드리스로 최대 속도 재생 후 (게임, 다이제스트 일치 여부) 반환"""
+        game = Game(headless=True, bullet_engine=self.bullet_engine, seed=self.seed,
+                    particle_cap=PARTICLE_CAP if render else 0)
+        inputs = self.inputs
+        game.run_headless(len(inputs), lambda game: inputs[game.frame_count], render)
+        return game, game.state_digest() == self.digest
+
+    def keyframes(self, interval=FPS * 10):
+        """끝까지 재생하며 interval틱마다 저장한 게임 상태 {틱: 상태} 반환 (seek()용)"""
+        game = Game(headless=True, bullet_engine=self.bullet_engine, seed=self.seed)
+        keyframes = {0: game.save_state()}
+        inputs = self.inputs
+        while not game.game_over and game.frame_count < len(inputs):
+            game.update(inputs[game.frame_count])
+            if game.frame_count % interval == 0:
+                keyframes[game.frame_count] = game.save_state()
+        return keyframes
+
+    def seek(self, tick, keyframes=None, game=None):
+        """tick 시점의 게임 반환 (keyframes가 있으면 tick 이전의 가장 가까운 키프레임부터 재생)
+
+        game을 주면 새로 만들지 않고 그 게임에 상태를 복원해 재사용한다.
+        """
+        if game is None:
+            game = Game(headless=True, bullet_engine=self.bullet_engine, seed=self.seed)
+        start = max((frame for frame in keyframes or () if frame <= tick), default=None)
+        if start is not None:
+            game.load_state(keyframes[start])
+        elif game.frame_count:
+            game.restart(self.seed)
+        inputs = self.inputs
+        end = min(tick, len(inputs))
+        while not game.game_over and game.frame_count < end:
+            game.update(inputs[game.frame_count])
+        return game
+
+
+def sweep_policy(game):
+    """벤치마크 기본 입력: 좌우로 움직이며 4틱마다 발사"""
+    inputs = INPUT_FIRE if game.frame_count % 4 == 0 else 0
+    return inputs | (INPUT_LEFT if (game.frame_count // 90) % 2 else INPUT_RIGHT)
+
+
+def bench_baseline(game):
+    """일반 플레이 (레벨 1)"""
+    return sweep_policy
+
+
+def bench_level10_grid(game):
+    """레벨 10 적 격자 (5행 가득, 빠른 적)"""
+    game.level = 10
+    game.spawn_enemies()
+    return sweep_policy
+
+
+def bench_flamethrower(game):
+    """화염방사기 연속 발사"""
+    def policy(game):
+        game.player.activate_powerup('FLAMETHROWER')  # 지속 시간 유지
+        return sweep_policy(game) | INPUT_FIRE
+    return policy
+
+
+def bench_missile_volleys(game):
+    """유도탄 3연발 30회 동시 발사 (1초마다)"""
+    def policy(game):
+        player = game.player
+        player.activate_powerup('MISSILE_TRIPLE')
+        if game.frame_count % FPS == 0:
+            now = game.now()
+            centerx = player.rect.centerx
+            for volley in range(30):
+                player.last_shot = now - player.shoot_delay - 1
+                player.rect.centerx = 30 + volley * 25
+                game.fire(now)
+            player.rect.centerx = centerx
+        return sweep_policy(game) & ~INPUT_FIRE
+    return policy
+
+
+def bench_explosions(game):
+    """화면 가득한 폭발 (항상 200개 유지)"""
+    def policy(game):
+        now = game.now()
+        while len(game.explosions) < 200:
+            game.add_explosion(game.rng.randrange(SCREEN_WIDTH), game.rng.randrange(SCREEN_HEIGHT), now)
+        return sweep_policy(game)
+    return policy
+
+
+def bench_particles(game):
+    """틱마다 폭발 40개 (파티클 상한과 그리기 상한에 걸리는 양)"""
+    def policy(game):
+        now = game.now()
+        for _ in range(40):
+            game.add_explosion(game.rng.randrange(SCREEN_WIDTH), game.rng.randrange(SCREEN_HEIGHT), now)
+        return sweep_policy(game)
+    return policy
+
+
+def bench_formation(game):
+    """적 1000기 편대, 0.5초마다 10기씩 급강하"""
+    game.spawn_enemies(rows=25, cols=40, spacing=(16, 10))
+
+    def policy(game):
+        if game.frame_count % (FPS // 2) == 0:
+            game.formation.launch(10, game.rng)
+        return sweep_policy(game)
+    return policy
+
+
+# 벤치마크 시나리오 (이름 -> 설정 함수, 설정 함수는 틱별 입력 policy를 반환)
+BENCHMARK_SCENARIOS = {
+    'baseline': bench_baseline,
+    'level10_grid': bench_level10_grid,
+    'flamethrower': bench_flamethrower,
+    'missile_volleys': bench_missile_volleys,
+    'explosions': bench_explosions,
+    'particles': bench_particles,
+    'formation': bench_formation,
+}
+
+
+def percentile(ordered, p):
+    """정렬된 목록의 p 백분위수 (nearest-rank 방식)"""
+    return ordered[min(len(ordered) - 1, max(0, math.ceil(p / 100 * len(ordered)) - 1))]
+
+
+def frame_time_stats(samples):
+    """나노초 단위 프레임 시간 목록의 백분위수 (밀리초)"""
+    ordered = sorted(samples)
+
+    return {
+        'p50': percentile(ordered, 50) / 1e6,
+        'p95': percentile(ordered, 95) / 1e6,
+        'p99': percentile(ordered, 99) / 1e6,
+        'max': ordered[-1] / 1e6,
+        'mean': sum(ordered) / len(ordered) / 1e6,
+    }
+
+
+def run_benchmark(names=None, frames=600, warmup=60, seed=0, bullet_engine=BULLET_ENGINE_SPRITE,
+                  dirty_rects=False):
+    """시나리오별로 update()와 draw() 시간을 따로 측정해 JSON으로 직렬화 가능한 결과 반환
+
+    모든 시나리오는 헤드리스, 고정 시드, 무적 상태로 warmup 틱을 버린 뒤 frames 틱을
+    측정한다. CPython은 할당 횟수를 직접 노출하지 않으므로 할당량은 새로 만든
+    엔티티 객체 수, 순증가한 메모리 블록 수, 가비지 컬렉션 횟수로 나타낸다.
+    """
+    results = {}
+    for name in names or BENCHMARK_SCENARIOS:
+        game = Game(headless=True, dirty_rects=dirty_rects, bullet_engine=bullet_engine, seed=seed,
+                    particle_cap=PARTICLE_CAP)
+        game.lives = 1 << 30  # 시나리오 도중 게임 오버 방지
+        policy = BENCHMARK_SCENARIOS[name](game)
+
+        for _ in range(warmup):
+            game.update(policy(game))
+            game.draw()
+
+        update_times = []
+        draw_times = []
+        block_growth = 0
+        pools = (BULLET_POOL, EXPLOSION_POOL, POWERUP_POOL)
+        allocated = sum(pool.allocated for pool in pools)
+        gc_collections_start = sum(stat['collections'] for stat in gc.get_stats())
+        for _ in range(frames):
+            inputs = policy(game)
+            blocks = sys.getallocatedblocks()
+            start = time.perf_counter_ns()
+            game.update(inputs)
+            middle = time.perf_counter_ns()
+            game.draw()
+            end = time.perf_counter_ns()
+            block_growth += sys.getallocatedblocks() - blocks
+            update_times.append(middle - start)
+            draw_times.append(end - middle)
+
+        results[name] = {
+            'description': BENCHMARK_SCENARIOS[name].__doc__,
+            'update_ms': frame_time_stats(update_times),
+            'draw_ms': frame_time_stats(draw_times),
+            'allocations_per_frame': {
+                'entities': (sum(pool.allocated for pool in pools) - allocated) / frames,
+                'net_blocks': block_growth / frames,
+                'gc_collections': (sum(stat['collections'] for stat in gc.get_stats()) - gc_collections_start) / frames,
+            },
+            'final_state': {
+                'level': game.level,
+                'enemies': len(game.enemies),
+                'bullets': (len(game.player_bullets) + len(game.enemy_bullets)
+                            + len(game.player_field) + len(game.enemy_field)),
+                'explosions': len(game.explosions),
+                'particles': len(game.particles),
+            },
+        }
+
+    return {
+        'version': 1,
+        'python': sys.version.split()[0],
+        'pygame': pygame.version.ver,
+        'bullet_engine': bullet_engine,
+        'dirty_rects': dirty_rects,
+        'seed': seed,
+        'frames': frames,
+        'warmup': warmup,
+        'scenarios': results,
+    }
+
+
+def run_stress(ramp=STRESS_RAMP, growth=STRESS_GROWTH, ticks_per_level=180, max_levels=40, seed=0,
+               bullet_engine=BULLET_ENGINE_SPRITE, render=True, budget_ms=FRAME_BUDGET_MS, keep_going=False,
+               on_level=None):
+    """스트레스 모드 용량 측정 (JSON으로 직렬화 가능한 결과 반환)
+
+    헤드리스, 고정 시드, 무적 상태의 게임에서 레벨마다 새 웨이브를 만들고 ticks_per_level
+    틱 동안 update()와 draw()(render=False면 update()만)에 걸린 프레임 시간을 잰다. 이전
+    레벨의 총알은 그대로 남는다. 레벨별 p95 프레임 시간이 budget_ms를 처음 넘은 레벨을
+    first_over_budget으로 보고하고, keep_going이 아니면 그 레벨에서 멈춘다.
+    on_level(result)가 주어지면 레벨이 끝날 때마다 호출한다.
+    """
+    game = Game(headless=True, bullet_engine=bullet_engine, seed=seed, particle_cap=PARTICLE_CAP if render else 0)
+    game.lives = 1 << 30  # 측정 도중 게임 오버 방지
+    game.stress = StressMode(ramp, growth)
+
+    levels = []
+    first_over_budget = None
+    for level in range(1, max_levels + 1):
+        game.level = level
+        game.spawn_enemies()
+        spawned = len(game.formation)
+
+        frame_times = []
+        for _ in range(ticks_per_level):
+            inputs = sweep_policy(game)
+            start = time.perf_counter_ns()
+            game.update(inputs)
+            if render:
+                game.draw()
+            frame_times.append(time.perf_counter_ns() - start)
+
+        stats = frame_time_stats(frame_times)
+        result = {
+            'level': level,
+            'enemies_spawned': spawned,
+            'fire_rate': game.stress.fire_rate(level),
+            'speed': game.stress.speed(level),
+            'frame_ms': stats,
+            'over_budget': stats['p95'] > budget_ms,
+            'final_state': {
+                'enemies': len(game.enemies),
+                'bullets': (len(game.player_bullets) + len(game.enemy_bullets)
+                            + len(game.player_field) + len(game.enemy_field)),
+                'explosions': len(game.explosions),
+                'particles': len(game.particles),
+            },
+        }
+        levels.append(result)
+        if on_level:
+            on_level(result)
+
+        if result['over_budget'] and first_over_budget is None:
+            first_over_budget = level
+            if not keep_going:
+                break
+
+    return {
+        'version': 1,
+        'python': sys.version.split()[0],
+        'pygame': pygame.version.ver,
+        'ramp': ramp,
+        'growth': growth,
+        'bullet_engine': bullet_engine,
+        'render': render,
+        'seed': seed,
+        'ticks_per_level': ticks_per_level,
+        'budget_ms': budget_ms,
+        'first_over_budget': first_over_budget,
+        'levels': levels,
+    }
+
+
+def format_layouts():
+    """현재 코드의 포맷별 (버전, 레코드 레이아웃) (FORMAT_LAYOUTS와 같은 모양)"""
+    state_records = (STATE_HEADER, STATE_RNG, STATE_STRESS_MODE, STATE_PLAYER, STATE_ENEMY, STATE_BULLET,
+                     STATE_POWERUP, STATE_EXPLOSION, STATE_FIELD_BULLET, STATE_LANE, STATE_SLOT, STATE_EVENT,
+                     STATE_INDEX)
+    return {
+        'replay': (REPLAY_VERSION, (REPLAY_HEADER.format, REPLAY_RUN.format)),
+        'state': (STATE_VERSION, tuple(record.format for record in state_records)),
+        'snapshot': (None, (SNAPSHOT_FRAME.format, SNAPSHOT_HEADER.format, SNAPSHOT_FULL, SNAPSHOT_MOVED,
+                            SNAPSHOT_REMOVED, CLIENT_MESSAGE.format)),
+    }
+
+
+def run_format_check(seed=0, frames=FPS * 10, snapshot_lags=(0, 1, 5, SNAPSHOT_HISTORY)):
+    """저장/전송 포맷 회귀 검사 (실패 설명 목록 반환, 비어 있으면 통과)
+
+    - 레코드 레이아웃이 FORMAT_LAYOUTS에 고정한 값과 같은지 (버전을 올리지 않은 변경 검출)
+    - 총알 엔진마다 frames틱 진행한 게임의 save_state()를 다른 게임에 load_state()하면
+      다이제스트와 다시 저장한 바이트가 같고, 이후 frames틱 동안 두 게임이 똑같이 진행되는지
+    - 같은 게임의 리플레이 파일을 저장하고 읽으면 입력과 다이제스트가 보존되고 재생이 일치하는지
+    - 델타 스냅샷을 ack 지연(snapshot_lags 틱)별로 인코딩해 클라이언트가 서버와 같은 표를 복원하는지
+    """
+    failures = []
+    for name, layout in format_layouts().items():
+        version, records = FORMAT_LAYOUTS[name]
+        if layout[1] != records:
+            if layout[0] == version:
+                failures.append(f"{name}: record layout changed without a version bump")
+            else:
+                failures.append(f"{name}: FORMAT_LAYOUTS not updated for version {layout[0]}")
+        elif layout[0] != version:
+            failures.append(f"{name}: version {layout[0]} does not match FORMAT_LAYOUTS ({version})")
+
+    for engine in REPLAY_ENGINES:
+        game = Game(headless=True, bullet_engine=engine, seed=seed)
+        replay = Replay.start(game)
+        while not game.game_over and game.frame_count < frames:
+            inputs = sweep_policy(game)
+            replay.record(inputs)
+            game.update(inputs)
+        replay.finish(game)
+
+        # 게임 상태 저장/복원 (다른 엔진과 시드로 만든 게임에 복원)
+        data = game.save_state()
+        other = REPLAY_ENGINES[1 - REPLAY_ENGINES.index(engine)]
+        restored = Game(headless=True, bullet_engine=other, seed=seed + 1)
+        restored.load_state(data)
+        if restored.state_digest() != game.state_digest():
+            failures.append(f"state ({engine}): restored digest differs")
+        elif restored.save_state() != data:
+            failures.append(f"state ({engine}): saving the restored game gives different bytes")
+        else:
+            for _ in range(frames):
+                inputs = sweep_policy(game)
+                game.update(inputs)
+                restored.update(inputs)
+                if restored.state_digest() != game.state_digest():
+                    failures.append(f"state ({engine}): restored game diverges at tick {game.frame_count}")
+                    break
+
+        # 리플레이 파일 저장/읽기/재생
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'check.replay')
+            replay.save(path)
+            loaded = Replay.load(path)
+        if (loaded.seed, loaded.bullet_engine, loaded.inputs, loaded.digest) != \
+                (replay.seed, replay.bullet_engine, replay.inputs, replay.digest):
+            failures.append(f"replay ({engine}): file does not round-trip")
+        elif not loaded.play()[1]:
+            failures.append(f"replay ({engine}): playback digest mismatch")
+
+    # 델타 스냅샷: 클라이언트의 ack가 lag틱 늦게 서버에 도착하는 경우
+    game = Game(headless=True, seed=seed)
+    encoder = SnapshotEncoder()
+    clients = [(lag, SnapshotClient(), collections.deque()) for lag in snapshot_lags]
+    for tick in range(frames):
+        game.update(sweep_policy(game))
+        encoder.capture(tick, game)
+        header, state = encoder.states[tick]
+        for lag, client, acks in clients:
+            baseline = acks.popleft() if len(acks) > lag else None
+            try:
+                client.apply(encoder.encode(baseline))
+            except (ValueError, KeyError, struct.error) as e:
+                failures.append(f"snapshot (ack lag {lag}): tick {tick} does not decode: {e!r}")
+                return failures
+            acks.append(client.tick)
+            if (client.score, client.lives, client.level, client.game_over) != header or client.state != state:
+                failures.append(f"snapshot (ack lag {lag}): tick {tick} decodes to a different state")
+                return failures
+    return failures
+
+
+def bot_idle(seed):
+    """가만히 있는 플레이어"""
+    return lambda game: 0
+
+
+def bot_sweep(seed):
+    """좌우로 움직이며 4틱마다 발사"""
+    return sweep_policy
+
+
+def bot_random(seed):
+    """10틱마다 임의의 입력으로 바꾸는 플레이어 (게임 난수와 별개의 시드 사용)"""
+    rng = random.Random(f"bot-{seed}")
+    inputs = 0
+
+    def policy(game):
+        nonlocal inputs
+        if game.frame_count % 10 == 0:
+            inputs = rng.randrange(INPUT_LEFT | INPUT_RIGHT | INPUT_FIRE + 1)
+        return inputs
+    return policy
+
+
+def bot_tracker(seed):
+    """가장 아래쪽 적 밑으로 따라가며 계속 발사"""
+    def policy(game):
+        inputs = INPUT_FIRE
+        if game.enemies:
+            target = max(game.enemies, key=lambda enemy: enemy.rect.bottom)
+            dx = target.rect.centerx - game.player.rect.centerx
+            if dx < -PLAYER_SPEED:
+                inputs |= INPUT_LEFT
+            elif dx > PLAYER_SPEED:
+                inputs |= INPUT_RIGHT
+        return inputs
+    return policy
+
+
+# 배치 실행용 플레이어 봇 (이름 -> 시드를 받아 틱별 입력 policy를 만드는 함수)
+BOT_POLICIES = {
+    'idle': bot_idle,
+    'sweep': bot_sweep,
+    'random': bot_random,
+    'tracker': bot_tracker,
+}
+
+
+def simulate_game(task):
+    """헤드리스 게임 하나를 끝까지 실행하고 결과 반환 (배치 실행 작업 프로세스에서 호출)"""
+    seed, bot, max_frames, bullet_engine = task
+    start = time.perf_counter()
+    game = Game(headless=True, bullet_engine=bullet_engine, seed=seed)
+    frames = game.run_headless(max_frames, BOT_POLICIES[bot](seed))
+    return {
+        'seed': seed,
+        'bot': bot,
+        'score': game.score,
+        'level': game.level,
+        'frames': frames,
+        'lives': game.lives,
+        'powerups': game.powerups_collected,
+        'game_over': game.game_over,
+        'elapsed': time.perf_counter() - start,
+    }
+
+
+def summarize(values):
+    """값 목록의 요약 통계"""
+    ordered = sorted(values)
+    return {
+        'mean': statistics.fmean(ordered),
+        'stdev': statistics.pstdev(ordered),
+        'min': ordered[0],
+        'p50': percentile(ordered, 50),
+        'p90': percentile(ordered, 90),
+        'max': ordered[-1],
+    }
+
+
+def run_batch(seeds, bot='sweep', max_frames=FPS * 60, workers=None, bullet_engine=BULLET_ENGINE_SPRITE,
+              on_result=None):
+    """seeds의 게임들을 프로세스 풀(기본: CPU 코어 수)에서 실행하고 요약 통계 반환
+
+    작업 프로세스는 게임이 끝나는 대로 결과를 돌려보내며, on_result(result)가 주어지면
+    도착 순서대로 호출한다.
+    """
+    tasks = [(seed, bot, max_frames, bullet_engine) for seed in seeds]
+    workers = workers or os.cpu_count() or 1
+    results = []
+
+    start = time.perf_counter()
+    with multiprocessing.Pool(workers) as pool:
+        # 작업을 잘게 나눠 프로세스 간 부하를 고르게 유지
+        chunksize = max(1, len(tasks) // (workers * 16))
+        for result in pool.imap_unordered(simulate_game, tasks, chunksize):
+            results.append(result)
+            if on_result:
+                on_result(result)
+        pool.close()
+        pool.join()
+    elapsed = time.perf_counter() - start
+
+    return {
+        'games': len(results),
+        'bot': bot,
+        'bullet_engine': bullet_engine,
+        'max_frames': max_frames,
+        'workers': workers,
+        'elapsed': elapsed,
+        'games_per_second': len(results) / elapsed if elapsed > 0 else 0,
+        'frames_per_second': sum(result['frames'] for result in results) / elapsed if elapsed > 0 else 0,
+        'game_over_rate': sum(result['game_over'] for result in results) / len(results) if results else 0,
+        'stats': {key: summarize([result[key] for result in results])
+                  for key in ('score', 'level', 'frames', 'powerups')} if results else {},
+    }
+
+
+class PixelObserver:
+    """화면 픽셀 관측 파이프라인
+
+    view()는 렌더 타깃을 복사하지 않고 (세로, 가로, 4) 바이트 memoryview로 노출한다
+    (채널 순서는 서피스 픽셀 형식을 따르며 리틀 엔디언에서는 B, G, R, X).
+    노출 중에는 서피스가 잠겨 그릴 수 없으므로 다음 그리기 전에 release()로 해제한다.
+    grayscale()은 화면을 축소해 흑백으로 바꾼 뒤 미리 할당한 프레임 스택 버퍼의 마지막
+    칸에 기록한다 (이전 프레임은 한 칸씩 앞으로 이동).
+    """
+
+    def __init__(self, size=OBS_SIZE, stack=1):
+        self.size = size
+        self.stack = stack
+        self.frame_bytes = size[0] * size[1]
+        self.small = pygame.Surface(size, 0, 32)
+        self.frames = bytearray(self.frame_bytes * stack)
+        self.flat = memoryview(self.frames)
+        self.stacked = self.flat.cast('B', (stack, size[1], size[0]))
+        self.screen = None
+        self.raw = None
+        self.pixels = None
+
+        # 흑백 변환 후 R=G=B이므로 초록 채널 바이트만 읽음
+        shift = self.small.get_shifts()[1] // 8
+        self.channel = shift if sys.byteorder == 'little' else 3 - shift
+
+    def view(self, screen):
+        """screen 픽셀을 복사 없이 노출하는 memoryview (다음 그리기 전까지 유효)"""
+        self.release()
+        self.screen = screen
+        self.raw = memoryview(screen.get_buffer())
+        self.pixels = self.raw.cast('B', (screen.get_height(), screen.get_pitch() // 4, 4))
+        return self.pixels
+
+    def release(self):
+        """view()로 노출한 픽셀 해제 (서피스 잠금 해제)"""
+        if self.pixels is None:
+            return
+        message = ("a previous pixel observation is still exported; "
+                   "copy it instead of holding a view across steps")
+        try:
+            self.pixels.release()
+            self.raw.release()
+        except BufferError:
+            raise BufferError(message) from None
+        # 슬라이스한 뷰는 원본을 해제해도 버퍼를 붙잡고 있어 잠금이 남는다
+        if self.screen.get_locked():
+            raise BufferError(message)
+        self.screen = None
+        self.raw = None
+        self.pixels = None
+
+    def grayscale(self, screen, reset=False):
+        """축소 흑백 프레임을 스택에 추가하고 (스택, 세로, 가로) memoryview 반환
+
+        reset이면 스택 전체를 이번 프레임으로 채운다.
+        """
+        pygame.transform.smoothscale(screen, self.size, self.small)
+        pygame.transform.grayscale(self.small, self.small)
+
+        flat = self.flat
+        frame_bytes = self.frame_bytes
+        last = (self.stack - 1) * frame_bytes
+        if self.stack > 1 and not reset:
+            flat[:last] = flat[frame_bytes:]
+
+        with memoryview(self.small.get_buffer()) as raw, raw[self.channel::4] as channel:
+            flat[last:] = channel
+
+        if reset:
+            for index in range(self.stack - 1):
+                flat[index * frame_bytes:(index + 1) * frame_bytes] = flat[last:]
+        return self.stacked
+
+
+def copy_observation(observation):
+    """다음 스텝에서 재사용되는 관측 버퍼의 사본"""
+    if isinstance(observation, memoryview):
+        return observation.tobytes()
+    if isinstance(observation, array.array):
+        return array.array(observation.typecode, observation)
+    return observation
+
+
+class SpaceWarEnv:
+    """강화학습용 헤드리스 환경 (gym 스타일 reset/step)
+
+    행동은 입력 비트마스크(0 ~ ACTION_COUNT - 1)이고, step()은 frame_skip 틱 동안 같은
+    행동을 반복한 뒤 (관측, 보상, 종료 여부, 정보)를 반환한다. 보상은 그동안의 점수
+    증가량이다. 화면은 관측에 필요할 때만 그린다.
+
+    관측 방식(obs_mode):
+    - 'state': 게임 요약 값 튜플
+    - 'pixels': 화면 픽셀을 복사 없이 노출하는 (세로, 가로, 4) 바이트 memoryview
+      (모든 축을 지정한 o[y, x, c] 인덱싱이나 .tobytes()만 되고 o[y, x]는 NotImplementedError)
+    - 'gray': obs_size로 축소한 흑백 프레임 frame_stack장을 쌓은 (스택, 세로, 가로) memoryview
+    - 'symbolic': 그리지 않고 스프라이트 그룹에서 바로 만든 고정 크기 float 배열
+    'state'가 아닌 관측은 미리 할당한 버퍼를 재사용하므로 다음 스텝 전까지만 유효하다.
+    """
+
+    def __init__(self, frame_skip=1, max_frames=None, bullet_engine=BULLET_ENGINE_SPRITE, obs_mode='state',
+                 obs_size=OBS_SIZE, frame_stack=1):
+        if obs_mode not in OBS_MODES:
+            raise ValueError(f"unknown observation mode: {obs_mode}")
+        self.frame_skip = frame_skip
+        self.max_frames = max_frames
+        self.bullet_engine = bullet_engine
+        self.obs_mode = obs_mode
+        self.game = None
+        self.seed_rng = random.Random()
+        self.observer = PixelObserver(obs_size, frame_stack)
+
+        # 기호 관측 버퍼: 플레이어 요약 5칸 + 엔티티별 (존재, x, y) 칸 (파워업은 종류 번호 추가)
+        self.powerup_index = {name: index for index, name in enumerate(POWERUP_TYPES)}
+        self.symbols = array.array('f', bytes(4 * (5 + 3 * SYMBOLIC_ENEMIES + 6 * SYMBOLIC_BULLETS
+                                                   + 4 * SYMBOLIC_POWERUPS)))
+        # 빈 칸은 같은 크기의 0 버퍼에서 memoryview 구간 복사로 채움 (임시 객체 없음)
+        self.symbol_view = memoryview(self.symbols)
+        self.symbol_zeros = memoryview(array.array('f', bytes(4 * len(self.symbols))))
+
+    def reset(self, seed=None):
+        """새 게임 시작 후 첫 관측 반환
+
+        seed를 주면 그 시드로 게임을 만들고 이후 reset()의 시드도 그 시드에서
+        이어지는 순서로 정한다.
+        """
+        if seed is not None:
+            self.seed_rng = random.Random(seed)
+        else:
+            seed = self.seed_rng.randrange(1 << 32)
+
+        self.observer.release()
+        if self.game is None:
+            self.game = Game(headless=True, bullet_engine=self.bullet_engine, seed=seed)
+        else:
+            self.game.restart(seed)
+        return self.observe(reset=True)
+
+    def step(self, action):
+        """action을 frame_skip 틱 동안 적용하고 (관측, 보상, 종료 여부, 정보) 반환
+
+        이전 픽셀 관측을 아직 붙잡고 있으면 게임을 진행하기 전에 BufferError를 낸다.
+        'pixels'/'gray' 관측은 다차원 memoryview라 o[y, x]처럼 일부 축만 인덱싱하면
+        NotImplementedError가 나므로 o[y, x, c]로 한 바이트씩 읽거나 .tobytes()로 복사한다.
+        """
+        self.observer.release()
+        game = self.game
+        score = game.score
+        for _ in range(self.frame_skip):
+            game.update(action)
+            if game.game_over:
+                break
+
+        truncated = self.max_frames is not None and game.frame_count >= self.max_frames
+        info = {'frame': game.frame_count, 'score': game.score, 'lives': game.lives, 'level': game.level,
+                'truncated': truncated and not game.game_over}
+        return self.observe(), game.score - score, game.game_over or truncated, info
+
+    def observe(self, reset=False):
+        """obs_mode에 따른 현재 관측"""
+        game = self.game
+        if self.obs_mode == 'symbolic':
+            return self.observe_symbolic()
+        if self.obs_mode == 'pixels':
+            self.render()
+            return self.observer.view(game.screen)
+        if self.obs_mode == 'gray':
+            self.render()
+            return self.observer.grayscale(game.screen, reset)
+
+        # (플레이어 x 위치 비율, 생명, 레벨, 파워업 남은 시간(초), 적 수, 적 총알 수)
+        return (game.player.rect.centerx / SCREEN_WIDTH, game.lives, game.level,
+                game.player.powerup_timer / FPS, len(game.enemies),
+                len(game.enemy_bullets) + len(game.enemy_field))
+
+    def observe_symbolic(self):
+        """기호 관측: 화면을 그리지 않고 엔티티 위치를 고정 크기 배열로 기록
+
+        [플레이어 x, 플레이어 y, 생명, 레벨, 파워업 남은 시간(초)] 뒤에 적, 플레이어 총알,
+        적 총알의 (존재, 중심 x, 중심 y)와 파워업의 (존재, 중심 x, 중심 y, 종류 번호)가
+        칸 수만큼 이어진다. 칸보다 많은 엔티티는 그룹 순서대로 잘리고 빈 칸은 0이다.
+        """
+        game = self.game
+        player = game.player
+        symbols, view, zeros = self.symbols, self.symbol_view, self.symbol_zeros
+        symbols[0] = player.rect.centerx
+        symbols[1] = player.rect.centery
+        symbols[2] = game.lives
+        symbols[3] = game.level
+        symbols[4] = player.powerup_timer / FPS
+        index = 5
+
+        def write_slots(entries, limit, width):
+            # 미리 할당한 버퍼에 제자리로 기록 (임시 리스트/배열 없음)
+            nonlocal index
+            end = index + limit * width
+            for entry in itertools.islice(entries, limit):
+                symbols[index] = 1
+                index += 1
+                for value in entry:
+                    symbols[index] = value
+                    index += 1
+            view[index:end] = zeros[index:end]
+            index = end
+
+        write_slots((enemy.rect.center for enemy in game.enemies), SYMBOLIC_ENEMIES, 3)
+        for group, field in ((game.player_bullets, game.player_field), (game.enemy_bullets, game.enemy_field)):
+            if game.bullet_engine == BULLET_ENGINE_SOA:
+                centers = ((x + w // 2, y + h // 2) for x, y, w, h in zip(field.xs, field.ys, field.widths,
+                                                                          field.heights))
+            else:
+                centers = (bullet.rect.center for bullet in group)
+            write_slots(centers, SYMBOLIC_BULLETS, 3)
+        write_slots(((powerup.rect.centerx, powerup.rect.centery, self.powerup_index[powerup.powerup_type])
+                     for powerup in game.powerups), SYMBOLIC_POWERUPS, 4)
+
+        return self.symbols
+
+    def render(self):
+        """현재 화면을 그려 서피스 반환"""
+        self.observer.release()
+        self.game.draw()
+        return self.game.screen
+
+
+class VectorEnv:
+    """여러 환경을 한 프로세스에서 같은 박자로 진행하는 벡터 환경
+
+    step(actions)는 환경별 결과 목록을 반환하며, 끝난 환경은 바로 새 게임으로
+    초기화한다 (끝나기 직전 관측의 사본은 info['final_observation']에 담음).
+    """
+
+    def __init__(self, num_envs, frame_skip=1, max_frames=None, bullet_engine=BULLET_ENGINE_SPRITE,
+                 obs_mode='state', obs_size=OBS_SIZE, frame_stack=1):
+        self.envs = [SpaceWarEnv(frame_skip, max_frames, bullet_engine, obs_mode, obs_size, frame_stack)
+                     for _ in range(num_envs)]
+
+    def __len__(self):
+        return len(self.envs)
+
+    def reset(self, seed=None):
+        """모든 환경 초기화 (seed가 주어지면 환경 i는 seed + i 사용)"""
+        return [env.reset(None if seed is None else seed + index) for index, env in enumerate(self.envs)]
+
+    def step(self, actions):
+        """환경별 행동으로 한 스텝 진행 후 (관측 목록, 보상 목록, 종료 목록, 정보 목록) 반환"""
+        observations = []
+        rewards = []
+        dones = []
+        infos = []
+        for env, action in zip(self.envs, actions):
+            observation, reward, done, info = env.step(action)
+            if done:
+                # 관측 버퍼는 reset()에서 덮어쓰므로 사본 보관
+                info['final_observation'] = copy_observation(observation)
+                observation = env.reset()
+            observations.append(observation)
+            rewards.append(reward)
+            dones.append(done)
+            infos.append(info)
+        return observations, rewards, dones, infos
+
+
+class SnapshotEncoder:
+    """권위 서버의 스냅샷 델타 인코더
+
+    capture()가 매 틱 스프라이트 그룹(플레이어, 적, 총알, 파워업, 폭발)을 id -> (종류,
+    변형, x, y) 표로 만들어 최근 SNAPSHOT_HISTORY틱 동안 보관하고, encode(baseline)이
+    클라이언트가 확인한 기준 스냅샷과의 차이를 바이너리로 만든다. 위치는 중심 좌표를
+    quantum 픽셀 단위로 양자화하며, 종류와 변형이 그대로이고 이동량이 int8에 들어가는
+    엔티티는 짧은 이동 레코드로 보낸다. 기준 스냅샷이 없으면 전체 스냅샷을 보낸다.
+    같은 틱에 같은 기준으로 인코딩한 결과는 클라이언트끼리 공유한다.
+    """
+
+    def __init__(self, quantum=SNAPSHOT_QUANTUM, history=SNAPSHOT_HISTORY):
+        self.quantum = quantum
+        self.history = history
+        self.states = collections.OrderedDict()  # tick -> (점수 등 헤더 값, {id: (종류, 변형, x, y)})
+        self.tick = None
+        self.encoded = {}  # 이번 틱 기준 스냅샷별 인코딩 결과
+        self.ids = {}  # 스프라이트 -> id
+        self.free_ids = collections.deque()  # (해제된 tick, id)
+        self.next_id = 0
+
+    def allocate(self, tick):
+        """엔티티 id 할당 (해제된 뒤 history틱이 지난 id만 재사용)"""
+        free_ids = self.free_ids
+        if free_ids and free_ids[0][0] + self.history < tick:
+            return free_ids.popleft()[1]
+        if self.next_id > 0xFFFF:
+            raise RuntimeError("too many live entities for 16-bit snapshot ids")
+        self.next_id += 1
+        return self.next_id - 1
+
+    def capture(self, tick, game):
+        """게임 상태를 tick의 스냅샷으로 기록"""
+        quantum = self.quantum
+        previous = self.ids
+        ids = {}
+        state = {}
+        color_count = len(ENEMY_COLORS)
+        groups = (
+            (ENTITY_PLAYER, (game.player,), None),
+            (ENTITY_ENEMY, game.enemies, lambda enemy: enemy.enemy_type % color_count),
+            (ENTITY_PLAYER_BULLET, game.player_bullets, operator.attrgetter('bullet_type')),
+            (ENTITY_ENEMY_BULLET, game.enemy_bullets, None),
+            (ENTITY_POWERUP, game.powerups, lambda powerup: POWERUP_INDEX[powerup.powerup_type]),
+            (ENTITY_EXPLOSION, game.explosions, operator.attrgetter('index')),
+        )
+        for kind, sprites, variant in groups:
+            for sprite in sprites:
+                entity = previous.get(sprite)
+                if entity is None:
+                    entity = self.allocate(tick)
+                ids[sprite] = entity
+                x, y = sprite.rect.center
+                state[entity] = (kind, variant(sprite) if variant else 0,
+                                 max(-32768, min(32767, x // quantum)), max(-32768, min(32767, y // quantum)))
+
+        # 사라진 엔티티의 id 반환
+        for sprite, entity in previous.items():
+            if sprite not in ids:
+                self.free_ids.append((tick, entity))
+        self.ids = ids
+
+        header = (game.score, min(game.lives, 0xFF), min(game.level, 0xFFFF), game.game_over)
+        self.states[tick] = (header, state)
+        while len(self.states) > self.history:
+            self.states.popitem(last=False)
+        self.tick = tick
+        self.encoded = {}
+
+    def encode(self, baseline=None):
+        """마지막으로 기록한 스냅샷을 baseline tick 대비 델타로 인코딩 (기준이 없으면 전체)"""
+        if baseline not in self.states or baseline == self.tick:
+            baseline = None
+        payload = self.encoded.get(baseline)
+        if payload is not None:
+            return payload
+
+        header, state = self.states[self.tick]
+        full = []
+        moved = []
+        removed = []
+        if baseline is None:
+            for entity, record in state.items():
+                full.append(entity)
+                full.extend(record)
+            full_count = len(state)
+            moved_count = 0
+        else:
+            base = self.states[baseline][1]
+            full_count = moved_count = 0
+            for entity, record in state.items():
+                old = base.get(entity)
+                if old == record:
+                    continue
+                if old is not None and old[0] == record[0] and old[1] == record[1]:
+                    dx = record[2] - old[2]
+                    dy = record[3] - old[3]
+                    if -128 <= dx <= 127 and -128 <= dy <= 127:
+                        moved += (entity, dx, dy)
+                        moved_count += 1
+                        continue
+                full.append(entity)
+                full.extend(record)
+                full_count += 1
+            removed = [entity for entity in base if entity not in state]
+
+        payload = b''.join((
+            SNAPSHOT_HEADER.pack(self.tick, SNAPSHOT_NO_BASELINE if baseline is None else baseline, *header,
+                                 full_count, moved_count, len(removed)),
+            struct.pack('<' + SNAPSHOT_FULL * full_count, *full),
+            struct.pack('<' + SNAPSHOT_MOVED * moved_count, *moved),
+            struct.pack(f'<{len(removed)}{SNAPSHOT_REMOVED}', *removed),
+        ))
+        self.encoded[baseline] = payload
+        return payload
+
+
+class SnapshotClient:
+    """스냅샷 디코더 (클라이언트 쪽 상태 복원과 그리기)
+
+    apply()는 스냅샷을 기준 스냅샷에 적용해 tick의 엔티티 표를 만들고, 다음 델타의
+    기준이 될 수 있도록 최근 SNAPSHOT_HISTORY틱을 보관한다.
+    """
+
+    def __init__(self, quantum=SNAPSHOT_QUANTUM, history=SNAPSHOT_HISTORY):
+        self.quantum = quantum
+        self.history = history
+        self.states = collections.OrderedDict()
+        self.tick = None
+        self.state = {}
+        self.score = self.lives = self.level = 0
+        self.game_over = False
+        self.received = 0
+        self.bytes_received = 0
+
+    def apply(self, payload):
+        """스냅샷 적용 후 tick 반환 (기준 스냅샷이 없으면 ValueError)"""
+        (tick, baseline, self.score, self.lives, self.level, game_over,
+         full_count, moved_count, removed_count) = SNAPSHOT_HEADER.unpack_from(payload)
+        self.game_over = bool(game_over)
+        if baseline == SNAPSHOT_NO_BASELINE:
+            state = {}
+        elif baseline in self.states:
+            state = dict(self.states[baseline])
+        else:
+            raise ValueError(f"snapshot {tick} refers to unknown baseline {baseline}")
+
+        offset = SNAPSHOT_HEADER.size
+        full = struct.unpack_from('<' + SNAPSHOT_FULL * full_count, payload, offset)
+        offset += struct.calcsize('<' + SNAPSHOT_FULL * full_count)
+        moved = struct.unpack_from('<' + SNAPSHOT_MOVED * moved_count, payload, offset)
+        offset += struct.calcsize('<' + SNAPSHOT_MOVED * moved_count)
+        removed = struct.unpack_from(f'<{removed_count}{SNAPSHOT_REMOVED}', payload, offset)
+
+        for entity in removed:
+            del state[entity]
+        for index in range(0, len(full), 5):
+            state[full[index]] = full[index + 1:index + 5]
+        for index in range(0, len(moved), 3):
+            entity = moved[index]
+            kind, variant, x, y = state[entity]
+            state[entity] = (kind, variant, x + moved[index + 1], y + moved[index + 2])
+
+        self.states[tick] = state
+        while len(self.states) > self.history:
+            self.states.popitem(last=False)
+        self.tick = tick
+        self.state = state
+        self.received += 1
+        self.bytes_received += len(payload)
+        return tick
+
+    @staticmethod
+    def image(kind, variant):
+        """엔티티 종류/변형의 아틀라스 이미지"""
+        if kind == ENTITY_PLAYER:
+            return ATLAS.player()
+        if kind == ENTITY_ENEMY:
+            return ATLAS.enemy(variant)
+        if kind == ENTITY_PLAYER_BULLET:
+            if variant == BULLET_FLAMETHROWER:
+                return ATLAS.flame(FLAME_MAX_SIZE, FLAME_COLORS[0])
+            return ATLAS.bullet(variant, -1)
+        if kind == ENTITY_ENEMY_BULLET:
+            return ATLAS.bullet(BULLET_NORMAL, 1)
+        if kind == ENTITY_POWERUP:
+            return ATLAS.powerup(POWERUP_NAMES[variant])
+        return ATLAS.explosion_frames()[variant]
+
+    def draw(self, screen, font=None):
+        """현재 상태 그리기 (font가 주어지면 점수/생명/레벨 표시)"""
+        screen.fill(BLACK)
+        quantum = self.quantum
+        for kind, variant, x, y in self.state.values():
+            image = self.image(kind, variant)
+            screen.blit(image, image.get_rect(center=(x * quantum, y * quantum)))
+        if font is not None:
+            text = f"점수: {self.score}  생명: {self.lives}  레벨: {self.level}"
+            if self.game_over:
+                text += "  GAME OVER"
+            screen.blit(font.render(text, True, WHITE), (10, 10))
+
+
+class ClientSession:
+    """서버에 접속한 클라이언트 하나의 상태와 송신 통계"""
+
+    def __init__(self, writer):
+        self.writer = writer
+        self.peer = writer.get_extra_info('peername')
+        self.ack = None  # 클라이언트가 마지막으로 적용한 tick
+        self.inputs = 0
+        self.snapshots = 0
+        self.full_snapshots = 0
+        self.skipped = 0
+        self.bytes_sent = 0
+        self.interval_bytes = 0
+
+
+class GameServer:
+    """asyncio 기반 권위 게임 서버
+
+    서버만 Game.update()를 진행하고 (초당 FPS 틱), 매 틱 스냅샷을 접속한 모든
+    클라이언트에 TCP로 보낸다. 클라이언트는 스냅샷을 적용할 때마다 (tick, 입력)을
+    보내며, 서버는 그 tick을 기준으로 델타를 인코딩하고 플레이 중인 클라이언트의 입력을
+    OR로 합쳐 다음 틱에 쓴다. 송신 버퍼가 쌓인 느린 클라이언트는 그 틱을 건너뛰어도
+    다음 스냅샷이 확인된 기준과의 델타이므로 상태가 어긋나지 않는다.
+    stats()는 클라이언트별 대역폭과 틱당 직렬화(캡처 + 인코딩 + 송신) 시간을 보고한다.
+    스냅샷은 스프라이트 그룹에서 만들므로 서버 게임은 기본(스프라이트) 총알 엔진을 쓴다.
+    """
+
+    def __init__(self, host='127.0.0.1', port=SERVER_PORT, seed=None, quantum=SNAPSHOT_QUANTUM):
+        self.host = host
+        self.port = port
+        self.game = Game(headless=True, seed=seed)
+        self.encoder = SnapshotEncoder(quantum)
+        self.clients = []
+        self.ticks = 0
+        self.game_over_ticks = 0
+        self.serialize_times = collections.deque(maxlen=FPS * 10)  # 나노초
+        self.interval_start = time.perf_counter()
+
+    async def handle_client(self, reader, writer):
+        """클라이언트 접속 처리 (연결이 끊길 때까지 확인 응답 수신)"""
+        client = ClientSession(writer)
+        self.clients.append(client)
+        try:
+            while True:
+                size, = SNAPSHOT_FRAME.unpack(await reader.readexactly(SNAPSHOT_FRAME.size))
+                ack, inputs = CLIENT_MESSAGE.unpack(await reader.readexactly(size))
+                if client.ack is None or ack > client.ack:
+                    client.ack = ack
+                client.inputs = inputs
+        except (asyncio.IncompleteReadError, ConnectionError, struct.error):
+            pass
+        finally:
+            self.clients.remove(client)
+            writer.close()
+
+    def tick(self):
+        """한 틱 진행 후 모든 클라이언트에 스냅샷 송신"""
+        game = self.game
+        if game.game_over:
+            self.game_over_ticks += 1
+            if self.game_over_ticks >= SERVER_RESTART_TICKS:
+                game.restart()
+                self.game_over_ticks = 0
+
+        inputs = 0
+        for client in self.clients:
+            inputs |= client.inputs
+        game.update(inputs)
+        self.ticks += 1
+
+        start = time.perf_counter_ns()
+        encoder = self.encoder
+        encoder.capture(self.ticks, game)
+        for client in self.clients:
+            transport = client.writer.transport
+            if transport.is_closing():
+                continue
+            if transport.get_write_buffer_size() > SERVER_WRITE_LIMIT:
+                client.skipped += 1
+                continue
+            payload = encoder.encode(client.ack)
+            if SNAPSHOT_HEADER.unpack_from(payload)[1] == SNAPSHOT_NO_BASELINE:
+                client.full_snapshots += 1
+            client.writer.write(SNAPSHOT_FRAME.pack(len(payload)) + payload)
+            size = SNAPSHOT_FRAME.size + len(payload)
+            client.bytes_sent += size
+            client.interval_bytes += size
+            client.snapshots += 1
+        self.serialize_times.append(time.perf_counter_ns() - start)
+
+    def stats(self):
+        """직전 stats() 호출 이후의 클라이언트별 대역폭과 틱당 직렬화 시간"""
+        now = time.perf_counter()
+        elapsed = max(now - self.interval_start, 1e-9)
+        self.interval_start = now
+        clients = []
+        for client in self.clients:
+            clients.append({
+                'peer': f"{client.peer[0]}:{client.peer[1]}" if client.peer else None,
+                'kbytes_per_second': client.interval_bytes / elapsed / 1000,
+                'snapshots': client.snapshots,
+                'full_snapshots': client.full_snapshots,
+                'skipped': client.skipped,
+                'ack_lag': self.ticks - client.ack if client.ack is not None else None,
+            })
+            client.interval_bytes = 0
+        serialize = frame_time_stats(list(self.serialize_times)) if self.serialize_times else None
+        return {
+            'tick': self.ticks,
+            'entities': len(self.encoder.ids),
+            'clients': clients,
+            'serialize_ms': serialize,
+        }
+
+    async def serve(self, max_ticks=None, report=None, report_interval=SERVER_REPORT_INTERVAL):
+        """서버 실행 (max_ticks틱 후 또는 취소될 때까지, report(stats)를 주기적으로 호출)"""
+        server = await asyncio.start_server(self.handle_client, self.host, self.port)
+        self.port = server.sockets[0].getsockname()[1]
+        loop = asyncio.get_running_loop()
+        tick = 1.0 / FPS
+        next_tick = loop.time()
+        next_report = next_tick + report_interval
+        async with server:
+            while max_ticks is None or self.ticks < max_ticks:
+                self.tick()
+                next_tick += tick
+                now = loop.time()
+                if next_tick < now - tick * MAX_CATCHUP_TICKS:
+                    # 너무 밀리면 따라잡지 않고 현재 시각부터 다시 시작
+                    next_tick = now
+                if report is not None and now >= next_report:
+                    report(self.stats())
+                    next_report = now + report_interval
+                await asyncio.sleep(max(0.0, next_tick - now))
+            for client in list(self.clients):
+                client.writer.close()
+
+
+async def run_client(host='127.0.0.1', port=SERVER_PORT, render=True, max_snapshots=None, policy=None):
+    """서버에 접속해 스냅샷을 받아 적용하고 (tick, 입력)을 확인 응답으로 보냄
+
+    render=True면 창에 상태를 그리고 키보드 입력(좌우, 스페이스)을 보낸다. 그렇지 않으면
+    policy(client)가 돌려주는 입력을 보낸다 (없으면 관전). 연결이 끊기거나 창을 닫거나
+    max_snapshots개를 받으면 끝나고 SnapshotClient를 반환한다.
+    """
+    reader, writer = await asyncio.open_connection(host, port)
+    client = SnapshotClient()
+    screen = None
+    if render:
+        init_pygame()
+        screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+        pygame.display.set_caption(f"Space War - {host}:{port}")
+        ATLAS.prerender()
+        FONTS.start(background=True)
+
+    try:
+        while max_snapshots is None or client.received < max_snapshots:
+            try:
+                size, = SNAPSHOT_FRAME.unpack(await reader.readexactly(SNAPSHOT_FRAME.size))
+                payload = await reader.readexactly(size)
+            except (asyncio.IncompleteReadError, ConnectionError):
+                break
+            tick = client.apply(payload)
+
+            inputs = 0
+            if render:
+                if any(event.type == pygame.QUIT for event in pygame.event.get()):
+                    break
+                keys = pygame.key.get_pressed()
+                if keys[pygame.K_LEFT]:
+                    inputs |= INPUT_LEFT
+                if keys[pygame.K_RIGHT]:
+                    inputs |= INPUT_RIGHT
+                if keys[pygame.K_SPACE]:
+                    inputs |= INPUT_FIRE
+                client.draw(screen, FONTS.font(24))
+                pygame.display.flip()
+            elif policy is not None:
+                inputs = policy(client)
+
+            message = CLIENT_MESSAGE.pack(tick, inputs)
+            writer.write(SNAPSHOT_FRAME.pack(len(message)) + message)
+            await writer.drain()
+    finally:
+        writer.close()
+        if render:
+            pygame.quit()
+    return client
+
 
 def main():
     """메인 함수"""
-    game = Game()
-    game.run()
+    parser = argparse.ArgumentParser(description="Space War - 갤러그 스타일 슈팅 게임")
+    parser.add_argument('--headless', action='store_true',
+                        help='화면/오디오 없이 고정 틱으로 시뮬레이션 실행')
+    parser.add_argument('--frames', type=int, default=FPS * 60,
+                        help='헤드리스 모드에서 실행할 최대 틱 수')
+    parser.add_argument('--render-fps', type=int, default=RENDER_FPS,
+                        help='렌더링 프레임 상한 (0이면 제한 없음, 시뮬레이션은 항상 초당 FPS 틱)')
+    parser.add_argument('--dirty-rects', action='store_true',
+                        help='변경된 영역만 화면에 반영하는 렌더링 모드')
+    parser.add_argument('--bullet-engine', choices=[BULLET_ENGINE_SPRITE, BULLET_ENGINE_SOA],
+                        default=BULLET_ENGINE_SPRITE, help='총알 엔진 (스프라이트 또는 열 배열)')
+    parser.add_argument('--star-layers', type=int, default=STAR_LAYERS,
+                        help='배경 별 레이어 수')
+    parser.add_argument('--star-density', type=int, default=STAR_DENSITY,
+                        help='배경 별 개수')
+    parser.add_argument('--particles', type=int, default=PARTICLE_CAP, metavar='CAP',
+                        help='살아 있는 파티클 상한 (0이면 파티클 효과를 끄고 폭발 스프라이트 사용)')
+    parser.add_argument('--seed', type=int,
+                        help='게임 난수 시드 (같은 시드와 입력이면 같은 게임)')
+    parser.add_argument('--record', metavar='PATH',
+                        help='플레이 입력을 리플레이 파일로 녹화')
+    parser.add_argument('--replay', metavar='PATH',
+                        help='리플레이 파일을 헤드리스로 재생하고 재현 여부 확인')
+    parser.add_argument('--profile', action='store_true',
+                        help='구간별 프로파일러 오버레이 표시 (게임 중 F3으로 전환)')
+    parser.add_argument('--profile-trace', metavar='PATH',
+                        help='구간별 시간을 Chrome trace-event JSON으로 저장')
+    parser.add_argument('--startup-time', action='store_true',
+                        help='게임 생성부터 첫 프레임까지의 시간을 단계별로 출력하고 종료')
+    parser.add_argument('--benchmark', nargs='*', metavar='SCENARIO',
+                        choices=list(BENCHMARK_SCENARIOS),
+                        help=f"시나리오 벤치마크 실행 (생략하면 전체: {', '.join(BENCHMARK_SCENARIOS)})")
+    parser.add_argument('--benchmark-frames', type=int, default=600,
+                        help='벤치마크 시나리오별 측정 틱 수')
+    parser.add_argument('--benchmark-json', metavar='PATH',
+                        help='벤치마크 결과 JSON 파일 (생략하면 표준 출력)')
+    parser.add_argument('--stress', action='store_true',
+                        help='끝없는 스트레스 웨이브로 레벨별 프레임 시간을 재고 예산(16.6ms)을 처음 넘는 레벨 보고')
+    parser.add_argument('--endless', action='store_true',
+                        help='레벨마다 적이 늘어나는 끝없는 스트레스 웨이브로 게임 플레이')
+    parser.add_argument('--ramp', choices=list(RAMP_CURVES), default=STRESS_RAMP,
+                        help='스트레스 웨이브 증가 곡선')
+    parser.add_argument('--ramp-growth', type=float, default=STRESS_GROWTH,
+                        help='스트레스 웨이브 증가율 (적 수 기준)')
+    parser.add_argument('--stress-ticks', type=int, default=180,
+                        help='스트레스 측정 레벨별 틱 수')
+    parser.add_argument('--stress-levels', type=int, default=40,
+                        help='스트레스 측정 최대 레벨')
+    parser.add_argument('--stress-keep-going', action='store_true',
+                        help='예산을 넘은 뒤에도 최대 레벨까지 계속 측정')
+    parser.add_argument('--stress-no-render', action='store_true',
+                        help='스트레스 측정에서 그리기 시간 제외')
+    parser.add_argument('--stress-json', metavar='PATH',
+                        help='스트레스 측정 결과 JSON 파일 (생략하면 표준 출력)')
+    parser.add_argument('--batch', type=int, metavar='GAMES',
+                        help='헤드리스 게임 GAMES개를 프로세스 풀에서 실행하고 요약 통계를 JSON으로 출력')
+    parser.add_argument('--bot', choices=list(BOT_POLICIES), default='sweep',
+                        help='배치 실행에 쓸 플레이어 봇')
+    parser.add_argument('--workers', type=int,
+                        help='배치 실행 프로세스 수 (기본: CPU 코어 수)')
+    parser.add_argument('--batch-results', metavar='PATH',
+                        help='배치 실행의 게임별 결과를 도착하는 대로 JSON Lines로 저장')
+    parser.add_argument('--check-formats', action='store_true',
+                        help='상태 저장, 리플레이, 스냅샷 포맷의 레이아웃과 왕복 변환 검사 (실패 시 종료 코드 1)')
+    parser.add_argument('--serve', action='store_true',
+                        help='권위 게임 서버 실행 (클라이언트에 틱마다 델타 스냅샷 전송)')
+    parser.add_argument('--serve-ticks', type=int,
+                        help='서버를 이 틱 수만큼 실행하고 종료 (생략하면 계속)')
+    parser.add_argument('--connect', metavar='HOST:PORT',
+                        help='게임 서버에 접속해 스냅샷을 그리고 키보드 입력 전송')
+    parser.add_argument('--host', default='127.0.0.1',
+                        help='서버가 바인드할 주소')
+    parser.add_argument('--port', type=int, default=SERVER_PORT,
+                        help='서버 포트')
+    args = parser.parse_args()
+
+    if args.check_formats:
+        failures = run_format_check(seed=args.seed if args.seed is not None else 0)
+        for failure in failures:
+            print(f"FAIL {failure}")
+        print(f"format check: {'ok' if not failures else f'{len(failures)} failure(s)'}")
+        pygame.quit()
+        if failures:
+            sys.exit(1)
+        return
+
+    if args.serve:
+        server = GameServer(args.host, args.port, seed=args.seed)
+
+        def report(stats):
+            serialize = stats['serialize_ms']
+            print(f"tick={stats['tick']} entities={stats['entities']} clients={len(stats['clients'])} "
+                  f"serialize p50={serialize['p50']:.3f} p99={serialize['p99']:.3f} ms", flush=True)
+            for client in stats['clients']:
+                print(f"  {client['peer']} {client['kbytes_per_second']:.1f} kB/s "
+                      f"snapshots={client['snapshots']} full={client['full_snapshots']} "
+                      f"skipped={client['skipped']} ack_lag={client['ack_lag']}", flush=True)
+
+        try:
+            asyncio.run(server.serve(args.serve_ticks, report))
+        except KeyboardInterrupt:
+            pass
+        pygame.quit()
+        return
+
+    if args.connect:
+        host, _, port = args.connect.rpartition(':')
+        client = asyncio.run(run_client(host or '127.0.0.1', int(port) if port else SERVER_PORT))
+        print(f"snapshots={client.received} bytes={client.bytes_received} tick={client.tick}")
+        return
+
+    if args.batch:
+        base_seed = args.seed if args.seed is not None else 0
+        results_file = open(args.batch_results, 'w') if args.batch_results else None
+
+        def on_result(result):
+            if results_file:
+                results_file.write(json.dumps(result) + '\n')
+                results_file.flush()
+
+        try:
+            summary = run_batch(range(base_seed, base_seed + args.batch), args.bot, args.frames, args.workers,
+                                args.bullet_engine, on_result)
+        finally:
+            if results_file:
+                results_file.close()
+        json.dump(summary, sys.stdout, indent=2)
+        print()
+        return
+
+    if args.benchmark is not None:
+        report = run_benchmark(args.benchmark, args.benchmark_frames,
+                               seed=args.seed if args.seed is not None else 0,
+                               bullet_engine=args.bullet_engine, dirty_rects=args.dirty_rects)
+        if args.benchmark_json:
+            with open(args.benchmark_json, 'w') as f:
+                json.dump(report, f, indent=2, ensure_ascii=False)
+            for name, result in report['scenarios'].items():
+                update, draw = result['update_ms'], result['draw_ms']
+                print(f"{name:16} update p50={update['p50']:.2f} p99={update['p99']:.2f} max={update['max']:.2f}  "
+                      f"draw p50={draw['p50']:.2f} p99={draw['p99']:.2f} max={draw['max']:.2f} ms")
+        else:
+            json.dump(report, sys.stdout, indent=2, ensure_ascii=False)
+            print()
+        return
+
+    if args.stress:
+        def on_level(result):
+            if args.stress_json:
+                frame = result['frame_ms']
+                print(f"level {result['level']:3} enemies={result['enemies_spawned']:5} "
+                      f"bullets={result['final_state']['bullets']:5} p50={frame['p50']:.2f} "
+                      f"p95={frame['p95']:.2f} max={frame['max']:.2f} ms"
+                      f"{'  OVER BUDGET' if result['over_budget'] else ''}", flush=True)
+
+        report = run_stress(args.ramp, args.ramp_growth, args.stress_ticks, args.stress_levels,
+                            seed=args.seed if args.seed is not None else 0, bullet_engine=args.bullet_engine,
+                            render=not args.stress_no_render, keep_going=args.stress_keep_going,
+                            on_level=on_level)
+        if args.stress_json:
+            with open(args.stress_json, 'w') as f:
+                json.dump(report, f, indent=2)
+            first = report['first_over_budget']
+            print(f"first level over {report['budget_ms']:.2f}ms budget: {first if first is not None else 'none'}")
+        else:
+            json.dump(report, sys.stdout, indent=2)
+            print()
+        return
+
+    if args.startup_time:
+        start = time.perf_counter()
+        game = Game(headless=args.headless, dirty_rects=args.dirty_rects, star_layers=args.star_layers,
+                    star_density=args.star_density, bullet_engine=args.bullet_engine, seed=args.seed)
+        game.draw()
+        first_frame = time.perf_counter() - start
+        phases = []
+        previous = 0
+        for name, elapsed in game.startup_times.items():
+            phases.append(f"{name}={(elapsed - previous if name != 'total' else elapsed) * 1000:.1f}ms")
+            previous = elapsed
+        print(f"{' '.join(phases)} first_frame={first_frame * 1000:.1f}ms fonts={FONTS.source}")
+        pygame.quit()
+        return
+
+    if args.replay:
+        replay = Replay.load(args.replay)
+        start = time.perf_counter()
+        game, matched = replay.play()
+        elapsed = time.perf_counter() - start
+        print(f"frames={game.frame_count} score={game.score} level={game.level} "
+              f"lives={game.lives} elapsed={elapsed:.3f}s "
+              f"fps={game.frame_count / elapsed if elapsed > 0 else 0:.0f} "
+              f"digest={'ok' if matched else 'MISMATCH'}")
+        if not matched:
+            sys.exit(1)
+        return
+
+    if args.headless:
+        game = Game(headless=True, bullet_engine=args.bullet_engine, seed=args.seed)
+        if args.profile_trace:
+            game.profiler.enable(trace=True)
+        start = time.perf_counter()
+        frames = game.run_headless(args.frames)
+        elapsed = time.perf_counter() - start
+        if args.profile_trace:
+            game.profiler.export_trace(args.profile_trace)
+        print(f"frames={frames} score={game.score} level={game.level} "
+              f"lives={game.lives} elapsed={elapsed:.3f}s "
+              f"fps={frames / elapsed if elapsed > 0 else 0:.0f}")
+        return
+
+    game = Game(dirty_rects=args.dirty_rects, star_layers=args.star_layers, star_density=args.star_density,
+                bullet_engine=args.bullet_engine, seed=args.seed, particle_cap=args.particles)
+    if args.endless:
+        game.stress = StressMode(args.ramp, args.ramp_growth)
+        game.spawn_enemies()
+    if args.profile:
+        game.toggle_profile()
+    game.run(args.record, args.profile_trace, args.render_fps)
 
 
 if __name__ == "__main__":